@@ -144,12 +144,22 @@ axel_egpt_db_name = "axel_egpt"
 thermal_db_name = "Thermals"
 axel_db_name = "AxelDB"
 
+# One pooled client per URI for the life of the tool process; opening a fresh client per
+# call repeated the TLS handshake with every replica-set member.
+_MONGO_CLIENTS: dict[str, pymongo.MongoClient] = {}
+
+
 def _get_mongo_client(mongo_uri: str) -> pymongo.MongoClient:
-    """Get MongoDB client with error handling."""
+    """Get the cached MongoDB client for mongo_uri, creating it on first use."""
+    client = _MONGO_CLIENTS.get(mongo_uri)
+    if client is not None:
+        return client
     try:
-        return pymongo.MongoClient(mongo_uri)
+        client = pymongo.MongoClient(mongo_uri, maxPoolSize=8, maxIdleTimeMS=300000)
     except Exception as e:
         raise RuntimeError(f"Failed to connect to MongoDB: {e}")
+    _MONGO_CLIENTS[mongo_uri] = client
+    return client
 
 def _get_collections():
     """Get MongoDB collections for thermal audit operations."""
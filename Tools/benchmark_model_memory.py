@@ -0,0 +1,180 @@
+"""Compare parse memory of slotted vs. dict-backed row models on a synthetic PortLevel report.
+
+Each variant runs in a fresh interpreter so peak RSS is not shared between them.
+
+Usage:
+    python Tools/benchmark_model_memory.py --rows 300000
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import dataclasses
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from tp_ingest import models
+from tp_ingest.parsers import PortResultsParser
+
+HEADERS = [
+    "InstanceName_Port",
+    "STATUS",
+    "Bypass",
+    "Bin",
+    "HB",
+    "SB",
+    "Counter",
+    "PLIST",
+    "MonitorPatCount",
+    "KILLPatCount",
+    "SkippedPatCount",
+    "Content Directory",
+    "PatternVREV",
+    "TestType",
+    "TpOptions",
+    "Scrum",
+    "ModuleName",
+    "ModuleUser",
+    "TestCategory",
+    "Partition",
+    "TestTypeFlag",
+    "SubFlow",
+    "PatternRatio",
+    "VoltageDomain",
+    "Corner",
+    "Frequency",
+    "ModuleUser",
+    "Port",
+]
+
+
+def write_synthetic_report(path: Path, rows: int) -> None:
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(HEADERS)
+        for index in range(rows):
+            module = f"MOD_{index % 40:02d}"
+            port = str(index % 4)
+            writer.writerow(
+                [
+                    f"{module}::TEST_{index // 4:06d}_{port}",
+                    "PASS" if index % 7 else "FAIL",
+                    "-1" if index % 5 else "1",
+                    str(90000 + index % 300),
+                    str(index % 99),
+                    str(index % 9999),
+                    str(index),
+                    f"plist_{index % 500}",
+                    str(index % 13),
+                    str(index % 11),
+                    "0",
+                    f"/content/{module}",
+                    f"vrev_{index % 20}",
+                    "Functional",
+                    "",
+                    f"scrum_{index % 6}",
+                    module,
+                    "owner",
+                    "KILL" if index % 3 else "MONITOR",
+                    f"P{index % 3}",
+                    "F",
+                    f"SUBFLOW_{index % 12}",
+                    "1/1",
+                    "VCC",
+                    "NOM" if index % 2 else "MIN",
+                    "2400",
+                    "port_owner",
+                    port,
+                ]
+            )
+
+
+def _unslotted(cls: type) -> type:
+    """Rebuild *cls* as a regular ``__dict__``-backed dataclass (the pre-slots layout)."""
+    spec = []
+    for item in dataclasses.fields(cls):
+        if item.default is not dataclasses.MISSING:
+            spec.append((item.name, item.type, dataclasses.field(default=item.default)))
+        elif item.default_factory is not dataclasses.MISSING:
+            spec.append((item.name, item.type, dataclasses.field(default_factory=item.default_factory)))
+        else:
+            spec.append((item.name, item.type))
+    return dataclasses.make_dataclass(cls.__name__, spec)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024)
+
+
+def measure(report: Path, variant: str) -> Dict[str, Any]:
+    if variant == "dict":
+        models.PortResultRow = _unslotted(models.PortResultRow)
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = PortResultsParser().parse(report)
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "variant": variant,
+        "rows": len(result.entries),
+        "parse_seconds": round(elapsed, 2),
+        "retained_mb": round(retained / (1024 * 1024), 1),
+        "traced_peak_mb": round(peak / (1024 * 1024), 1),
+        "peak_rss_mb": None if (rss := _peak_rss_mb()) is None else round(rss, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows in the synthetic PortLevel report.")
+    parser.add_argument("--report", type=Path, default=None, help="Benchmark an existing PASReport_PortLevel.csv instead.")
+    parser.add_argument("--variant", choices=("slots", "dict"), default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(measure(args.report, args.variant)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = args.report
+        if report is None:
+            report = Path(tmp) / "PASReport_PortLevel.csv"
+            write_synthetic_report(report, args.rows)
+        results = []
+        for variant in ("dict", "slots"):
+            completed = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()), "--variant", variant, "--report", str(report)],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            results.append(json.loads(completed.stdout))
+
+    before, after = results
+    summary: Dict[str, Any] = {"before": before, "after": after}
+    if before["retained_mb"]:
+        summary["retained_reduction_pct"] = round(100 * (1 - after["retained_mb"] / before["retained_mb"]), 1)
+    if before["peak_rss_mb"] and after["peak_rss_mb"]:
+        summary["peak_rss_reduction_pct"] = round(100 * (1 - after["peak_rss_mb"] / before["peak_rss_mb"]), 1)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
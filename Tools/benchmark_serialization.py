@@ -0,0 +1,121 @@
+"""Time the compiled per-class serializers against the old generic ``_to_mongo`` recursion.
+
+Per-row serializers are compared with the generic recursion too; they run at the speed of the
+hand-written dict literals they replace.
+
+Usage:
+    python Tools/benchmark_serialization.py --port-rows 200000 --flow-tables 300
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, Callable, List
+
+from tp_ingest import models
+from tp_ingest.serialization import integration_report_to_document, port_result_row_to_document
+
+
+def legacy_to_mongo(value: Any) -> Any:
+    """The generic recursion serialization used before per-class serializers."""
+    if isinstance(value, Path):
+        return str(value)
+    if is_dataclass(value):
+        return {field.name: legacy_to_mongo(getattr(value, field.name)) for field in fields(value)}
+    if isinstance(value, list):
+        return [legacy_to_mongo(item) for item in value]
+    if isinstance(value, dict):
+        return {key: legacy_to_mongo(item) for key, item in value.items()}
+    return value
+
+
+def synthetic_report(flow_tables: int, rows_per_table: int) -> models.IntegrationReport:
+    columns = [f"col_{index}" for index in range(8)]
+    tables = [
+        models.FlowTable(
+            name=f"FLOW_{table}",
+            columns=columns,
+            rows=[
+                models.FlowRow(columns={column: f"{table}-{row}-{column}" for column in columns})
+                for row in range(rows_per_table)
+            ],
+        )
+        for table in range(flow_tables)
+    ]
+    components = [
+        models.ComponentRevision(name=f"comp_{index}", owner="owner", timestamp="2024", sha="abc", comment="")
+        for index in range(200)
+    ]
+    return models.IntegrationReport(
+        path=Path("Reports/Integration_Report.txt"),
+        program=models.ProgramIdentification("family", "sub", "BASE", "A1", "https://example/repo"),
+        environment=models.EnvironmentSettings(
+            prime_rev="1",
+            fuse_file_rev="2",
+            pattern_revs=[models.PatternRevision(f"mod_{index}", "r1", ["dep"]) for index in range(100)],
+        ),
+        shared_components=components,
+        tp_modules=components,
+        flows_raw={f"FLOW_{table}": "raw" for table in range(flow_tables)},
+        flow_tables=tables,
+        dll_inventory=[models.DllEntry(f"dll_{index}", "1.0", 1, False, "C:/x") for index in range(500)],
+    )
+
+
+def synthetic_port_rows(count: int) -> List[models.PortResultRow]:
+    rows = []
+    for index in range(count):
+        rows.append(
+            models.PortResultRow(
+                f"MOD::TEST_{index}_0", "PASS", "-1", 9000, 1, 2, index, "plist", 1, 2, 0, "/c", "v",
+                "Functional", None, "scrum", "MOD", "owner", "KILL", "P0", "F", "SUB", "1/1",
+                "VCC", "NOM", "2400", "owner", "0", f"MOD::TEST_{index}", "MOD",
+            )
+        )
+    return rows
+
+
+def _best_of(repeats: int, func: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port-rows", type=int, default=200_000)
+    parser.add_argument("--flow-tables", type=int, default=300)
+    parser.add_argument("--rows-per-table", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    report = synthetic_report(args.flow_tables, args.rows_per_table)
+    rows = synthetic_port_rows(args.port_rows)
+    assert integration_report_to_document(report) == legacy_to_mongo(report)
+    assert port_result_row_to_document(rows[0]) == legacy_to_mongo(rows[0])
+
+    timings = {
+        "integration_report": {
+            "legacy_s": _best_of(args.repeats, lambda: legacy_to_mongo(report)),
+            "compiled_s": _best_of(args.repeats, lambda: integration_report_to_document(report)),
+        },
+        "port_rows": {
+            "legacy_s": _best_of(args.repeats, lambda: [legacy_to_mongo(row) for row in rows]),
+            "compiled_s": _best_of(args.repeats, lambda: [port_result_row_to_document(row) for row in rows]),
+        },
+    }
+    for result in timings.values():
+        result["speedup"] = round(result["legacy_s"] / result["compiled_s"], 1)
+        result["legacy_s"] = round(result["legacy_s"], 3)
+        result["compiled_s"] = round(result["compiled_s"], 3)
+    print(json.dumps(timings, indent=2))
+
+
+if __name__ == "__main__":
+    main()
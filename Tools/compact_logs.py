@@ -0,0 +1,81 @@
+"""Compact the daily scanner JSON-lines logs into dated gzip segments and report on them.
+
+Examples:
+    python Tools/compact_logs.py --keep-days 90
+    python Tools/compact_logs.py --report --since 2026-01-01
+    python Tools/compact_logs.py --log state/daily_scanner_alerts.jsonl --list --status copy-failed
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tp_ingest.logstore import LogIndex, compact_log, iter_entries, segments_dir_for, status_counts
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_LOGS = [
+    ROOT / "logs" / "daily_scanner.log",
+    ROOT / "state" / "daily_scanner_alerts.jsonl",
+]
+
+
+def _timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compact and query the daily scanner JSON-lines logs.")
+    parser.add_argument(
+        "--log",
+        action="append",
+        type=Path,
+        default=None,
+        help="Log file to process (repeatable; defaults to the scanner log and the alerts file).",
+    )
+    parser.add_argument("--keep-days", type=float, default=None, help="Delete segments whose newest entry is older.")
+    parser.add_argument("--max-mb", type=float, default=None, help="Delete the oldest segments beyond this size.")
+    parser.add_argument("--report", action="store_true", help="Print status counts instead of compacting.")
+    parser.add_argument("--list", action="store_true", help="Print matching entries as JSON lines instead of compacting.")
+    parser.add_argument("--since", type=_timestamp, default=None, help="ISO timestamp; only entries at or after it.")
+    parser.add_argument("--until", type=_timestamp, default=None, help="ISO timestamp; only entries at or before it.")
+    parser.add_argument("--status", action="append", default=None, help="Only entries with this status (repeatable).")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logs: List[Path] = [path.resolve() for path in (args.log or DEFAULT_LOGS)]
+
+    if args.list:
+        for path in logs:
+            for entry in iter_entries(path, since=args.since, until=args.until, statuses=args.status):
+                print(json.dumps(entry))
+        return 0
+
+    output: Dict[str, Any] = {}
+    for path in logs:
+        if args.report:
+            index = LogIndex(segments_dir_for(path))
+            output[str(path)] = {
+                "segments": len(index.segments),
+                "segment_bytes": sum(segment.stored_bytes for segment in index.segments),
+                "status_counts": status_counts(path, since=args.since, until=args.until),
+            }
+            continue
+        max_bytes: Optional[int] = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+        result = compact_log(path, keep_days=args.keep_days, max_bytes=max_bytes)
+        output[str(path)] = asdict(result)
+    print(json.dumps(output, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
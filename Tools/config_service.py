@@ -8,55 +8,22 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from tp_ingest.product_config import load_product_configs, models
+from tp_ingest.fileio import atomic_write_text
+from tp_ingest.ledger import load_scanner_state
+from tp_ingest.listing import DirectoryListingCache, ShareListing
+from tp_ingest.product_config import invalidate_product_catalog, load_product_catalog, models
+from tp_ingest.shares import (
+    DEFAULT_DOWN_TTL_MINUTES,
+    DEFAULT_TIMEOUT_SECONDS,
+    DEFAULT_WORKERS,
+    ShareHealthCache,
+    run_with_timeouts,
+)
 
 DEFAULT_PRODUCTS = Path(__file__).resolve().parent.parent / "Products.json"
-DEFAULT_STATE = Path(__file__).resolve().parent.parent / "state" / "daily_scanner_state.json"
-
-
-def _strip_json_comments(raw_text: str) -> str:
-    cleaned_lines = []
-    for line in raw_text.splitlines():
-        if "//" in line:
-            prefix, *_ = line.split("//", 1)
-            cleaned_lines.append(prefix.rstrip())
-        else:
-            cleaned_lines.append(line)
-    return "\n".join(cleaned_lines)
-
-
-def _read_raw_payload(path: Path) -> Tuple[Any, bool]:
-    text = path.read_text(encoding="utf-8")
-    cleaned = _strip_json_comments(text)
-
-    # Products.json is expected to be valid JSON. Some legacy config files historically
-    # contained unescaped backslashes (e.g. Windows/UNC paths) which are not valid JSON.
-    # To support both, only apply the backslash-doubling workaround if the initial parse fails.
-    try:
-        data = json.loads(cleaned)
-    except json.JSONDecodeError:
-        data = json.loads(cleaned.replace("\\", "\\\\"))
-    is_list = isinstance(data, list)
-    if not is_list and not isinstance(data, dict):
-        raise ValueError("Products.json must be an object or array")
-    return data, is_list
-
-
-def _sorted_directories(network_path: Path) -> List[Path]:
-    candidates: List[tuple[float, Path]] = []
-    try:
-        for child in network_path.iterdir():
-            if not child.is_dir():
-                continue
-            try:
-                mtime = child.stat().st_mtime
-            except OSError:
-                mtime = 0.0
-            candidates.append((mtime, child))
-    except OSError as exc:
-        raise FileNotFoundError(f"Unable to enumerate {network_path}: {exc}") from exc
-    candidates.sort(key=lambda item: item[0], reverse=True)
-    return [entry for _, entry in candidates]
+DEFAULT_STATE = Path(__file__).resolve().parent.parent / "state" / "daily_scanner.db"
+DEFAULT_LISTING_CACHE = Path(__file__).resolve().parent.parent / "state" / "network_listings.json"
+DEFAULT_SHARE_HEALTH = Path(__file__).resolve().parent.parent / "state" / "share_health.json"
 
 
 def _config_to_payload(config: models.ProductConfig) -> Dict[str, Any]:
@@ -81,7 +48,7 @@ def load_ingestion_state(path: Path) -> Dict[str, Any]:
     if not path.exists():
         return {"products": {}}
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return load_scanner_state(path)
     except json.JSONDecodeError as exc:
         raise ValueError(f"Unable to parse ingestion state at {path}: {exc}") from exc
 
@@ -103,12 +70,64 @@ def _latest_ingested(processed_tps: Dict[str, Dict[str, Any]]) -> Optional[Tuple
     return None
 
 
+def _path_exists(network_path: str) -> bool:
+    try:
+        return Path(network_path).exists()
+    except OSError:
+        return False
+
+
+def validate_network_paths(
+    paths: Iterable[str],
+    *,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    max_workers: int = DEFAULT_WORKERS,
+    health: Optional[ShareHealthCache] = None,
+) -> Dict[str, Tuple[bool, Optional[str]]]:
+    """Check every path concurrently; returns ``{path: (exists, error)}``.
+
+    Shares *health* recorded as down are reported without being touched; the others are
+    checked with a per-path *timeout* and their outcome is recorded in *health*.
+    """
+    results: Dict[str, Tuple[bool, Optional[str]]] = {}
+    pending: List[str] = []
+    for path in dict.fromkeys(paths):
+        known_error = health.known_down(path) if health else None
+        if known_error:
+            results[path] = (False, f"known down: {known_error}")
+        else:
+            pending.append(path)
+    for path, exists, error in run_with_timeouts(_path_exists, pending, timeout=timeout, max_workers=max_workers):
+        if error is None and exists:
+            results[path] = (True, None)
+            if health:
+                health.mark_up(path)
+            continue
+        message = str(error) if error is not None else "path not found"
+        results[path] = (False, message)
+        if health:
+            health.mark_down(path, message)
+    return results
+
+
 def summarize_products(
     configs: Iterable[models.ProductConfig],
     state: Dict[str, Any],
     *,
     validate_paths: bool = False,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    max_workers: int = DEFAULT_WORKERS,
+    health: Optional[ShareHealthCache] = None,
 ) -> List[Dict[str, Any]]:
+    configs = list(configs)
+    path_checks: Dict[str, Tuple[bool, Optional[str]]] = {}
+    if validate_paths:
+        path_checks = validate_network_paths(
+            (config.network_path for config in configs if config.network_path),
+            timeout=timeout,
+            max_workers=max_workers,
+            health=health,
+        )
     results: List[Dict[str, Any]] = []
     products_state = state.get("products", {}) if isinstance(state, dict) else {}
     for config in configs:
@@ -118,22 +137,21 @@ def summarize_products(
         latest_processed = _latest_ingested(processed) if processed else None
         last_ingested_tp = latest_processed[0] if latest_processed else None
         path_valid: Optional[bool] = None
-        if validate_paths and config.network_path:
-            try:
-                path_valid = Path(config.network_path).exists()
-            except OSError:
-                path_valid = False
-        results.append(
-            {
-                "product_code": product_code,
-                "product_name": config.product_name,
-                "network_path": config.network_path,
-                "path_valid": path_valid,
-                "config_latest_tp": config.latest_tp,
-                "state_last_ingested": last_ingested_tp,
-                "processed_count": len(processed),
-            }
-        )
+        path_error: Optional[str] = None
+        if config.network_path in path_checks:
+            path_valid, path_error = path_checks[config.network_path]
+        entry = {
+            "product_code": product_code,
+            "product_name": config.product_name,
+            "network_path": config.network_path,
+            "path_valid": path_valid,
+            "config_latest_tp": config.latest_tp,
+            "state_last_ingested": last_ingested_tp,
+            "processed_count": len(processed),
+        }
+        if path_error:
+            entry["path_error"] = path_error
+        results.append(entry)
     return results
 
 
@@ -178,24 +196,65 @@ def sync_releases_from_network(
     configs: List[models.ProductConfig],
     *,
     max_network_scan: Optional[int] = None,
+    listing_cache: Optional[DirectoryListingCache] = None,
+    state: Optional[Dict[str, Any]] = None,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    max_workers: int = DEFAULT_WORKERS,
+    health: Optional[ShareHealthCache] = None,
 ) -> List[Dict[str, Any]]:
+    """Enumerate every product's NetworkPath concurrently and update its releases.
+
+    Each share gets *timeout* seconds; shares *health* knows to be down are skipped.
+    Changes are reported in *configs* order.
+    """
+    cache = listing_cache if listing_cache is not None else DirectoryListingCache()
+    products_state = (state or {}).get("products", {})
+    failures: Dict[str, str] = {}
+    targets: List[models.ProductConfig] = []
+    for config in configs:
+        if not config.network_path:
+            continue
+        known_error = health.known_down(config.network_path) if health else None
+        if known_error:
+            failures[config.network_path] = f"known down: {known_error}"
+        else:
+            targets.append(config)
+
+    def _list(config: models.ProductConfig) -> ShareListing:
+        code = (config.product_code or "").upper()
+        known = (products_state.get(code) or {}).get("processed_tps", {})
+        return cache.list_share(Path(config.network_path), known_names=known)
+
+    listings: Dict[str, ShareListing] = {}
+    for config, listing, error in run_with_timeouts(_list, targets, timeout=timeout, max_workers=max_workers):
+        if error is None:
+            listings[config.network_path] = listing
+            if health:
+                health.mark_up(config.network_path)
+            continue
+        if not isinstance(error, OSError):
+            raise error
+        failures[config.network_path] = str(error)
+        if health:
+            health.mark_down(config.network_path, str(error))
+
     changes: List[Dict[str, Any]] = []
     for config in configs:
         if not config.network_path:
             continue
-        network_path = Path(config.network_path)
-        try:
-            directories = _sorted_directories(network_path)
-        except FileNotFoundError as exc:
+        if config.network_path in failures:
             changes.append(
                 {
                     "product_code": (config.product_code or "").upper(),
                     "status": "network-unavailable",
-                    "error": str(exc),
+                    "error": failures[config.network_path],
                 }
             )
             continue
-
+        listing = listings.get(config.network_path)
+        if listing is None:
+            continue
+        directories = listing.directories
         if max_network_scan is not None:
             directories = directories[:max_network_scan]
         discovered = [directory.name for directory in directories]
@@ -232,7 +291,8 @@ def write_products_config(path: Path, configs: List[models.ProductConfig], origi
     else:
         data = payload
     serialized = json.dumps(data, indent=2)
-    path.write_text(serialized, encoding="utf-8")
+    atomic_write_text(path, serialized)
+    invalidate_product_catalog(path)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -247,7 +307,7 @@ def build_parser() -> argparse.ArgumentParser:
         "--state-file",
         type=Path,
         default=DEFAULT_STATE,
-        help="Ingestion state file produced by daily_scanner.",
+        help="Scanner ledger (.db) or legacy JSON state file produced by daily_scanner.",
     )
     parser.add_argument(
         "--product-codes",
@@ -275,6 +335,36 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Optional cap on how many TP folders to include from the network path (sorted by mtime).",
     )
+    parser.add_argument(
+        "--listing-cache",
+        type=Path,
+        default=DEFAULT_LISTING_CACHE,
+        help="NetworkPath listing cache shared with daily_scanner (avoids re-stat-ing known TP folders).",
+    )
+    parser.add_argument(
+        "--path-timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT_SECONDS,
+        help="Seconds to wait for each NetworkPath check or listing before reporting it unavailable.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="NetworkPaths checked concurrently.",
+    )
+    parser.add_argument(
+        "--share-health-cache",
+        type=Path,
+        default=DEFAULT_SHARE_HEALTH,
+        help="Record of shares that recently failed; they are reported as down without waiting on them.",
+    )
+    parser.add_argument(
+        "--down-ttl",
+        type=float,
+        default=DEFAULT_DOWN_TTL_MINUTES,
+        help="Minutes a failed share is treated as down (0 re-checks every share).",
+    )
     parser.add_argument(
         "--apply",
         action="store_true",
@@ -303,21 +393,41 @@ def main() -> None:
 
     product_path = args.product_config.resolve()
     state_path = args.state_file.resolve()
-    _, is_list = _read_raw_payload(product_path)
-    configs = load_product_configs(product_path)
+    catalog = load_product_catalog(product_path)
+    is_list = catalog.is_list
+    configs = catalog.copy_configs()
     filter_codes = {code.upper() for code in args.product_codes} if args.product_codes else None
     if filter_codes:
         configs = [cfg for cfg in configs if (cfg.product_code or "").upper() in filter_codes]
     state = load_ingestion_state(state_path)
 
-    summary = summarize_products(configs, state, validate_paths=args.validate_paths)
+    health = ShareHealthCache(args.share_health_cache.resolve(), down_ttl_minutes=args.down_ttl)
+    summary = summarize_products(
+        configs,
+        state,
+        validate_paths=args.validate_paths,
+        timeout=args.path_timeout,
+        max_workers=args.workers,
+        health=health,
+    )
     changes: List[Dict[str, Any]] = []
     if args.sync_latest:
         changes = sync_latest_from_state(configs, state)
 
     network_changes: List[Dict[str, Any]] = []
     if args.sync_releases_from_network:
-        network_changes = sync_releases_from_network(configs, max_network_scan=args.max_network_scan)
+        listing_cache = DirectoryListingCache(args.listing_cache.resolve())
+        network_changes = sync_releases_from_network(
+            configs,
+            max_network_scan=args.max_network_scan,
+            listing_cache=listing_cache,
+            state=state,
+            timeout=args.path_timeout,
+            max_workers=args.workers,
+            health=health,
+        )
+        listing_cache.save()
+    health.save()
 
     combined_changes = changes + network_changes
 
@@ -6,24 +6,36 @@ import json
 import logging
 import subprocess
 import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Collection, Dict, Iterable, List, Optional, Set, Tuple
 
 from tp_ingest.config import IngestSettings
-from tp_ingest.product_config import load_product_configs
-
-from ingest_tp import run_ingestion
+from tp_ingest.ledger import (
+    FAILURE_STATUSES,
+    STAGE_COPIED,
+    STAGE_INGESTED,
+    STAGE_PARSED,
+    TERMINAL_STAGES,
+    ScannerLedger,
+)
+from tp_ingest.listing import DirectoryListingCache
+from tp_ingest.persistence import MongoWriter
+from tp_ingest.product_config import ProductCatalog, load_product_catalog
+from tp_ingest.scheduling import ScheduledTP, score_product_candidates
+from tp_ingest import models
+
+from ingest_tp import create_writer, run_ingestion
 from report_shims import ensure_minimal_reports
 from update_products_json import update_products_json
 
 StateDict = Dict[str, Dict[str, Dict[str, Dict[str, str]]]]
-FAILURE_STATUSES = {
-    "network-unavailable",
-    "copy-timeout",
-    "copy-failed",
-    "ingest-failed",
-}
+
+# Watch mode polls products that released within RECENT_RELEASE_DAYS at the minimum
+# interval and backs off to the maximum for products dormant DORMANT_RELEASE_DAYS or more.
+RECENT_RELEASE_DAYS = 3.0
+DORMANT_RELEASE_DAYS = 30.0
 
 
 def _now_iso() -> str:
@@ -43,11 +55,6 @@ def load_state(path: Path) -> StateDict:
     return _default_state()
 
 
-def save_state(path: Path, state: StateDict) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(state, indent=2), encoding="utf-8")
-
-
 def _append_json_line(path: Path, payload: Dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("a", encoding="utf-8") as handle:
@@ -55,31 +62,14 @@ def _append_json_line(path: Path, payload: Dict[str, Any]) -> None:
         handle.write("\n")
 
 
-def _sorted_directories(network_path: Path) -> List[Path]:
-    candidates: List[tuple[float, Path]] = []
-    try:
-        for child in network_path.iterdir():
-            if not child.is_dir():
-                continue
-            try:
-                mtime = child.stat().st_mtime
-            except OSError:
-                mtime = 0.0
-            candidates.append((mtime, child))
-    except OSError as exc:
-        raise FileNotFoundError(f"Unable to enumerate {network_path}: {exc}") from exc
-    candidates.sort(key=lambda item: item[0], reverse=True)
-    return [entry for _, entry in candidates]
-
-
 def _select_new_directories(
     dirs: Iterable[Path],
-    processed: Dict[str, Dict[str, str]],
+    processed: Collection[str],
     max_per_product: Optional[int],
     force: bool,
 ) -> List[Path]:
     selected: List[Path] = []
-    processed_names = set(processed.keys())
+    processed_names = set(processed)
     for candidate in dirs:
         if not force and candidate.name in processed_names:
             continue
@@ -112,22 +102,14 @@ def _run_copy_script(
     return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, check=False)
 
 
-def _update_product_state(
-    state: StateDict,
-    product_key: str,
-    tp_name: str,
-    *,
-    git_hash: Optional[str],
-    mongo_id: Optional[str],
-) -> None:
-    product_bucket = state.setdefault("products", {}).setdefault(product_key, {})
-    processed = product_bucket.setdefault("processed_tps", {})
-    processed[tp_name] = {
-        "last_processed": _now_iso(),
-        "git_hash": git_hash or "unknown",
-        "mongo_doc_id": mongo_id or "unknown",
-    }
-    product_bucket["last_scan"] = _now_iso()
+def open_ledger(ledger_path: Path, legacy_state_path: Optional[Path] = None) -> ScannerLedger:
+    """Open the scanner ledger, seeding it from the legacy JSON state on first use."""
+    ledger = ScannerLedger(ledger_path)
+    if legacy_state_path and legacy_state_path.exists() and ledger.is_empty():
+        imported = ledger.import_state(load_state(legacy_state_path))
+        if imported:
+            logging.info("Imported %s processed TPs from %s into %s", imported, legacy_state_path, ledger_path)
+    return ledger
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -151,11 +133,34 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Override TP root directory (defaults to settings-derived Test Programs).",
     )
+    parser.add_argument(
+        "--parquet-root",
+        type=Path,
+        default=None,
+        help="Also export each ingested TP's datasets as Parquet under this directory (requires pyarrow).",
+    )
+    parser.add_argument(
+        "--ledger",
+        type=Path,
+        default=default_root / "state" / "daily_scanner.db",
+        help="SQLite ledger tracking processed TPs, job attempts, and alerts.",
+    )
     parser.add_argument(
         "--state-file",
         type=Path,
         default=default_root / "state" / "daily_scanner_state.json",
-        help="File used to track which TP folders have already been ingested.",
+        help="Legacy JSON state imported into the ledger the first time it is opened.",
+    )
+    parser.add_argument(
+        "--listing-cache",
+        type=Path,
+        default=default_root / "state" / "network_listings.json",
+        help="Cache of the last TP folder listing per NetworkPath, used to skip re-stat-ing known folders.",
+    )
+    parser.add_argument(
+        "--refresh-listings",
+        action="store_true",
+        help="Ignore cached listings and stat every TP folder on each NetworkPath again.",
     )
     parser.add_argument(
         "--copy-script",
@@ -217,7 +222,12 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--force",
         action="store_true",
-        help="Reprocess TP folders even if they were recorded in the state file.",
+        help="Reprocess TP folders even if they were recorded in the ledger.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume the most recent interrupted run, skipping TPs it finished and reusing completed copies.",
     )
     parser.add_argument(
         "--log-file",
@@ -231,6 +241,42 @@ def build_parser() -> argparse.ArgumentParser:
         default=default_root / "state" / "daily_scanner_alerts.jsonl",
         help="File where failed ingests are recorded for downstream alerting.",
     )
+    parser.add_argument(
+        "--order",
+        choices=("priority", "mtime"),
+        default="priority",
+        help="Ingest order: 'priority' scores TPs by LatestTP, milestone/revision and recent user queries; "
+        "'mtime' keeps the legacy per-product newest-first order.",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="Stop starting new TP ingests after this many minutes; remaining TPs are left for the next run.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Run continuously, polling each NetworkPath on an adaptive interval instead of a single pass.",
+    )
+    parser.add_argument(
+        "--min-poll-interval",
+        type=float,
+        default=300.0,
+        help="Watch mode: seconds between polls for products that released recently.",
+    )
+    parser.add_argument(
+        "--max-poll-interval",
+        type=float,
+        default=3600.0,
+        help="Watch mode: seconds between polls for dormant products.",
+    )
+    parser.add_argument(
+        "--max-cycles",
+        type=int,
+        default=None,
+        help="Watch mode: stop after this many polling cycles (runs until interrupted by default).",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -239,31 +285,87 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def main() -> None:
-    parser = build_parser()
-    args = parser.parse_args()
-    logging.basicConfig(
-        level=logging.DEBUG if args.verbose else logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-    )
+@dataclass
+class ScannerContext:
+    """Resources shared by every scan pass, kept warm across cycles in --watch mode."""
+
+    args: argparse.Namespace
+    settings: IngestSettings
+    product_config_path: Path
+    copy_script: Path
+    ledger: ScannerLedger
+    ledger_path: Path
+    listing_cache: DirectoryListingCache
+    log_path: Optional[Path] = None
+    alerts_path: Optional[Path] = None
+    _writer: Optional[MongoWriter] = field(default=None, init=False, repr=False)
+
+    def product_configs(self) -> ProductCatalog:
+        """Parsed Products.json; the loader re-parses it only when the file changes on disk."""
+        return load_product_catalog(self.product_config_path)
+
+    def writer(self) -> Optional[MongoWriter]:
+        """Shared Mongo writer, opened on first use (None when nothing is persisted)."""
+        if self.args.dry_run or self.args.no_persist:
+            return None
+        if self._writer is None:
+            self._writer = create_writer(self.settings.mongo)
+        return self._writer
+
+    def query_activity(self) -> Dict[str, datetime]:
+        """Last user query time per product code; empty when Mongo is not in use or unreachable."""
+        writer = self.writer()
+        if writer is None:
+            return {}
+        try:
+            return writer.product_query_activity()
+        except Exception as exc:  # pylint: disable=broad-except
+            logging.warning("Unable to read product query activity: %s", exc)
+            return {}
 
-    repo_root = args.repo_root.resolve()
-    settings = IngestSettings.from_env(repo_root=repo_root)
-    if args.tp_root:
-        settings.tp_root = args.tp_root.resolve()
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self.listing_cache.save()
+        self.ledger.close()
 
-    product_config_path = args.product_config.resolve()
-    copy_script = args.copy_script.resolve()
-    if not copy_script.exists():
-        raise FileNotFoundError(f"Copy script not found at {copy_script}")
-    log_path = args.log_file.resolve() if args.log_file else None
-    alerts_path = args.alerts_file.resolve() if args.alerts_file else None
+
+def run_scan(
+    context: ScannerContext,
+    *,
+    product_codes: Optional[Collection[str]] = None,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """Run one scan/copy/ingest pass and return its summary.
+
+    *product_codes* restricts the pass to those products (``--product-codes`` otherwise).
+    """
+    args = context.args
+    settings = context.settings
+    ledger = context.ledger
+    log_path = context.log_path
+    alerts_path = context.alerts_path
     max_retries = max(1, args.max_retries)
     retry_delay = max(0, args.retry_delay)
-
-    configs = load_product_configs(product_config_path)
-    filter_codes = {code.upper() for code in args.product_codes} if args.product_codes else None
-    state = load_state(args.state_file.resolve())
+    started = _now_iso()
+    if product_codes is not None:
+        filter_codes: Optional[set[str]] = {code.upper() for code in product_codes}
+    else:
+        filter_codes = {code.upper() for code in args.product_codes} if args.product_codes else None
+
+    run_id: Optional[int] = None
+    resumed_stages: Dict[Tuple[str, str], str] = {}
+    if not args.dry_run:
+        if resume:
+            run_id = ledger.latest_interrupted_run()
+            if run_id is None:
+                logging.info("No interrupted run recorded in %s; starting a new run", context.ledger_path)
+            else:
+                resumed_stages = ledger.run_stages(run_id)
+                logging.info("Resuming run %s with %s TP checkpoints", run_id, len(resumed_stages))
+        if run_id is None:
+            run_id = ledger.start_run(vars(args))
 
     results: List[Dict[str, Any]] = []
     alerts: List[Dict[str, Any]] = []
@@ -274,21 +376,37 @@ def main() -> None:
         payload["final_attempt"] = final
         if log_path:
             _append_json_line(log_path, payload)
+        if not args.dry_run:
+            ledger.record_attempt(payload)
         if final:
             results.append(payload)
             if payload.get("status") in FAILURE_STATUSES:
                 alerts.append(payload)
+                if not args.dry_run:
+                    ledger.record_alert(payload)
                 if alerts_path:
                     _append_json_line(alerts_path, payload)
 
+    priority = args.order == "priority"
+    query_activity = context.query_activity() if priority else {}
+    deadline = time.monotonic() + args.time_budget * 60 if args.time_budget else None
+    queue: List[Tuple[models.ProductConfig, ScheduledTP]] = []
+
     total_ingest_attempts = 0
-    for config in configs:
+    ingested = 0
+    products: Dict[str, Dict[str, Any]] = {}
+    for config in context.product_configs():
         product_code = (config.product_code or "UNKNOWN").upper()
-        if filter_codes and product_code not in filter_codes:
+        if filter_codes is not None and product_code not in filter_codes:
             continue
         network_path = Path(config.network_path)
+        processed = ledger.processed_tp_names(product_code)
         try:
-            directories = _sorted_directories(network_path)
+            listing = context.listing_cache.list_share(
+                network_path,
+                known_names=processed,
+                refresh=args.refresh_listings,
+            )
         except FileNotFoundError as exc:
             logging.error("Skipping %s: %s", product_code, exc)
             record_entry(
@@ -301,44 +419,86 @@ def main() -> None:
                 final=True,
             )
             continue
+        products[product_code] = {
+            "latest_release": listing.latest_mtime,
+            "new_tps": len(listing.new_names),
+        }
+        directories = listing.directories
         if args.max_network_scan is not None:
             directories = directories[: args.max_network_scan]
 
-        product_bucket = state.setdefault("products", {}).setdefault(product_code, {})
-        processed = product_bucket.setdefault("processed_tps", {})
-        candidates = _select_new_directories(directories, processed, args.max_per_product, args.force)
-        if not candidates:
+        finished = {
+            tp_name
+            for (code, tp_name), stage in resumed_stages.items()
+            if code == product_code and stage in TERMINAL_STAGES
+        }
+        if finished:
+            directories = [directory for directory in directories if directory.name not in finished]
+        product_candidates: List[ScheduledTP]
+        if priority:
+            product_candidates = score_product_candidates(
+                product_code,
+                _select_new_directories(directories, processed, None, args.force),
+                latest_tp=config.latest_tp,
+                last_queried=query_activity.get(product_code),
+            )
+            if args.max_per_product is not None:
+                product_candidates = product_candidates[: args.max_per_product]
+        else:
+            product_candidates = [
+                ScheduledTP(product_code=product_code, path=directory)
+                for directory in _select_new_directories(directories, processed, args.max_per_product, args.force)
+            ]
+        if not product_candidates:
             logging.info("No new TP folders detected for %s", product_code)
             continue
+        queue.extend((config, candidate) for candidate in product_candidates)
 
-        for directory in candidates:
-            if args.limit is not None and total_ingest_attempts >= args.limit:
-                break
-            tp_name = directory.name
-            entry_base: Dict[str, Any] = {
-                "product_code": product_code,
-                "product_name": config.product_name,
-                "tp_name": tp_name,
-                "network_path": str(directory),
-            }
-            if args.dry_run:
-                dry_entry = dict(entry_base)
-                dry_entry["status"] = "dry-run"
-                record_entry(dry_entry, final=True)
-                continue
+    if priority:
+        queue.sort(key=lambda item: item[1].score, reverse=True)
 
-            total_ingest_attempts += 1
-            dest_path = settings.tp_root / tp_name
-            attempt = 0
-            success = False
-            while attempt < max_retries:
-                attempt += 1
-                attempt_entry = dict(entry_base)
-                attempt_entry["attempt"] = attempt
-                attempt_entry["max_retries"] = max_retries
+    deferred = 0
+    for position, (config, scheduled) in enumerate(queue):
+        if args.limit is not None and total_ingest_attempts >= args.limit:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            deferred = len(queue) - position
+            logging.info("Time budget exhausted; deferring %s queued TP(s) to the next run", deferred)
+            break
+        product_code = scheduled.product_code
+        directory = scheduled.path
+        tp_name = directory.name
+        entry_base: Dict[str, Any] = {
+            "product_code": product_code,
+            "product_name": config.product_name,
+            "tp_name": tp_name,
+            "network_path": str(directory),
+        }
+        if priority:
+            entry_base["priority_score"] = scheduled.score
+            entry_base["priority_reasons"] = scheduled.reasons
+        if args.dry_run:
+            dry_entry = dict(entry_base)
+            dry_entry["status"] = "dry-run"
+            record_entry(dry_entry, final=True)
+            continue
+
+        total_ingest_attempts += 1
+        dest_path = settings.tp_root / tp_name
+        attempt = 0
+        success = False
+        while attempt < max_retries:
+            attempt += 1
+            attempt_entry = dict(entry_base)
+            attempt_entry["attempt"] = attempt
+            attempt_entry["max_retries"] = max_retries
+            if resumed_stages.get((product_code, tp_name)) == STAGE_COPIED and dest_path.exists():
+                logging.info("Reusing copy of %s from interrupted run %s", tp_name, run_id)
+                attempt_entry["copy_reused"] = True
+            else:
                 try:
                     copy_result = _run_copy_script(
-                        copy_script,
+                        context.copy_script,
                         source=directory,
                         destination=dest_path,
                         timeout=args.copy_timeout,
@@ -369,74 +529,212 @@ def main() -> None:
                         break
                     time.sleep(retry_delay)
                     continue
+                ledger.checkpoint(run_id, product_code, tp_name, STAGE_COPIED)
 
-                # Some TP drops are missing required report artifacts. Generate minimal stubs
-                # so ingestion can proceed (never overwrites non-empty files).
-                shim_messages: List[str] = []
-                try:
-                    shim_messages = ensure_minimal_reports(dest_path, tp_name=tp_name)
-                except Exception as exc:  # pylint: disable=broad-except
-                    shim_messages = [f"Report shim generation failed: {exc}"]
-                if shim_messages:
-                    attempt_entry["shim_reports"] = shim_messages
+            # Some TP drops are missing required report artifacts. Generate minimal stubs
+            # so ingestion can proceed (never overwrites non-empty files).
+            shim_messages: List[str] = []
+            try:
+                shim_messages = ensure_minimal_reports(dest_path, tp_name=tp_name)
+            except Exception as exc:  # pylint: disable=broad-except
+                shim_messages = [f"Report shim generation failed: {exc}"]
+            if shim_messages:
+                attempt_entry["shim_reports"] = shim_messages
 
-                try:
-                    payload = run_ingestion(
-                        tp_name=tp_name,
-                        settings=settings,
-                        git_hash=None,
-                        no_persist=args.no_persist,
-                        product_config_path=product_config_path,
-                        product_code=config.product_code,
-                    )
-                except Exception as exc:  # pylint: disable=broad-except
-                    attempt_entry["status"] = "ingest-failed"
-                    attempt_entry["error"] = str(exc)
-                    final = attempt >= max_retries
-                    record_entry(attempt_entry, final=final)
-                    logging.exception("Ingestion failed for %s (attempt %s)", tp_name, attempt)
-                    if final or retry_delay == 0:
-                        break
-                    time.sleep(retry_delay)
-                    continue
+            try:
+                payload = run_ingestion(
+                    tp_name=tp_name,
+                    settings=settings,
+                    git_hash=None,
+                    no_persist=args.no_persist,
+                    product_config_path=context.product_config_path,
+                    product_code=config.product_code,
+                    product_configs=context.product_configs(),
+                    writer=context.writer(),
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                attempt_entry["status"] = "ingest-failed"
+                attempt_entry["error"] = str(exc)
+                final = attempt >= max_retries
+                record_entry(attempt_entry, final=final)
+                logging.exception("Ingestion failed for %s (attempt %s)", tp_name, attempt)
+                if final or retry_delay == 0:
+                    break
+                time.sleep(retry_delay)
+                continue
 
-                attempt_entry["status"] = "ingested" if not args.no_persist else "parsed"
-                attempt_entry["git_hash"] = payload.get("git_hash")
-                attempt_entry["mongo_doc_id"] = payload.get("mongo_doc_id")
-                attempt_entry["warnings"] = payload.get("warnings", [])
-                record_entry(attempt_entry, final=True)
-                success = True
-                if not args.no_persist:
-                    _update_product_state(
-                        state,
-                        product_code,
-                        tp_name,
-                        git_hash=attempt_entry.get("git_hash"),
-                        mongo_id=attempt_entry.get("mongo_doc_id"),
-                    )
-                break
-            if not success:
-                logging.error("Max retries reached for %s", tp_name)
-        if args.limit is not None and total_ingest_attempts >= args.limit:
+            attempt_entry["status"] = "ingested" if not args.no_persist else "parsed"
+            attempt_entry["git_hash"] = payload.get("git_hash")
+            attempt_entry["mongo_doc_id"] = payload.get("mongo_doc_id")
+            attempt_entry["warnings"] = payload.get("warnings", [])
+            record_entry(attempt_entry, final=True)
+            success = True
+            ingested += 1
+            if not args.no_persist:
+                ledger.record_processed(
+                    product_code,
+                    tp_name,
+                    git_hash=attempt_entry.get("git_hash"),
+                    mongo_id=attempt_entry.get("mongo_doc_id"),
+                    product_name=config.product_name,
+                )
+            ledger.checkpoint(
+                run_id,
+                product_code,
+                tp_name,
+                STAGE_PARSED if args.no_persist else STAGE_INGESTED,
+            )
             break
-
-    if not args.dry_run and not args.no_persist:
-        save_state(args.state_file.resolve(), state)
-        # Auto-update Products.json with latest TP info from state
-        update_products_json(product_config_path, args.state_file.resolve())
-
-    summary = {
-        "run_started": _now_iso(),
+        if not success:
+            logging.error("Max retries reached for %s", tp_name)
+
+    if not args.dry_run and not args.no_persist and (ingested or not args.watch):
+        # Auto-update Products.json with latest TP info from the ledger
+        update_products_json(context.product_config_path, context.ledger_path)
+    context.listing_cache.save()
+    if run_id is not None:
+        ledger.finish_run(run_id)
+
+    return {
+        "run_started": started,
         "results": results,
         "alerts": alerts,
         "ingest_attempts": total_ingest_attempts,
         "dry_run": args.dry_run,
         "persisted": not args.no_persist,
-        "state_file": str(args.state_file.resolve()),
+        "ledger": str(context.ledger_path),
+        "run_id": run_id,
+        "resumed": bool(resumed_stages),
         "log_file": str(log_path) if log_path else None,
         "alerts_file": str(alerts_path) if alerts_path else None,
         "max_retries": max_retries,
+        "products": products,
+        "order": args.order,
+        "queued": len(queue),
+        "deferred": deferred,
     }
+
+
+def poll_interval(
+    latest_release: Optional[float],
+    now: float,
+    min_interval: float,
+    max_interval: float,
+) -> float:
+    """Seconds until a product's share should be polled again.
+
+    Products that released within RECENT_RELEASE_DAYS are polled every *min_interval*;
+    the interval grows linearly to *max_interval* for products dormant DORMANT_RELEASE_DAYS
+    or longer (or whose shares could not be listed).
+    """
+    if latest_release is None:
+        return max_interval
+    age_days = max(0.0, (now - latest_release) / 86400.0)
+    if age_days <= RECENT_RELEASE_DAYS:
+        return min_interval
+    if age_days >= DORMANT_RELEASE_DAYS:
+        return max_interval
+    fraction = (age_days - RECENT_RELEASE_DAYS) / (DORMANT_RELEASE_DAYS - RECENT_RELEASE_DAYS)
+    return min_interval + fraction * (max_interval - min_interval)
+
+
+def watch(context: ScannerContext) -> None:
+    """Poll each product's NetworkPath on an adaptive interval until interrupted."""
+    args = context.args
+    min_interval = max(1.0, float(args.min_poll_interval))
+    max_interval = max(min_interval, float(args.max_poll_interval))
+    filter_codes = {code.upper() for code in args.product_codes} if args.product_codes else None
+    next_due: Dict[str, float] = {}
+    resume = args.resume
+    cycles = 0
+    codes: Set[str] = set()
+    while args.max_cycles is None or cycles < args.max_cycles:
+        try:
+            codes = {
+                (config.product_code or "UNKNOWN").upper()
+                for config in context.product_configs()
+                if config.network_path
+            }
+        except (OSError, ValueError):
+            logging.exception("Unable to read %s; keeping the previous product list", context.product_config_path)
+        if filter_codes:
+            codes &= filter_codes
+        now = time.time()
+        due = sorted(code for code in codes if next_due.get(code, 0.0) <= now)
+        if due:
+            cycles += 1
+            try:
+                summary = run_scan(context, product_codes=due, resume=resume)
+            except Exception:  # pylint: disable=broad-except
+                # A transient failure (Mongo unreachable, ledger locked) must not end the watcher;
+                # the products are retried after the shortest interval.
+                logging.exception("Watch cycle %s failed; retrying in %ss", cycles, min_interval)
+                for code in due:
+                    next_due[code] = time.time() + min_interval
+            else:
+                resume = False
+                finished_at = time.time()
+                for code in due:
+                    info = summary["products"].get(code, {})
+                    interval = poll_interval(info.get("latest_release"), now, min_interval, max_interval)
+                    if info.get("new_tps"):
+                        interval = min_interval
+                    next_due[code] = finished_at + interval
+                logging.info(
+                    "Watch cycle %s: polled %s product(s), %s ingest attempt(s), %s alert(s)",
+                    cycles,
+                    len(due),
+                    summary["ingest_attempts"],
+                    len(summary["alerts"]),
+                )
+            if args.max_cycles is not None and cycles >= args.max_cycles:
+                break
+        pending = [next_due.get(code, 0.0) for code in codes]
+        wake_at = min(pending) if pending else time.time() + max_interval
+        time.sleep(min(max_interval, max(1.0, wake_at - time.time())))
+
+
+def main() -> None:
+    parser = build_parser()
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    repo_root = args.repo_root.resolve()
+    settings = IngestSettings.from_env(repo_root=repo_root)
+    if args.tp_root:
+        settings.tp_root = args.tp_root.resolve()
+    if args.parquet_root:
+        settings.parquet_root = args.parquet_root.resolve()
+
+    copy_script = args.copy_script.resolve()
+    if not copy_script.exists():
+        raise FileNotFoundError(f"Copy script not found at {copy_script}")
+
+    ledger_path = args.ledger.resolve()
+    context = ScannerContext(
+        args=args,
+        settings=settings,
+        product_config_path=args.product_config.resolve(),
+        copy_script=copy_script,
+        ledger=open_ledger(ledger_path, args.state_file.resolve() if args.state_file else None),
+        ledger_path=ledger_path,
+        listing_cache=DirectoryListingCache(args.listing_cache.resolve() if args.listing_cache else None),
+        log_path=args.log_file.resolve() if args.log_file else None,
+        alerts_path=args.alerts_file.resolve() if args.alerts_file else None,
+    )
+    try:
+        if args.watch:
+            try:
+                watch(context)
+            except KeyboardInterrupt:
+                logging.info("Watch mode interrupted; shutting down")
+            return
+        summary = run_scan(context, resume=args.resume)
+    finally:
+        context.close()
     print(json.dumps(summary, indent=2))
 
 
@@ -0,0 +1,79 @@
+"""Print or save an ingested TP artifact from the MongoDB blob store.
+
+Examples:
+    python Tools/fetch_artifact.py --tp-name TPX1 --path Reports/GitInfo.txt
+    python Tools/fetch_artifact.py --tp-name TPX1 --path BaseLevels.tcg --offset 0 --length 4096
+    python Tools/fetch_artifact.py --tp-name TPX1 --list
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from tp_ingest.blobs import BlobStore
+from tp_ingest.clients import get_client
+from tp_ingest.config import MongoSettings
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fetch an ingested TP artifact from the blob store.")
+    parser.add_argument("--tp-name", required=True, help="TP folder name as ingested.")
+    parser.add_argument("--git-hash", default=None, help="Ingested git hash (defaults to the latest ingest).")
+    parser.add_argument("--path", default=None, help="Artifact path relative to the TP root, e.g. Reports/GitInfo.txt.")
+    parser.add_argument("--list", action="store_true", help="List the TP's artifacts instead of fetching one.")
+    parser.add_argument("--offset", type=int, default=0, help="First byte to return.")
+    parser.add_argument("--length", type=int, default=None, help="Number of bytes to return (defaults to the rest).")
+    parser.add_argument("--output", type=Path, default=None, help="Write to this file instead of stdout.")
+    return parser
+
+
+def _latest_tp_document_id(artifacts: Any, tp_name: str, git_hash: Optional[str]) -> Optional[str]:
+    if git_hash:
+        return f"{tp_name}:{git_hash}"
+    latest = artifacts.find_one({"tp_name": tp_name}, {"tp_document_id": 1}, sort=[("ingested_at", -1)])
+    return latest.get("tp_document_id") if latest else None
+
+
+def main() -> int:
+    parser = build_parser()
+    args = parser.parse_args()
+    if not args.list and not args.path:
+        parser.error("--path is required unless --list is given")
+
+    settings = MongoSettings.from_env()
+    db = get_client(settings.uri)[settings.database]
+    artifacts = db[settings.artifacts_collection]
+    tp_document_id = _latest_tp_document_id(artifacts, args.tp_name, args.git_hash)
+    if tp_document_id is None:
+        print(f"No artifacts recorded for {args.tp_name}", file=sys.stderr)
+        return 1
+
+    if args.list:
+        for doc in artifacts.find({"tp_document_id": tp_document_id}).sort("relative_path", 1):
+            flag = "stored" if doc.get("blob_stored") else "metadata only"
+            print(f"{doc.get('relative_path')}\t{doc.get('size_bytes')}\t{flag}")
+        return 0
+
+    doc: Optional[Dict[str, Any]] = artifacts.find_one(
+        {"tp_document_id": tp_document_id, "relative_path": args.path}
+    )
+    if doc is None:
+        print(f"{args.path} is not an artifact of {tp_document_id}", file=sys.stderr)
+        return 1
+    if not doc.get("blob_stored") or not doc.get("sha256"):
+        print(f"{args.path} of {tp_document_id} was recorded without its content", file=sys.stderr)
+        return 1
+
+    store = BlobStore(db[settings.artifact_blob_collection], db[settings.artifact_chunk_collection])
+    data = store.read(doc["sha256"], args.offset, args.length)
+    if args.output:
+        args.output.write_bytes(data)
+    else:
+        sys.stdout.buffer.write(data)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
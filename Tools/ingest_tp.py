@@ -6,12 +6,13 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
+from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-from tp_ingest.config import IngestSettings
+from tp_ingest.config import IngestSettings, MongoSettings
+from tp_ingest.hvqk import collect_hvqk_configs, iter_hvqk_files
 from tp_ingest.parsers import (
     CakeAuditParser,
     IntegrationReportParser,
@@ -24,9 +25,11 @@ from tp_ingest.parsers import (
     FlowMapParser,
     VMinSearchParser,
 )
+from tp_ingest.parquet_export import export_tp_datasets
 from tp_ingest.persistence import MongoWriter
+from tp_ingest.snapshot import ParsedTP, SnapshotCache, fingerprint
 from tp_ingest import models
-from tp_ingest.product_config import find_product_config, load_product_configs
+from tp_ingest.product_config import find_product_config, load_product_catalog
 
 
 IMPORTANT_ARTIFACTS = {
@@ -53,22 +56,6 @@ GIT_INFO_CANDIDATES = (
     Path("Reports") / "GitReportInfo.txt",
 )
 
-HVQK_SUFFIX = ".hvqk.config.json"
-
-
-def _iter_hvqk_files(tp_dir: Path) -> Iterable[Tuple[str, Path]]:
-    modules_dir = tp_dir / "Modules"
-    if not modules_dir.exists():
-        return
-    module_dirs = sorted((p for p in modules_dir.iterdir() if p.is_dir()), key=lambda p: p.name.lower())
-    for module_dir in module_dirs:
-        input_dir = module_dir / "InputFiles"
-        if not input_dir.is_dir():
-            continue
-        for file_path in input_dir.rglob(f"*{HVQK_SUFFIX}"):
-            if file_path.is_file():
-                yield module_dir.name, file_path
-
 
 def collect_artifact_references(tp_dir: Path) -> List[models.ArtifactReference]:
     references: List[models.ArtifactReference] = []
@@ -83,7 +70,7 @@ def collect_artifact_references(tp_dir: Path) -> List[models.ArtifactReference]:
         try:
             size = path.stat().st_size
         except OSError:
-            size = 0
+            pass
         references.append(
             models.ArtifactReference(
                 name=path.name,
@@ -105,42 +92,12 @@ def collect_artifact_references(tp_dir: Path) -> List[models.ArtifactReference]:
             if child.is_file():
                 _register(child, "report-extra")
 
-    for _module_name, hvqk_path in _iter_hvqk_files(tp_dir):
+    for _module_name, hvqk_path in iter_hvqk_files(tp_dir):
         _register(hvqk_path, "hvqk-config")
 
     return references
 
 
-def collect_hvqk_configs(tp_dir: Path) -> List[models.HVQKConfigEntry]:
-    entries: List[models.HVQKConfigEntry] = []
-    for module_name, file_path in _iter_hvqk_files(tp_dir):
-        try:
-            raw_bytes = file_path.read_bytes()
-        except OSError:
-            continue
-        digest = hashlib.sha256(raw_bytes).hexdigest()
-        size = len(raw_bytes)
-        try:
-            text = raw_bytes.decode("utf-8")
-        except UnicodeDecodeError:
-            text = raw_bytes.decode("utf-8", errors="ignore")
-        try:
-            config_payload: Dict[str, Any] = json.loads(text)
-        except json.JSONDecodeError as exc:
-            config_payload = {"__parse_error__": str(exc)}
-        entries.append(
-            models.HVQKConfigEntry(
-                module_name=module_name,
-                file_name=file_path.name,
-                relative_path=file_path.relative_to(tp_dir).as_posix(),
-                size_bytes=size,
-                sha256=digest,
-                config=config_payload,
-            )
-        )
-    return entries
-
-
 def build_tp_metadata(
     product: Optional[models.ProductConfig],
     integration: models.IntegrationReport,
@@ -186,6 +143,101 @@ def read_git_hash(tp_dir: Path, fallback: str = "unknown") -> str:
     return fallback
 
 
+def snapshot_inputs(tp_dir: Path, report_path: Path) -> List[Path]:
+    """Every file whose content can change the result of :func:`parse_tp`."""
+    inputs: List[Path] = [tp_dir / relative for relative in IMPORTANT_ARTIFACTS]
+    reports_dir = report_path.parent
+    if reports_dir.is_dir():
+        inputs.extend(child for child in reports_dir.iterdir() if child.is_file())
+    modules_dir = tp_dir / "Modules"
+    if modules_dir.is_dir():
+        inputs.extend(modules_dir.rglob("*.mtpl"))
+        inputs.extend(path for _module_name, path in iter_hvqk_files(tp_dir))
+    return inputs
+
+
+def parse_tp(
+    tp_dir: Path,
+    report_path: Path,
+    *,
+    csv_engine: str = "python",
+    known_hvqk_blobs: Optional[Callable[[Iterable[str]], Set[str]]] = None,
+) -> ParsedTP:
+    """Run every parser over one TP folder.
+
+    *csv_engine* selects how the large PAS and PortLevel CSVs are read (``"python"`` or
+    ``"pandas"``); both produce the same records.  *known_hvqk_blobs* is passed to
+    :func:`collect_hvqk_configs`.
+    """
+    reports_dir = report_path.parent
+    return ParsedTP(
+        integration=IntegrationReportParser().parse(report_path),
+        pas=PASReportParser(engine=csv_engine).parse(reports_dir / "PASReport.csv"),
+        plist=PlistMasterParser().parse(reports_dir / "plist_master.csv"),
+        cake=CakeAuditParser().parse(reports_dir / "CAKEVADTLAudit.csv"),
+        vmin=VMinSearchParser().parse(reports_dir / "VMinSearchAudit.csv"),
+        scoreboard=ScoreboardParser().parse(reports_dir / "ScoreBoard_Report.csv"),
+        module_summary=ModuleSummaryParser().parse(reports_dir / "PASReport_ModuleSummary.csv"),
+        port_results=PortResultsParser(engine=csv_engine).parse(reports_dir / "PASReport_PortLevel.csv"),
+        flow_map=FlowMapParser().parse(reports_dir / "StartItemList.csv"),
+        setpoints=SetpointsParser().parse(tp_dir / "Modules"),
+        artifacts=collect_artifact_references(tp_dir),
+        hvqk_configs=collect_hvqk_configs(tp_dir, known_hvqk_blobs),
+    )
+
+
+def load_parsed_tp(
+    tp_dir: Path,
+    report_path: Optional[Path] = None,
+    *,
+    snapshot_dir: Optional[Path] = None,
+    csv_engine: str = "python",
+    known_hvqk_blobs: Optional[Callable[[Iterable[str]], Set[str]]] = None,
+) -> Tuple[ParsedTP, bool]:
+    """Parse *tp_dir*, reusing a snapshot from *snapshot_dir* when its inputs are unchanged.
+
+    Returns the parsed TP and whether it came from the snapshot cache.  *known_hvqk_blobs* is
+    only used without a snapshot cache, so that stored snapshots always carry every config.
+    """
+    report_path = report_path or tp_dir / "Reports" / "Integration_Report.txt"
+    if snapshot_dir is None:
+        parsed = parse_tp(tp_dir, report_path, csv_engine=csv_engine, known_hvqk_blobs=known_hvqk_blobs)
+        return parsed, False
+    cache = SnapshotCache(snapshot_dir)
+    input_fingerprint = fingerprint(snapshot_inputs(tp_dir, report_path))
+    parsed = cache.load(tp_dir, input_fingerprint)
+    if parsed is not None:
+        return parsed, True
+    parsed = parse_tp(tp_dir, report_path, csv_engine=csv_engine)
+    cache.store(tp_dir, input_fingerprint, parsed)
+    return parsed, False
+
+
+def create_writer(mongo_settings: MongoSettings) -> MongoWriter:
+    """Open a MongoWriter for every collection configured in *mongo_settings*."""
+    return MongoWriter(
+        mongo_settings.uri,
+        mongo_settings.database,
+        mongo_settings.collection,
+        mongo_settings.test_instances_collection,
+        mongo_settings.plist_collection,
+        mongo_settings.cake_collection,
+        mongo_settings.vmin_collection,
+        mongo_settings.scoreboard_collection,
+        mongo_settings.product_collection,
+        mongo_settings.setpoints_collection,
+        mongo_settings.module_summary_collection,
+        mongo_settings.port_results_collection,
+        mongo_settings.flow_map_collection,
+        mongo_settings.artifacts_collection,
+        mongo_settings.hvqk_collection,
+        mongo_settings.query_activity_collection,
+        mongo_settings.hvqk_blob_collection,
+        mongo_settings.artifact_blob_collection,
+        mongo_settings.artifact_chunk_collection,
+    )
+
+
 def run_ingestion(
     tp_name: str,
     settings: IngestSettings,
@@ -195,7 +247,17 @@ def run_ingestion(
     no_persist: bool = False,
     product_config_path: Optional[Path] = None,
     product_code: Optional[str] = None,
+    product_configs: Optional[Sequence[models.ProductConfig]] = None,
+    writer: Optional[MongoWriter] = None,
 ) -> Dict[str, Any]:
+    """Parse one TP and (unless *no_persist*) write it to MongoDB.
+
+    When ``settings.parquet_root`` is set the normalized datasets are also exported as
+    Parquet, independently of *no_persist*, and ``settings.snapshot_dir`` enables the parsed-TP
+    snapshot cache (see :func:`load_parsed_tp`).  Long-running callers can pass already-loaded
+    *product_configs* and an open *writer* to reuse them across TPs; a caller-supplied writer is
+    left open.
+    """
     tp_dir = settings.tp_root / tp_name
     if report_path is None:
         report_path = tp_dir / "Reports" / "Integration_Report.txt"
@@ -212,10 +274,13 @@ def run_ingestion(
     product_config_path = product_config_path or (settings.repo_root / "Products.json")
     product_config: Optional[models.ProductConfig] = None
     product_warning: Optional[str] = None
-    if product_config_path:
+    if product_configs is not None:
+        product_config = find_product_config(product_configs, tp_name, product_code)
+        if product_config is None:
+            product_warning = f"No product config entry matched TP {tp_name} in {product_config_path}"
+    elif product_config_path:
         try:
-            configs = load_product_configs(product_config_path)
-            product_config = find_product_config(configs, tp_name, product_code)
+            product_config = load_product_catalog(product_config_path).find(tp_name, product_code)
             if product_config is None:
                 product_warning = (
                     f"No product config entry matched TP {tp_name} in {product_config_path}"
@@ -227,26 +292,34 @@ def run_ingestion(
 
     resolved_git_hash = git_hash or read_git_hash(tp_dir)
 
-    integration = IntegrationReportParser().parse(report_path)
-    pas_path = report_path.parent / "PASReport.csv"
-    pas_result = PASReportParser().parse(pas_path)
-    plist_path = report_path.parent / "plist_master.csv"
-    plist_result = PlistMasterParser().parse(plist_path)
-    cake_path = report_path.parent / "CAKEVADTLAudit.csv"
-    cake_result = CakeAuditParser().parse(cake_path)
-    vmin_path = report_path.parent / "VMinSearchAudit.csv"
-    vmin_result = VMinSearchParser().parse(vmin_path)
-    scoreboard_path = report_path.parent / "ScoreBoard_Report.csv"
-    scoreboard_result = ScoreboardParser().parse(scoreboard_path)
-    module_summary_path = report_path.parent / "PASReport_ModuleSummary.csv"
-    module_summary_result = ModuleSummaryParser().parse(module_summary_path)
-    port_results_path = report_path.parent / "PASReport_PortLevel.csv"
-    port_results_result = PortResultsParser().parse(port_results_path)
-    flow_map_path = report_path.parent / "StartItemList.csv"
-    flow_map_result = FlowMapParser().parse(flow_map_path)
-    setpoints_result = SetpointsParser().parse(tp_dir / "Modules")
-    artifacts = collect_artifact_references(tp_dir)
-    hvqk_configs = collect_hvqk_configs(tp_dir)
+    owns_writer = False
+    if not no_persist and writer is None:
+        writer = create_writer(settings.mongo)
+        owns_writer = True
+    try:
+        parsed, from_snapshot = load_parsed_tp(
+            tp_dir,
+            report_path,
+            snapshot_dir=settings.snapshot_dir,
+            csv_engine=settings.csv_engine,
+            known_hvqk_blobs=None if no_persist else writer.known_hvqk_blobs,
+        )
+    except BaseException:
+        if owns_writer:
+            writer.close()
+        raise
+    integration = parsed.integration
+    pas_result = parsed.pas
+    plist_result = parsed.plist
+    cake_result = parsed.cake
+    vmin_result = parsed.vmin
+    scoreboard_result = parsed.scoreboard
+    module_summary_result = parsed.module_summary
+    port_results_result = parsed.port_results
+    flow_map_result = parsed.flow_map
+    setpoints_result = parsed.setpoints
+    artifacts = parsed.artifacts
+    hvqk_configs = parsed.hvqk_configs
     metadata = build_tp_metadata(
         product=product_config,
         integration=integration,
@@ -257,18 +330,18 @@ def run_ingestion(
     payload: Dict[str, Any] = {
         "tp_name": tp_name,
         "git_hash": resolved_git_hash,
-        "program": integration.program.__dict__,
+        "program": asdict(integration.program),
         "environment": {
             "prime_rev": integration.environment.prime_rev,
             "fuse_file_rev": integration.environment.fuse_file_rev,
-            "pattern_revs": [rev.__dict__ for rev in integration.environment.pattern_revs],
+            "pattern_revs": [asdict(rev) for rev in integration.environment.pattern_revs],
         },
-        "shared_components": [component.__dict__ for component in integration.shared_components],
-        "tp_modules": [component.__dict__ for component in integration.tp_modules],
+        "shared_components": [asdict(component) for component in integration.shared_components],
+        "tp_modules": [asdict(component) for component in integration.tp_modules],
         "flows_raw_keys": list(integration.flows_raw.keys()),
         "flow_table_count": len(integration.flow_tables),
         "dll_inventory_count": len(integration.dll_inventory),
-        "dll_sample": [entry.__dict__ for entry in integration.dll_inventory[:5]],
+        "dll_sample": [asdict(entry) for entry in integration.dll_inventory[:5]],
         "pas_records_count": len(pas_result.records),
         "plist_entries_count": len(plist_result.entries),
         "cake_audit_count": len(cake_result.entries),
@@ -289,6 +362,8 @@ def run_ingestion(
         "dll_summary": metadata.dll_summary,
         "gsds_mappings": metadata.gsds_mappings,
     }
+    if settings.snapshot_dir is not None:
+        payload["parsed_from_snapshot"] = from_snapshot
     warnings: List[str] = []
     warnings.extend(integration.warnings)
     warnings.extend(pas_result.warnings)
@@ -304,30 +379,32 @@ def run_ingestion(
         warnings.append(product_warning)
     payload["warnings"] = warnings
 
+    if settings.parquet_root is not None:
+        payload["parquet_rows"] = export_tp_datasets(
+            settings.parquet_root,
+            tp_name=tp_name,
+            git_hash=resolved_git_hash,
+            product_code=metadata.product_code,
+            datasets={
+                "test_instances": pas_result.records,
+                "port_results": port_results_result.entries,
+                "module_summary": module_summary_result.entries,
+                "flow_map": flow_map_result.entries,
+                "scoreboard": scoreboard_result.entries,
+                "vmin_search": vmin_result.records,
+                "setpoints": setpoints_result.entries,
+                "plist": plist_result.entries,
+                "cake_audit": cake_result.entries,
+            },
+        )
+
     if not no_persist:
-        mongo_settings = settings.mongo
         artifact = models.IngestArtifact(
             tp_name=tp_name,
             git_hash=resolved_git_hash,
             report=integration,
             metadata=metadata,
         )
-        writer = MongoWriter(
-            mongo_settings.uri,
-            mongo_settings.database,
-            mongo_settings.collection,
-            mongo_settings.test_instances_collection,
-            mongo_settings.plist_collection,
-            mongo_settings.cake_collection,
-            mongo_settings.vmin_collection,
-            mongo_settings.scoreboard_collection,
-            mongo_settings.product_collection,
-            mongo_settings.setpoints_collection,
-            mongo_settings.module_summary_collection,
-            mongo_settings.port_results_collection,
-            mongo_settings.flow_map_collection,
-            mongo_settings.artifacts_collection,
-        )
         doc_id = writer.write_ingest_artifact(artifact)
         product_code_value = metadata.product_code
         module_lookup = writer.write_module_summary_entries(
@@ -379,6 +456,8 @@ def run_ingestion(
             resolved_git_hash,
             artifacts,
             product_code=product_code_value,
+            tp_dir=tp_dir,
+            blob_max_bytes=settings.artifact_blob_max_bytes,
         )
         hvqk_rows = writer.write_hvqk_configs(
             tp_name,
@@ -389,7 +468,8 @@ def run_ingestion(
         product_doc_id: Optional[str] = None
         if product_config:
             product_doc_id = writer.upsert_product_config(product_config)
-        writer.close()
+        if owns_writer:
+            writer.close()
         payload["mongo_doc_id"] = doc_id
         payload["test_instances_persisted"] = len(pas_result.records)
         payload["pas_records_persisted"] = payload["test_instances_persisted"]
@@ -444,6 +524,24 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Optional product code override when selecting the product config entry.",
     )
+    parser.add_argument(
+        "--parquet-root",
+        type=Path,
+        default=None,
+        help="Also export the parsed datasets as Parquet under this directory (requires pyarrow).",
+    )
+    parser.add_argument(
+        "--snapshot-cache",
+        type=Path,
+        default=None,
+        help="Directory of parsed-TP snapshots; unchanged TPs are loaded instead of re-parsed.",
+    )
+    parser.add_argument(
+        "--csv-engine",
+        choices=("python", "pandas"),
+        default=None,
+        help="Reader for PASReport.csv and PASReport_PortLevel.csv (pandas is faster on large TPs).",
+    )
     return parser
 
 
@@ -451,6 +549,12 @@ def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
     settings = IngestSettings.from_env(repo_root=args.repo_root)
+    if args.parquet_root:
+        settings.parquet_root = args.parquet_root
+    if args.snapshot_cache:
+        settings.snapshot_dir = args.snapshot_cache
+    if args.csv_engine:
+        settings.csv_engine = args.csv_engine
     payload = run_ingestion(
         tp_name=args.tp_name,
         settings=settings,
@@ -0,0 +1,106 @@
+"""Inspect, migrate and review the MongoDB indexes declared in tp_ingest.indexes."""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from dataclasses import asdict
+from typing import Any, Dict, List
+
+from tp_ingest.clients import get_client
+from tp_ingest.config import MongoSettings
+from tp_ingest.indexes import (
+    MARKER_COLLECTION,
+    MARKER_ID,
+    SCHEMA_VERSION,
+    apply_schema,
+    collection_names,
+    declared_collections,
+    plan_changes,
+    review_indexes,
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Manage TP Front Desk MongoDB indexes.")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Create missing indexes, rebuild changed ones and record the schema version (otherwise dry run).",
+    )
+    parser.add_argument(
+        "--background",
+        action="store_true",
+        help="Request background index builds (only affects servers older than MongoDB 4.2).",
+    )
+    parser.add_argument(
+        "--review",
+        action="store_true",
+        help="Report unused, duplicate, redundant and undeclared indexes.",
+    )
+    parser.add_argument(
+        "--print-json",
+        action="store_true",
+        help="Emit the result as JSON instead of log output.",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Enable verbose logging output.",
+    )
+    return parser
+
+
+def main() -> None:
+    parser = build_parser()
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    settings = MongoSettings.from_env()
+    db = get_client(settings.uri)[settings.database]
+    collections = collection_names(settings)
+
+    marker = db[MARKER_COLLECTION].find_one({"_id": MARKER_ID}) or {}
+    if args.apply:
+        changes = apply_schema(db, collections, background=args.background)
+    else:
+        changes = plan_changes(db, collections)
+    pending = [change for change in changes if change.action != "present"]
+
+    payload: Dict[str, Any] = {
+        "database": settings.database,
+        "schema_version": SCHEMA_VERSION,
+        "recorded_version": marker.get("version"),
+        "applied": args.apply,
+        "changes": [asdict(change) for change in pending],
+    }
+    if args.review:
+        findings = review_indexes(db, declared_collections(collections))
+        payload["findings"] = [asdict(finding) for finding in findings]
+
+    if args.print_json:
+        print(json.dumps(payload, indent=2, default=str))
+        return
+
+    verb = "Applied" if args.apply else "Pending"
+    logging.info(
+        "Schema version %s (database records %s); %s %s index change(s)",
+        SCHEMA_VERSION,
+        payload["recorded_version"],
+        verb.lower(),
+        len(pending),
+    )
+    for change in pending:
+        detail = f" ({change.detail})" if change.detail else ""
+        logging.info("  %s %s.%s%s", change.action, change.collection, change.name, detail)
+    findings_payload: List[Dict[str, Any]] = payload.get("findings", [])
+    for finding in findings_payload:
+        detail = f" ({finding['detail']})" if finding["detail"] else ""
+        logging.info("  %s index %s.%s%s", finding["issue"], finding["collection"], finding["name"], detail)
+
+
+if __name__ == "__main__":
+    main()
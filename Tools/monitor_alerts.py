@@ -1,16 +1,41 @@
-"""Monitor daily scanner alert stream and trigger notifications."""
+"""Monitor daily scanner alert stream and trigger notifications.
+
+Progress is kept as a byte offset into the alerts file plus a fingerprint of the file (inode
+and a hash of its first bytes), so each run seeks straight to the unread tail.  A different
+inode or head means the file was rotated or recreated, and a file shorter than the offset was
+truncated; both restart from the beginning, after replaying the alerts that
+``compact_logs.py`` moved into segments before this monitor read them.  When the file itself
+is gone the monitor replays the segments and remembers the compaction it stopped in, so the
+next run replays only what was compacted after it.  A trailing line without a newline is
+still being written and is left for the next run.
+"""
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
-import subprocess
+import os
 import sys
+from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from tp_ingest.fileio import atomic_write_text
+from tp_ingest.logstore import SourceReplay, replay_source, segments_dir_for
+from tp_ingest.notifier import (
+    DEFAULT_ATTEMPTS,
+    DEFAULT_GROUP_BY,
+    DEFAULT_WORKERS,
+    Dispatcher,
+    ShellCommandSink,
+    build_digests,
+    load_sink,
+)
 
 DEFAULT_ALERTS = Path(__file__).resolve().parent.parent / "state" / "daily_scanner_alerts.jsonl"
 DEFAULT_STATE = Path(__file__).resolve().parent.parent / "state" / "alert_monitor_state.json"
+HEAD_BYTES = 256
 
 
 def load_state(path: Path) -> Dict[str, Any]:
@@ -19,22 +44,128 @@ def load_state(path: Path) -> Dict[str, Any]:
             return json.loads(path.read_text(encoding="utf-8"))
         except json.JSONDecodeError:
             logging.warning("State file %s is invalid JSON; starting fresh", path)
-    return {"last_line": 0}
+    return {}
 
 
 def save_state(path: Path, state: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    atomic_write_text(path, json.dumps(state, indent=2))
+
+
+def _head_digest(handle: Any, length: int) -> str:
+    handle.seek(0)
+    return hashlib.sha256(handle.read(length)).hexdigest()
 
 
-def _safe_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
-    return {k: ("" if v is None else v) for k, v in entry.items()}
+def _offset_after_lines(handle: Any, line_count: int) -> Tuple[int, int]:
+    """Byte offset just past the first *line_count* lines, and how many lines that really is."""
+    handle.seek(0)
+    offset = seen = 0
+    while seen < line_count:
+        raw = handle.readline()
+        if not raw.endswith(b"\n"):
+            break
+        offset += len(raw)
+        seen += 1
+    return offset, seen
 
 
-def notify(entry: Dict[str, Any], command: str) -> None:
-    formatted = command.format(**_safe_entry(entry))
-    logging.info("Running notify command: %s", formatted)
-    subprocess.run(formatted, shell=True, check=False)
+def resolve_start(handle: Any, stat: os.stat_result, state: Dict[str, Any]) -> Tuple[int, int, bool]:
+    """Return the byte offset to read from, the lines already processed, and whether the
+    saved position belongs to a file that has since been replaced or truncated."""
+    if "offset" not in state:
+        # State written by the line-number version of this script: find that line's offset once.
+        last_line = int(state.get("last_line", 0))
+        if not last_line:
+            return 0, 0, False
+        offset, seen = _offset_after_lines(handle, last_line)
+        if seen < last_line:
+            logging.info("Alerts file shrank (last_line=%s, current=%s); resetting pointer", last_line, seen)
+            return 0, 0, False
+        logging.info("Migrated line pointer %s to byte offset %s", last_line, offset)
+        return offset, seen, False
+
+    offset = int(state.get("offset", 0))
+    last_line = int(state.get("last_line", 0))
+    if state.get("source_id"):
+        # The saved position is inside a compacted file, so any live file is a newer one.
+        logging.info("Alerts file was recreated after compaction; reading from the start")
+        return 0, 0, True
+    if state.get("inode") and stat.st_ino and state["inode"] != stat.st_ino:
+        logging.info("Alerts file was replaced (inode %s -> %s); reading from the start", state["inode"], stat.st_ino)
+        return 0, 0, True
+    if stat.st_size < offset:
+        logging.info("Alerts file was truncated (offset=%s, size=%s); reading from the start", offset, stat.st_size)
+        return 0, 0, True
+    head_length = int(state.get("head_length", 0))
+    if head_length and _head_digest(handle, head_length) != state.get("head"):
+        logging.info("Alerts file content changed before offset %s; reading from the start", offset)
+        return 0, 0, True
+    return offset, last_line, False
+
+
+def replay_compacted(alerts_path: Path, state: Dict[str, Any], segments_dir: Path) -> SourceReplay:
+    """Alerts that were compacted out of the file before this monitor read them."""
+    if "offset" not in state or not (state.get("inode") or state.get("source_id")):
+        return SourceReplay()
+    replay = replay_source(
+        alerts_path,
+        int(state.get("inode") or 0),
+        int(state["offset"]),
+        head=state.get("head"),
+        head_length=int(state.get("head_length", 0)),
+        source_id=state.get("source_id"),
+        segments_dir=segments_dir,
+    )
+    if replay.replayed:
+        logging.info("Replayed %s alert line(s) from compacted segments in %s", replay.replayed, segments_dir)
+    return replay
+
+
+def read_new_entries(handle: Any, offset: int, first_line: int) -> Tuple[List[Dict[str, Any]], int, int]:
+    """Decode complete lines after *offset*; returns entries, the new offset and line count."""
+    handle.seek(offset)
+    entries: List[Dict[str, Any]] = []
+    line_number = first_line
+    for raw in handle:
+        if not raw.endswith(b"\n"):
+            break
+        offset += len(raw)
+        line_number += 1
+        line = raw.decode("utf-8", errors="replace").strip()
+        if not line:
+            continue
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            logging.warning("Skipping malformed alert line %s", line_number)
+    return entries, offset, line_number
+
+
+def build_dispatcher(args: argparse.Namespace) -> Optional[Dispatcher]:
+    sinks: List[Any] = [load_sink(spec) for spec in args.notify_sink]
+    if args.notify_command:
+        sinks.append(ShellCommandSink(args.notify_command, timeout=args.notify_timeout or None))
+    if not sinks:
+        return None
+    return Dispatcher(
+        sinks,
+        max_workers=args.notify_workers,
+        max_attempts=args.notify_attempts,
+        per_minute=args.notify_rate,
+    )
+
+
+def notify(entries: List[Dict[str, Any]], dispatcher: Dispatcher, group_by: List[str]) -> List[Dict[str, Any]]:
+    """Send one digest per group of *entries* and return the delivery results."""
+    digests = build_digests(entries, group_by)
+    logging.info("Dispatching %s digest(s) for %s alert(s)", len(digests), len(entries))
+    return [asdict(result) for result in dispatcher.dispatch(digests)]
+
+
+def _group_by(value: str) -> List[str]:
+    if value.strip().lower() == "none":
+        return []
+    return [part.strip() for part in value.split(",") if part.strip()]
 
 
 def summarize(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -64,12 +195,64 @@ def build_parser() -> argparse.ArgumentParser:
         "--state-file",
         type=Path,
         default=DEFAULT_STATE,
-        help="Persistent tracker for last processed line.",
+        help="Persistent tracker for the last processed byte offset.",
+    )
+    parser.add_argument(
+        "--segments-dir",
+        type=Path,
+        default=None,
+        help="Compacted segments of the alerts file (defaults to <alerts-file>.segments).",
+    )
+    parser.add_argument(
+        "--no-replay",
+        dest="replay",
+        action="store_false",
+        help="Do not replay unread alerts from compacted segments after the file was compacted.",
     )
     parser.add_argument(
         "--notify-command",
         default=None,
-        help="Optional shell command to execute per new alert (Python format placeholders allowed).",
+        help=(
+            "Optional shell command to execute per alert digest (Python format placeholders "
+            "allowed: alert fields plus count and message)."
+        ),
+    )
+    parser.add_argument(
+        "--notify-sink",
+        action="append",
+        default=[],
+        metavar="MODULE:FUNCTION",
+        help="In-process callable receiving each tp_ingest.notifier.Digest (repeatable).",
+    )
+    parser.add_argument(
+        "--digest-by",
+        type=_group_by,
+        default=list(DEFAULT_GROUP_BY),
+        help="Comma-separated alert fields to group notifications by, or 'none' for one per alert.",
+    )
+    parser.add_argument(
+        "--notify-workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Maximum notifications sent concurrently.",
+    )
+    parser.add_argument(
+        "--notify-rate",
+        type=float,
+        default=0.0,
+        help="Maximum notifications per minute to each destination (0 = unlimited).",
+    )
+    parser.add_argument(
+        "--notify-attempts",
+        type=int,
+        default=DEFAULT_ATTEMPTS,
+        help="Delivery attempts per notification before giving up.",
+    )
+    parser.add_argument(
+        "--notify-timeout",
+        type=float,
+        default=120.0,
+        help="Seconds before a notify command is killed and retried (0 = no limit).",
     )
     parser.add_argument(
         "--print-json",
@@ -99,56 +282,72 @@ def main() -> int:
 
     alerts_path = args.alerts_file.resolve()
     state_path = args.state_file.resolve()
-    state = {"last_line": 0} if args.reset else load_state(state_path)
-    last_line = int(state.get("last_line", 0))
+    state = {} if args.reset else load_state(state_path)
 
-    if not alerts_path.exists():
-        logging.info("Alerts file %s not found; nothing to do", alerts_path)
-        return 0
+    segments_dir = args.segments_dir.resolve() if args.segments_dir else segments_dir_for(alerts_path)
 
-    lines = alerts_path.read_text(encoding="utf-8").splitlines()
-    if last_line > len(lines):
-        logging.info("Alerts file shrank (last_line=%s, current=%s); resetting pointer", last_line, len(lines))
-        last_line = 0
+    if not alerts_path.exists():
+        # Compaction moved the whole file into segments and the scanner has not written since.
+        replay = replay_compacted(alerts_path, state, segments_dir) if args.replay else SourceReplay()
+        new_entries = replay.entries
+        if not new_entries:
+            logging.info("Alerts file %s not found; nothing to do", alerts_path)
+            return 0
+        last_offset = last_line = new_offset = new_last_line = 0
+        state = {
+            "offset": replay.offset,
+            "last_line": 0,
+            "inode": replay.source_inode,
+            "source_id": replay.source_id,
+        }
+    else:
+        with alerts_path.open("rb") as handle:
+            stat = os.fstat(handle.fileno())
+            last_offset, last_line, restarted = resolve_start(handle, stat, state)
+            replayed = replay_compacted(alerts_path, state, segments_dir).entries if restarted and args.replay else []
+            new_entries, new_offset, new_last_line = read_new_entries(handle, last_offset, last_line)
+            new_entries = replayed + new_entries
+            head_length = min(HEAD_BYTES, new_offset)
+            state = {
+                "offset": new_offset,
+                "last_line": new_last_line,
+                "inode": stat.st_ino,
+                "head_length": head_length,
+                "head": _head_digest(handle, head_length),
+            }
 
-    new_entries: List[Dict[str, Any]] = []
-    for idx, line in enumerate(lines, start=1):
-        if idx <= last_line:
-            continue
-        if not line.strip():
-            continue
-        try:
-            payload = json.loads(line)
-        except json.JSONDecodeError:
-            logging.warning("Skipping malformed alert line %s", idx)
-            continue
-        new_entries.append(payload)
-        if args.notify_command:
-            notify(payload, args.notify_command)
+    deliveries: List[Dict[str, Any]] = []
+    if new_entries:
+        dispatcher = build_dispatcher(args)
+        if dispatcher is not None:
+            deliveries = notify(new_entries, dispatcher, args.digest_by)
 
+    save_state(state_path, state)
     if new_entries:
         summary = summarize(new_entries)
         summary["alerts_file"] = str(alerts_path)
         summary["state_file"] = str(state_path)
         summary["last_line"] = last_line
-        summary["new_last_line"] = len(lines)
+        summary["new_last_line"] = new_last_line
+        summary["offset"] = last_offset
+        summary["new_offset"] = new_offset
+        if deliveries:
+            summary["notifications"] = deliveries
         if args.print_json:
             print(json.dumps(summary, indent=2))
         else:
             logging.info("New alerts detected: %s", summary)
-        state["last_line"] = len(lines)
-        save_state(state_path, state)
         return 1
 
-    logging.info("No new alerts (last_line=%s)", last_line)
-    state["last_line"] = len(lines)
-    save_state(state_path, state)
+    logging.info("No new alerts (last_line=%s, offset=%s)", new_last_line, new_offset)
     if args.print_json:
         print(json.dumps({
             "alerts_file": str(alerts_path),
             "state_file": str(state_path),
-            "last_line": len(lines),
-            "new_last_line": len(lines),
+            "last_line": new_last_line,
+            "new_last_line": new_last_line,
+            "offset": new_offset,
+            "new_offset": new_offset,
             "total_new_alerts": 0,
         }, indent=2))
     return 0
@@ -3,30 +3,48 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing import util as mp_util
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+from tp_ingest.clients import close_clients
 from tp_ingest.config import IngestSettings
-from tp_ingest.product_config import load_product_configs
+from tp_ingest.listing import DirectoryListingCache, sorted_directories
+from tp_ingest.persistence import MongoWriter
+from tp_ingest.product_config import ProductCatalog, load_product_catalog
 
-from ingest_tp import run_ingestion
+from ingest_tp import create_writer, run_ingestion
 
+# Rough peak parse memory per byte of report input (CSV rows become several Python objects each)
+# plus a fixed per-TP overhead, used to keep --memory-budget-mb worth of TPs parsing at once.
+PARSE_MEMORY_FACTOR = 6
+PARSE_MEMORY_BASE_MB = 64.0
 
-def _sorted_network_tp_names(network_path: str, *, max_network_scan: Optional[int] = None) -> List[str]:
+
+@dataclass
+class SeedJob:
+    """One TP ingest; *index* is the job's slot in the serial-order results list."""
+
+    index: int
+    product_code: Optional[str]
+    product_name: Optional[str]
+    tp_name: str
+    estimated_mb: float = PARSE_MEMORY_BASE_MB
+
+
+def _sorted_network_tp_names(
+    network_path: str,
+    *,
+    max_network_scan: Optional[int] = None,
+    listing_cache: Optional[DirectoryListingCache] = None,
+) -> List[str]:
     if not network_path:
         return []
-    root = Path(network_path)
-    candidates: List[tuple[float, str]] = []
-    for child in root.iterdir():
-        if not child.is_dir():
-            continue
-        try:
-            mtime = child.stat().st_mtime
-        except OSError:
-            mtime = 0.0
-        candidates.append((mtime, child.name))
-    candidates.sort(key=lambda item: item[0], reverse=True)
-    names = [name for _, name in candidates]
+    directories = sorted_directories(Path(network_path), cache=listing_cache)
+    names = [directory.name for directory in directories]
     if max_network_scan is not None:
         names = names[:max_network_scan]
     return names
@@ -56,6 +74,135 @@ def _build_tp_queue(config, include_latest: bool, history_depth: int) -> List[st
     return _dedupe_preserve_order(queue)
 
 
+def _estimate_parse_mb(tp_dir: Path) -> float:
+    reports_dir = tp_dir / "Reports"
+    total = 0
+    try:
+        for child in reports_dir.iterdir():
+            try:
+                if child.is_file():
+                    total += child.stat().st_size
+            except OSError:
+                continue
+    except OSError:
+        pass
+    return PARSE_MEMORY_BASE_MB + total * PARSE_MEMORY_FACTOR / (1024 * 1024)
+
+
+def _ingest_job(
+    job: SeedJob,
+    settings: IngestSettings,
+    *,
+    no_persist: bool,
+    product_config_path: Path,
+    product_configs: Optional[ProductCatalog] = None,
+    writer: Optional[MongoWriter] = None,
+) -> Dict[str, object]:
+    try:
+        payload = run_ingestion(
+            tp_name=job.tp_name,
+            settings=settings,
+            git_hash=None,
+            no_persist=no_persist,
+            product_config_path=product_config_path,
+            product_code=job.product_code,
+            product_configs=product_configs,
+            writer=writer,
+        )
+    except FileNotFoundError as exc:
+        return {
+            "product_code": job.product_code,
+            "product_name": job.product_name,
+            "tp_name": job.tp_name,
+            "status": "error",
+            "error": str(exc),
+        }
+    return {
+        "product_code": job.product_code,
+        "product_name": job.product_name,
+        "tp_name": job.tp_name,
+        "git_hash": payload.get("git_hash"),
+        "mongo_doc_id": payload.get("mongo_doc_id"),
+        "warnings": payload.get("warnings", []),
+    }
+
+
+# Per-process state for --workers mode, set up once by _init_worker in each pool process.
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(settings: IngestSettings, no_persist: bool, product_config_path: Path) -> None:
+    _WORKER["settings"] = settings
+    _WORKER["no_persist"] = no_persist
+    _WORKER["product_config_path"] = product_config_path
+    _WORKER["product_configs"] = load_product_catalog(product_config_path)
+    _WORKER["writer"] = None if no_persist else create_writer(settings.mongo)
+    # Pool processes exit through multiprocessing's own shutdown hooks, not atexit.
+    mp_util.Finalize(None, close_clients, exitpriority=10)
+
+
+def _worker_ingest(job: SeedJob) -> Dict[str, object]:
+    return _ingest_job(
+        job,
+        _WORKER["settings"],
+        no_persist=_WORKER["no_persist"],
+        product_config_path=_WORKER["product_config_path"],
+        product_configs=_WORKER["product_configs"],
+        writer=_WORKER["writer"],
+    )
+
+
+def _run_parallel(
+    jobs: List[SeedJob],
+    results: List[Optional[Dict[str, object]]],
+    settings: IngestSettings,
+    *,
+    workers: int,
+    memory_budget_mb: Optional[float],
+    no_persist: bool,
+    product_config_path: Path,
+) -> None:
+    """Run *jobs* on a process pool, filling *results* by job index as each TP finishes.
+
+    Jobs are started in serial order; a job is held back while the estimated memory of the
+    TPs already parsing would exceed *memory_budget_mb* (one job always runs).
+    """
+    pending = list(jobs)
+    running: Dict[Future, SeedJob] = {}
+    in_flight_mb = 0.0
+    completed = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(settings, no_persist, product_config_path),
+    ) as executor:
+        while pending or running:
+            while pending and len(running) < workers:
+                job = pending[0]
+                if (
+                    running
+                    and memory_budget_mb is not None
+                    and in_flight_mb + job.estimated_mb > memory_budget_mb
+                ):
+                    break
+                pending.pop(0)
+                running[executor.submit(_worker_ingest, job)] = job
+                in_flight_mb += job.estimated_mb
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                in_flight_mb -= job.estimated_mb
+                result = future.result()
+                results[job.index] = result
+                completed += 1
+                status = result.get("status", "ok")
+                print(
+                    f"[{completed}/{len(jobs)}] {job.product_code} {job.tp_name}: {status}",
+                    file=sys.stderr,
+                    flush=True,
+                )
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Seed multiple products and TP revisions.")
     parser.add_argument(
@@ -76,6 +223,24 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Override TP root directory (defaults to settings-derived Test Programs).",
     )
+    parser.add_argument(
+        "--parquet-root",
+        type=Path,
+        default=None,
+        help="Also export each ingested TP's datasets as Parquet under this directory (requires pyarrow).",
+    )
+    parser.add_argument(
+        "--snapshot-cache",
+        type=Path,
+        default=None,
+        help="Directory of parsed-TP snapshots; re-seeding unchanged TPs skips parsing.",
+    )
+    parser.add_argument(
+        "--csv-engine",
+        choices=("python", "pandas"),
+        default=None,
+        help="Reader for the PAS and PortLevel CSVs (pandas is faster on large TPs).",
+    )
     parser.add_argument(
         "--product-codes",
         nargs="*",
@@ -98,6 +263,12 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Optional cap on how many TP folders to consider when discovering from the network path.",
     )
+    parser.add_argument(
+        "--listing-cache",
+        type=Path,
+        default=Path(__file__).resolve().parent.parent / "state" / "network_listings.json",
+        help="NetworkPath listing cache shared with daily_scanner and config_service.",
+    )
     parser.add_argument(
         "--skip-latest",
         action="store_true",
@@ -114,6 +285,18 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Optional cap on the number of TP ingests to run across all products.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes ingesting TPs in parallel (1 runs serially in-process).",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=float,
+        default=None,
+        help="With --workers, cap the estimated memory of TPs parsing at once (estimated from report sizes).",
+    )
     return parser
 
 
@@ -123,20 +306,33 @@ def main() -> None:
     settings = IngestSettings.from_env(repo_root=args.repo_root)
     if args.tp_root:
         settings.tp_root = args.tp_root
+    if args.parquet_root:
+        settings.parquet_root = args.parquet_root
+    if args.snapshot_cache:
+        settings.snapshot_dir = args.snapshot_cache
+    if args.csv_engine:
+        settings.csv_engine = args.csv_engine
 
-    configs = load_product_configs(args.product_config)
+    configs = load_product_catalog(args.product_config)
     filter_codes = {code.upper() for code in args.product_codes} if args.product_codes else None
     include_latest = not args.skip_latest
     history_depth = args.history_depth
 
-    results: List[Dict[str, object]] = []
+    listing_cache = DirectoryListingCache(args.listing_cache.resolve()) if args.discover_from_network else None
+
+    results: List[Optional[Dict[str, object]]] = []
+    jobs: List[SeedJob] = []
     total_runs = 0
     for config in configs:
         code_upper = (config.product_code or "").upper()
         if filter_codes and code_upper not in filter_codes:
             continue
         if args.discover_from_network:
-            discovered = _sorted_network_tp_names(config.network_path, max_network_scan=args.max_network_scan)
+            discovered = _sorted_network_tp_names(
+                config.network_path,
+                max_network_scan=args.max_network_scan,
+                listing_cache=listing_cache,
+            )
             if not discovered:
                 results.append(
                     {
@@ -177,39 +373,45 @@ def main() -> None:
         for tp_name in tp_queue:
             if args.limit is not None and total_runs >= args.limit:
                 break
-            try:
-                payload = run_ingestion(
-                    tp_name=tp_name,
-                    settings=settings,
-                    git_hash=None,
-                    no_persist=args.no_persist,
-                    product_config_path=args.product_config,
-                    product_code=config.product_code,
-                )
-                results.append(
-                    {
-                        "product_code": config.product_code,
-                        "product_name": config.product_name,
-                        "tp_name": tp_name,
-                        "git_hash": payload.get("git_hash"),
-                        "mongo_doc_id": payload.get("mongo_doc_id"),
-                        "warnings": payload.get("warnings", []),
-                    }
-                )
-            except FileNotFoundError as exc:
-                results.append(
-                    {
-                        "product_code": config.product_code,
-                        "product_name": config.product_name,
-                        "tp_name": tp_name,
-                        "status": "error",
-                        "error": str(exc),
-                    }
-                )
+            job = SeedJob(
+                index=len(results),
+                product_code=config.product_code,
+                product_name=config.product_name,
+                tp_name=tp_name,
+            )
+            jobs.append(job)
+            results.append(None)
             total_runs += 1
         if args.limit is not None and total_runs >= args.limit:
             break
 
+    if listing_cache is not None:
+        listing_cache.save()
+
+    workers = max(1, args.workers)
+    if workers > 1 and len(jobs) > 1:
+        if args.memory_budget_mb is not None:
+            for job in jobs:
+                job.estimated_mb = _estimate_parse_mb(settings.tp_root / job.tp_name)
+        _run_parallel(
+            jobs,
+            results,
+            settings,
+            workers=min(workers, len(jobs)),
+            memory_budget_mb=args.memory_budget_mb,
+            no_persist=args.no_persist,
+            product_config_path=args.product_config,
+        )
+    else:
+        for job in jobs:
+            results[job.index] = _ingest_job(
+                job,
+                settings,
+                no_persist=args.no_persist,
+                product_config_path=args.product_config,
+                product_configs=configs,
+            )
+
     summary = {
         "product_count": len(results),
         "ingest_runs": results,
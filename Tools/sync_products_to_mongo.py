@@ -2,78 +2,55 @@
 
 This script reads Products.json and upserts all entries into the product_configs
 collection so the Test Program Intelligence tool can list all available products.
+Products whose content has not changed since the last sync are skipped; the rest are
+written in one bulk request (see ``tp_ingest.catalog``).
 """
 from __future__ import annotations
 
-import json
-from datetime import datetime, timezone
+import argparse
 from pathlib import Path
 
 
 def main() -> None:
-    from pymongo import MongoClient
-
-    MONGO_URI = (
-        "mongodb://iq6cdegc265ebn7uiiem_admin:"
-        "Yv0BqT17bakhZ9M%2CrL%3DbTPD0fqbVo%2Ch4@"
-        "10-108-27-21.dbaas.intel.com:27017,"
-        "10-108-27-23.dbaas.intel.com:27017,"
-        "10-109-224-18.dbaas.intel.com:27017/"
-        "tpfrontdesk?authSource=admin&tls=true"
+    from tp_ingest.catalog import sync_product_catalog
+    from tp_ingest.clients import get_client
+    from tp_ingest.config import MongoSettings
+    from tp_ingest.product_config import load_product_catalog
+
+    parser = argparse.ArgumentParser(description="Upsert Products.json into the product_configs collection")
+    parser.add_argument(
+        "--products-file",
+        type=Path,
+        default=Path(__file__).resolve().parent.parent / "Products.json",
+        help="Path to Products.json",
     )
+    parser.add_argument("--force", action="store_true", help="Rewrite every product even if unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be written without writing")
+    args = parser.parse_args()
 
-    products_path = Path(__file__).resolve().parent.parent / "Products.json"
-    products = json.loads(products_path.read_text(encoding="utf-8"))
-
-    print(f"Loaded {len(products)} products from {products_path.name}")
+    mongo_settings = MongoSettings.from_env()
 
-    client = MongoClient(MONGO_URI)
-    product_configs = client["tpfrontdesk"]["product_configs"]
+    products_path = args.products_file
+    products = load_product_catalog(products_path).entries()
 
-    for product in products:
-        code = (product.get("ProductCode") or "").upper()
-        if not code:
-            continue
-
-        update_doc = {
-            "product_code": code,
-            "product_name": product.get("ProductName"),
-            "network_path": product.get("NetworkPath"),
-            "latest_tp": product.get("LatestTP"),
-            "number_of_releases": product.get("NumberOfReleases") or 0,
-            "releases": product.get("ListOfReleases", []) or [],
-            "last_run_date": product.get("LastRunDate"),
-            "additional_attributes": {
-                k: v
-                for k, v in product.items()
-                if k not in {
-                    "ProductCode",
-                    "ProductName",
-                    "NetworkPath",
-                    "LatestTP",
-                    "NumberOfReleases",
-                    "ListOfReleases",
-                    "LastRunDate",
-                }
-            },
-            "updated_at": datetime.now(timezone.utc).isoformat(),
-        }
+    print(f"Loaded {len(products)} products from {products_path.name}")
 
-        result = product_configs.update_one(
-            {"product_code": code},
-            {"$set": update_doc},
-            upsert=True,
-        )
+    client = get_client(mongo_settings.uri)
+    product_configs = client[mongo_settings.database][mongo_settings.product_collection]
 
-        action = "inserted" if result.upserted_id else "updated"
-        releases = update_doc["number_of_releases"]
-        print(f"  {action} {code}: {update_doc['product_name']} ({releases} releases)")
+    result = sync_product_catalog(product_configs, products, dry_run=args.dry_run, force=args.force)
 
-    # Show final count
-    count = product_configs.count_documents({})
-    print(f"\nMongoDB product_configs now has {count} products")
+    by_code = {(product.get("ProductCode") or "").upper(): product for product in products}
+    prefix = "would be " if args.dry_run else ""
+    for action, codes in (("inserted", result.inserted), ("updated", result.updated)):
+        for code in codes:
+            product = by_code[code]
+            releases = product.get("NumberOfReleases") or 0
+            print(f"  {prefix}{action} {code}: {product.get('ProductName')} ({releases} releases)")
+    if result.unchanged:
+        print(f"  unchanged: {len(result.unchanged)} products")
 
-    client.close()
+    print(f"\nMongoDB product_configs {'would have' if args.dry_run else 'now has'} {result.total} products")
 
 
 if __name__ == "__main__":
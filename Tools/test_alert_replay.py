@@ -0,0 +1,103 @@
+"""Regression suite for alert replay across compact_logs.py + monitor_alerts.py cycles."""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import monitor_alerts
+from tp_ingest.logstore import INDEX_NAME, compact_log, segments_dir_for
+
+
+def _append(path: Path, *alert_ids: str) -> None:
+    with path.open("a", encoding="utf-8") as handle:
+        for alert_id in alert_ids:
+            entry = {"timestamp": "2026-01-05T10:00:00+00:00", "status": "failed", "id": alert_id}
+            handle.write(json.dumps(entry) + "\n")
+
+
+def _monitor(alerts: Path, state: Path) -> List[str]:
+    """Run monitor_alerts.py once and return the ids of the alerts it picked up."""
+    seen: List[str] = []
+    summarize = monitor_alerts.summarize
+    argv = sys.argv
+
+    def capture(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        seen.extend(entry["id"] for entry in entries)
+        return summarize(entries)
+
+    monitor_alerts.summarize = capture
+    sys.argv = ["monitor_alerts.py", "--alerts-file", str(alerts), "--state-file", str(state), "--print-json"]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            monitor_alerts.main()
+    finally:
+        monitor_alerts.summarize = summarize
+        sys.argv = argv
+    return seen
+
+
+def _paths(root: Path) -> Tuple[Path, Path]:
+    return root / "alerts.jsonl", root / "monitor_state.json"
+
+
+def test_compact_monitor_cycles() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        alerts, state = _paths(Path(tmp))
+        _append(alerts, "a1", "a2")
+        assert _monitor(alerts, state) == ["a1", "a2"]
+
+        # Compacted after new alerts arrived, and no live file yet.
+        _append(alerts, "a3")
+        compact_log(alerts)
+        assert _monitor(alerts, state) == ["a3"]
+
+        # A second compaction before the scanner wrote again must not drop alerts.
+        _append(alerts, "b1", "b2")
+        compact_log(alerts)
+        assert not alerts.exists()
+        assert _monitor(alerts, state) == ["b1", "b2"]
+        assert _monitor(alerts, state) == []
+
+        # A fresh live file is read from the start without replaying old segments.
+        _append(alerts, "c1")
+        assert _monitor(alerts, state) == ["c1"]
+
+        _append(alerts, "c2")
+        compact_log(alerts)
+        _append(alerts, "d1")
+        assert _monitor(alerts, state) == ["c2", "d1"]
+        assert _monitor(alerts, state) == []
+
+
+def test_reused_inode_replays_latest_compaction_only() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        alerts, state = _paths(Path(tmp))
+        _append(alerts, "old1", "old2")
+        compact_log(alerts)
+        _append(alerts, "new1")
+        assert _monitor(alerts, state) == ["new1"]
+        _append(alerts, "new2")
+        compact_log(alerts)
+
+        # Pretend the filesystem handed both compacted files the same inode.
+        index_path = segments_dir_for(alerts) / INDEX_NAME
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        saved = json.loads(state.read_text(encoding="utf-8"))
+        for segment in index["segments"]:
+            segment["source_inode"] = saved["inode"]
+        index_path.write_text(json.dumps(index), encoding="utf-8")
+
+        _append(alerts, "next1")
+        assert _monitor(alerts, state) == ["new2", "next1"]
+
+
+if __name__ == "__main__":
+    for name, case in sorted(globals().items()):
+        if name.startswith("test_") and callable(case):
+            case()
+            print(f"✅ {name}")
@@ -13,14 +13,16 @@ import asyncio
 import json
 import os
 import re
+import zlib
 from collections import Counter, defaultdict
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import (
     Any,
     Callable,
     Dict,
     Iterable,
+    Iterator,
     List,
     Mapping,
     Optional,
@@ -77,6 +79,14 @@ SETPOINTS_COLLECTION = "setpoints"
 ARTIFACTS_COLLECTION = "artifacts"
 PRODUCT_COLLECTION = "product_configs"
 HVQK_COLLECTION = "hvqk_configs"
+HVQK_BLOB_COLLECTION = "hvqk_blobs"
+ARTIFACT_BLOB_COLLECTION = "artifact_blobs"
+ARTIFACT_CHUNK_COLLECTION = "artifact_blob_chunks"
+ARTIFACT_PREVIEW_BYTES = 6000
+HVQK_DIFF_MAX_FILES = 25
+HVQK_DIFF_MAX_CHANGES = 20
+HVQK_HISTORY_LIMIT = 10
+QUERY_ACTIVITY_COLLECTION = "query_activity"
 
 
 # Reusable status emitter so Open WebUI can stream progress updates
@@ -213,6 +223,38 @@ class QuestionClassifier:
                 "info on tp",
             ),
         ),
+        (
+            "hvqk_diff",
+            (
+                "hvqk diff",
+                "diff hvqk",
+                "compare hvqk",
+                "hvqk changes",
+                "hvqk changed",
+                "changed in hvqk",
+                "changes in hvqk",
+                "change in hvqk",
+                "hvqk difference",
+                "hvqk differences",
+                "hvqk history",
+            ),
+        ),
+        (
+            "artifact_content",
+            (
+                "gitinfo",
+                "git info",
+                "gitreportinfo",
+                "baselevels",
+                "base levels",
+                "basespecs",
+                "base specs",
+                "environment file",
+                "exportpath",
+                "export path",
+                "artifact content",
+            ),
+        ),
         ("current_tp", ("current test program", "latest tp", "current tp")),
         (
             "prime_revision",
@@ -1844,14 +1886,39 @@ Ask: "What products do you have?" to see available options.
     def _get_mongo_client(
         self, user_valves: Optional["Tools.UserValves"] = None
     ) -> Optional[MongoClientType]:
-        uri = MONGO_URI
+        uri = os.environ.get("TPFD_MONGO_URI") or MONGO_URI
         if self._mongo_client is None:
-            self._mongo_client = MongoClient(uri)
+            if uri.startswith("sqlite://"):
+                # Offline/CI runs read the embedded store written by tp_ingest's SQLite backend,
+                # which is only importable from a repository checkout.
+                from tp_ingest.sqlite_store import SQLiteClient
+
+                self._mongo_client = SQLiteClient.from_uri(uri)
+            else:
+                self._mongo_client = MongoClient(uri)
         return self._mongo_client
 
     def _get_collection(self, client: MongoClientType, name: str) -> MongoCollection:
         return client[MONGO_DATABASE][name]
 
+    def _record_product_query(
+        self, client: MongoClientType, product_code: Optional[str]
+    ) -> None:
+        """Note that a product was asked about; the daily scanner ingests its TPs first."""
+        if not product_code:
+            return
+        try:
+            self._get_collection(client, QUERY_ACTIVITY_COLLECTION).update_one(
+                {"_id": product_code.upper()},
+                {
+                    "$set": {"last_queried_at": datetime.now(timezone.utc)},
+                    "$inc": {"query_count": 1},
+                },
+                upsert=True,
+            )
+        except PyMongoError:
+            pass
+
     # Query helpers ----------------------------------------------------------------------
     def _fetch_product_state(
         self, product_collection: MongoCollection, product_code: Optional[str]
@@ -1933,6 +2000,67 @@ Ask: "What products do you have?" to see available options.
             summary[row["_id"] or "unknown"] = row["count"]
         return summary
 
+    def _match_artifact(
+        self, artifacts_collection: MongoCollection, ctx: TPContext, question: str
+    ) -> Tuple[Optional[dict], List[str]]:
+        """Pick the TP artifact whose file name (sans extension) appears in *question*."""
+        compact_question = re.sub(r"[^a-z0-9]", "", question.lower())
+        docs = list(
+            artifacts_collection.find(
+                {"tp_document_id": ctx.tp_document_id},
+                {"name": 1, "relative_path": 1, "size_bytes": 1, "sha256": 1, "blob_stored": 1},
+            )
+        )
+        best: Optional[dict] = None
+        best_length = 0
+        for doc in docs:
+            stem = re.sub(r"[^a-z0-9]", "", (doc.get("name") or "").rsplit(".", 1)[0].lower())
+            if stem and stem in compact_question and len(stem) > best_length:
+                best, best_length = doc, len(stem)
+        return best, sorted(doc.get("relative_path") or "" for doc in docs)
+
+    def _read_artifact_blob(
+        self, client: MongoClientType, sha256: str, length: int
+    ) -> Optional[Tuple[bytes, int]]:
+        """First *length* bytes of a stored blob plus its full size, or None when absent."""
+        meta = self._get_collection(client, ARTIFACT_BLOB_COLLECTION).find_one({"_id": sha256})
+        if not meta:
+            return None
+        size = meta.get("size", 0)
+        chunk_size = meta.get("chunk_size") or 1
+        needed = -(-min(size, length) // chunk_size)
+        cursor = (
+            self._get_collection(client, ARTIFACT_CHUNK_COLLECTION)
+            .find({"blob_id": sha256, "n": {"$lt": needed}})
+            .sort("n", 1)
+        )
+        data = b"".join(zlib.decompress(chunk["data"]) for chunk in cursor)
+        return data[:length], size
+
+    def _format_artifact_content(
+        self,
+        ctx: TPContext,
+        artifact: Optional[dict],
+        available: List[str],
+        content: Optional[Tuple[bytes, int]],
+    ) -> str:
+        if artifact is None:
+            if not available:
+                return f"I have no artifacts recorded for {ctx.tp_name}."
+            preview = ", ".join(available[:15])
+            return f"I could not tell which artifact you meant. {ctx.tp_name} has: {preview}"
+        path = artifact.get("relative_path") or artifact.get("name")
+        if content is None:
+            return (
+                f"I have metadata for {path} in {ctx.tp_name} "
+                f"({artifact.get('size_bytes', 0)} bytes) but its content was not stored at ingest."
+            )
+        data, size = content
+        lines = [f"📄 {path} from {ctx.tp_name} ({size} bytes)", "```", data.decode("utf-8", errors="replace").rstrip(), "```"]
+        if size > len(data):
+            lines.append(f"Showing the first {len(data)} of {size} bytes.")
+        return "\n".join(lines)
+
     def _fetch_hvqk_module_inventory(
         self,
         hvqk_collection: MongoCollection,
@@ -2003,13 +2131,267 @@ Ask: "What products do you have?" to see available options.
         hvqk_collection: MongoCollection,
         ctx: TPContext | Mapping[str, Any],
         module_name: Optional[str] = None,
+        blob_collection: Optional[MongoCollection] = None,
     ) -> List[dict]:
         tp_document_id = self._ensure_tp_document_id(ctx)
         filters: Dict[str, Any] = {"tp_document_id": tp_document_id}
         if module_name:
             filters["module_name"] = module_name
-        cursor = hvqk_collection.find(filters).sort("file_name", 1)
-        return list(cursor)
+        entries = list(hvqk_collection.find(filters).sort("file_name", 1))
+        # Newer ingests store each config once in the blob collection, keyed by sha256.
+        missing = {entry["sha256"] for entry in entries if "config" not in entry and entry.get("sha256")}
+        if missing and blob_collection is not None:
+            blobs = {
+                blob["_id"]: blob.get("config")
+                for blob in blob_collection.find({"_id": {"$in": sorted(missing)}}, {"config": 1})
+            }
+            for entry in entries:
+                if "config" not in entry:
+                    entry["config"] = blobs.get(entry.get("sha256"))
+        return entries
+
+    def _extract_tp_name_hints(self, question: str) -> List[str]:
+        """Every TP-like token in *question*, in order of appearance."""
+        hints: List[str] = []
+        for token in self._scan_identifier_tokens(question):
+            if self._looks_like_tp_name(token) and token not in hints:
+                hints.append(token)
+        return hints
+
+    def _list_ingested_releases(
+        self,
+        ingest_collection: MongoCollection,
+        product_code: str,
+    ) -> List[dict]:
+        """Ingested TPs of *product_code*, newest first by the TP naming convention."""
+        tp_docs = list(
+            ingest_collection.find(
+                {
+                    "$or": [
+                        {"metadata.product_code": product_code},
+                        {"product.product_code": product_code},
+                    ]
+                },
+                {"_id": 1, "tp_name": 1, "ingested_at": 1},
+            )
+        )
+        tp_docs.sort(
+            key=lambda d: (
+                self._tp_name_sort_key(d.get("tp_name", "")),
+                str(d.get("ingested_at") or ""),
+            ),
+            reverse=True,
+        )
+        return tp_docs
+
+    @staticmethod
+    def _resolve_tp_document_id(
+        ingest_collection: MongoCollection, tp_name: str
+    ) -> Optional[str]:
+        doc = ingest_collection.find_one(
+            {"tp_name": tp_name}, {"_id": 1}, sort=[("ingested_at", -1)]
+        )
+        return doc.get("_id") if doc else None
+
+    @staticmethod
+    def _fetch_hvqk_index(
+        hvqk_collection: MongoCollection,
+        tp_document_id: str,
+        module_name: Optional[str] = None,
+    ) -> Dict[str, dict]:
+        """HVQK file metadata of one TP keyed by relative path, without the configs."""
+        filters: Dict[str, Any] = {"tp_document_id": tp_document_id}
+        if module_name:
+            filters["module_name"] = module_name
+        index: Dict[str, dict] = {}
+        for entry in hvqk_collection.find(filters, {"config": 0}):
+            key = entry.get("relative_path") or f"{entry.get('module_name')}/{entry.get('file_name')}"
+            index[key] = entry
+        return index
+
+    @staticmethod
+    def _fetch_hvqk_contents(
+        hvqk_collection: MongoCollection,
+        blob_collection: MongoCollection,
+        tp_document_id: str,
+        entries: List[dict],
+    ) -> Dict[str, Any]:
+        """Configs of *entries* keyed by relative path: one blob query plus legacy inline configs."""
+        shas = sorted({entry["sha256"] for entry in entries if entry.get("sha256")})
+        blobs: Dict[str, Any] = {}
+        if shas:
+            blobs = {
+                blob["_id"]: blob.get("config")
+                for blob in blob_collection.find({"_id": {"$in": shas}}, {"config": 1})
+            }
+        contents: Dict[str, Any] = {}
+        inline: List[str] = []
+        for entry in entries:
+            path = entry.get("relative_path")
+            if entry.get("sha256") in blobs:
+                contents[path] = blobs[entry["sha256"]]
+            else:
+                inline.append(path)
+        if inline:
+            # Documents written before the blob store kept the config on the document itself.
+            for doc in hvqk_collection.find(
+                {"tp_document_id": tp_document_id, "relative_path": {"$in": inline}},
+                {"relative_path": 1, "config": 1},
+            ):
+                contents[doc.get("relative_path")] = doc.get("config")
+        return contents
+
+    @classmethod
+    def _json_diff(
+        cls, old: Any, new: Any, path: str = ""
+    ) -> Iterator[Tuple[str, str, Any, Any]]:
+        """Yield ``(path, kind, old, new)`` for every leaf that differs; kind is added/removed/changed."""
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key in old:
+                child = f"{path}.{key}" if path else str(key)
+                if key not in new:
+                    yield child, "removed", old[key], None
+                else:
+                    yield from cls._json_diff(old[key], new[key], child)
+            for key in new:
+                if key not in old:
+                    yield (f"{path}.{key}" if path else str(key)), "added", None, new[key]
+        elif isinstance(old, list) and isinstance(new, list):
+            for index in range(max(len(old), len(new))):
+                child = f"{path}[{index}]"
+                if index >= len(new):
+                    yield child, "removed", old[index], None
+                elif index >= len(old):
+                    yield child, "added", None, new[index]
+                else:
+                    yield from cls._json_diff(old[index], new[index], child)
+        elif old != new or type(old) is not type(new):
+            yield path or "(root)", "changed", old, new
+
+    @staticmethod
+    def _diff_hvqk_indexes(
+        old_index: Dict[str, dict], new_index: Dict[str, dict]
+    ) -> Dict[str, Any]:
+        """Classify files by path; equal sha256 means unchanged without looking at content."""
+        added = sorted(path for path in new_index if path not in old_index)
+        removed = sorted(path for path in old_index if path not in new_index)
+        changed: List[str] = []
+        unchanged = 0
+        for path in sorted(set(old_index) & set(new_index)):
+            old_sha = old_index[path].get("sha256")
+            new_sha = new_index[path].get("sha256")
+            if old_sha and old_sha == new_sha:
+                unchanged += 1
+            else:
+                changed.append(path)
+        return {"added": added, "removed": removed, "changed": changed, "unchanged": unchanged}
+
+    def _compare_hvqk_tps(
+        self,
+        hvqk_collection: MongoCollection,
+        blob_collection: MongoCollection,
+        old_id: str,
+        new_id: str,
+        module_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        old_index = self._fetch_hvqk_index(hvqk_collection, old_id, module_name)
+        new_index = self._fetch_hvqk_index(hvqk_collection, new_id, module_name)
+        diff = self._diff_hvqk_indexes(old_index, new_index)
+        candidates = diff["changed"]
+        old_contents = self._fetch_hvqk_contents(
+            hvqk_collection, blob_collection, old_id, [old_index[p] for p in candidates]
+        )
+        new_contents = self._fetch_hvqk_contents(
+            hvqk_collection, blob_collection, new_id, [new_index[p] for p in candidates]
+        )
+        details: Dict[str, List[Tuple[str, str, Any, Any]]] = {}
+        for path in candidates:
+            changes = list(self._json_diff(old_contents.get(path), new_contents.get(path)))
+            if changes:
+                details[path] = changes
+            else:
+                # Same parsed content (e.g. whitespace-only edits or a legacy document
+                # without a hash).
+                diff["unchanged"] += 1
+        diff["changed"] = sorted(details)
+        diff["details"] = details
+        diff["old_count"] = len(old_index)
+        diff["new_count"] = len(new_index)
+        return diff
+
+    def _format_hvqk_diff(
+        self, old_label: str, new_label: str, diff: Dict[str, Any]
+    ) -> str:
+        lines = [f"🔀 HVQK config changes from `{old_label}` to `{new_label}`\n"]
+        lines.append(
+            f"**Files**: {diff['old_count']} → {diff['new_count']} | "
+            f"changed {len(diff['changed'])}, added {len(diff['added'])}, "
+            f"removed {len(diff['removed'])}, unchanged {diff['unchanged']}"
+        )
+        if not (diff["changed"] or diff["added"] or diff["removed"]):
+            lines.append("\nNo HVQK config differences.")
+            return "\n".join(lines)
+
+        for label, key in (("Added", "added"), ("Removed", "removed")):
+            paths = diff[key]
+            if paths:
+                lines.append(f"\n**{label} files**:")
+                lines.extend(f"- {path}" for path in paths[:HVQK_DIFF_MAX_FILES])
+                if len(paths) > HVQK_DIFF_MAX_FILES:
+                    lines.append(f"- … and {len(paths) - HVQK_DIFF_MAX_FILES} more")
+
+        changed = diff["changed"]
+        for path in changed[:HVQK_DIFF_MAX_FILES]:
+            changes = diff["details"][path]
+            lines.append(f"\n**{path}** ({len(changes)} changes)")
+            lines.append("| Key | Old | New |")
+            lines.append("| --- | --- | --- |")
+            for key, kind, old, new in changes[:HVQK_DIFF_MAX_CHANGES]:
+                old_text = "(absent)" if kind == "added" else self._stringify_config_value(old, max_length=80)
+                new_text = "(absent)" if kind == "removed" else self._stringify_config_value(new, max_length=80)
+                lines.append(f"| {key} | {old_text} | {new_text} |".replace("\n", " "))
+            if len(changes) > HVQK_DIFF_MAX_CHANGES:
+                lines.append(f"_…and {len(changes) - HVQK_DIFF_MAX_CHANGES} more changes_")
+        if len(changed) > HVQK_DIFF_MAX_FILES:
+            lines.append(f"\n_…and {len(changed) - HVQK_DIFF_MAX_FILES} more changed files_")
+        return "\n".join(lines)
+
+    def _track_hvqk_history(
+        self,
+        hvqk_collection: MongoCollection,
+        releases: List[dict],
+        module_name: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """File-level HVQK changes between consecutive releases (newest first), from hashes only."""
+        indexes = [
+            self._fetch_hvqk_index(hvqk_collection, doc["_id"], module_name)
+            for doc in releases[: HVQK_HISTORY_LIMIT + 1]
+        ]
+        steps: List[Dict[str, Any]] = []
+        for position in range(len(indexes) - 1):
+            diff = self._diff_hvqk_indexes(indexes[position + 1], indexes[position])
+            diff["tp_name"] = releases[position].get("tp_name", "unknown")
+            diff["previous_tp_name"] = releases[position + 1].get("tp_name", "unknown")
+            steps.append(diff)
+        return steps
+
+    @staticmethod
+    def _format_hvqk_history(steps: List[Dict[str, Any]]) -> str:
+        if not steps:
+            return "Need at least two ingested releases to show HVQK history."
+        lines = ["📜 HVQK config changes across releases (newest first)\n"]
+        lines.append("| TP Name | Previous TP | Changed | Added | Removed | Files changed |")
+        lines.append("|---------|-------------|---------|-------|---------|---------------|")
+        for step in steps:
+            touched = step["changed"] + step["added"] + step["removed"]
+            names = ", ".join(path.rsplit("/", 1)[-1] for path in touched[:5])
+            if len(touched) > 5:
+                names += f", … (+{len(touched) - 5})"
+            lines.append(
+                f"| {step['tp_name']} | {step['previous_tp_name']} | {len(step['changed'])} | "
+                f"{len(step['added'])} | {len(step['removed'])} | {names or '-'} |"
+            )
+        return "\n".join(lines)
 
     def _format_hvqk_module_detail(self, module_name: str, entries: List[dict]) -> str:
         if not entries:
@@ -2572,6 +2954,7 @@ Ask: "What products do you have?" to see available options.
                     f"Available products:\n{suggestion_list}\n\n"
                     f"{self._get_usage_guidance()}"
                 )
+            self._record_product_query(client, product_code)
             await emitter.progress(f"📋 Fetching releases for {product_name}...")
             answer = self._format_list_releases_answer(
                 product_collection, ingest_collection, product_code, product_name
@@ -2675,6 +3058,7 @@ Ask: "What products do you have?" to see available options.
                 await emitter.emit(f"⚠️ {exc}", "complete", done=True)
                 return f"{exc}\n\n{self._get_usage_guidance()}"
 
+        self._record_product_query(client, ctx.product_code)
         await emitter.progress(
             f"Resolved context: {ctx.tp_name} ({ctx.product_code or 'unknown product'})"
         )
@@ -2747,11 +3131,76 @@ Ask: "What products do you have?" to see available options.
                     hvqk_collection,
                     ctx,
                     module_name=module_match,
+                    blob_collection=self._get_collection(client, HVQK_BLOB_COLLECTION),
                 )
                 answer_lines.append(
                     self._format_hvqk_module_detail(module_name, hvqk_entries)
                 )
 
+            elif classification == "hvqk_diff":
+                blob_collection = self._get_collection(client, HVQK_BLOB_COLLECTION)
+                tp_hints = self._extract_tp_name_hints(question)
+                wants_history = len(tp_hints) < 2 and re.search(
+                    r"\b(history|releases|over time)\b", normalized_question
+                )
+                releases: List[dict] = []
+                if len(tp_hints) < 2:
+                    releases = self._list_ingested_releases(
+                        ingest_collection, ctx.product_code or ""
+                    )
+                if wants_history:
+                    steps = self._track_hvqk_history(
+                        hvqk_collection, releases, module_name=module_match
+                    )
+                    answer_lines.append(self._format_hvqk_history(steps))
+                else:
+                    old_id: Optional[str] = None
+                    new_id: Optional[str] = None
+                    if len(tp_hints) >= 2:
+                        older, newer = sorted(tp_hints[:2], key=self._tp_name_sort_key)
+                        old_id = self._resolve_tp_document_id(ingest_collection, older)
+                        new_id = self._resolve_tp_document_id(ingest_collection, newer)
+                        missing = [
+                            name
+                            for name, doc_id in ((older, old_id), (newer, new_id))
+                            if doc_id is None
+                        ]
+                    else:
+                        # One TP (or the resolved context): compare with the release before it.
+                        new_id = ctx.tp_document_id
+                        ids = [doc["_id"] for doc in releases]
+                        if new_id in ids and ids.index(new_id) + 1 < len(ids):
+                            old_id = ids[ids.index(new_id) + 1]
+                        missing = [] if old_id else [f"a release before {ctx.tp_name}"]
+                    if missing:
+                        answer_lines.append(
+                            f"I could not find ingested HVQK configs for {', '.join(missing)}."
+                        )
+                    else:
+                        diff = self._compare_hvqk_tps(
+                            hvqk_collection,
+                            blob_collection,
+                            old_id,
+                            new_id,
+                            module_name=module_match,
+                        )
+                        answer_lines.append(
+                            self._format_hvqk_diff(
+                                old_id.split(":", 1)[0], new_id.split(":", 1)[0], diff
+                            )
+                        )
+
+            elif classification == "artifact_content":
+                artifact, available = self._match_artifact(artifacts_collection, ctx, question)
+                content = None
+                if artifact and artifact.get("blob_stored") and artifact.get("sha256"):
+                    content = self._read_artifact_blob(
+                        client, artifact["sha256"], ARTIFACT_PREVIEW_BYTES
+                    )
+                answer_lines.append(
+                    self._format_artifact_content(ctx, artifact, available, content)
+                )
+
             elif classification == "tp_snapshot":
                 modules = self._fetch_module_summary(module_collection, ctx)
                 artifact_summary = self._fetch_artifact_summary(
@@ -0,0 +1,318 @@
+"""Parity suite: the SQLite document store must answer like MongoDB (mongomock as reference).
+
+Every case runs with and without SQLite indexes, since an index must never change results.
+"""
+from __future__ import annotations
+
+import copy
+import random
+import re
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import mongomock
+from pymongo.errors import DuplicateKeyError
+
+from tp_ingest.sqlite_store import SQLiteClient
+
+INDEXED_FIELDS = ("tp_document_id", "status", "tags", "p", "report.dll_inventory.name", "ingested_at", "module")
+STATUSES = ("PASS", "FAIL", "Bypassed", None)
+MODULES = ("ARR_ATOM", "SCN_CORE", "TPI_VCC", "hvqk_arr")
+
+
+def _documents(count: int = 240) -> List[Dict[str, Any]]:
+    rng = random.Random(7)
+    documents: List[Dict[str, Any]] = []
+    for number in range(count):
+        document: Dict[str, Any] = {
+            "_id": f"doc{number:04d}",
+            "tp_document_id": f"TP{number % 4}:abc",
+            "module": rng.choice(MODULES),
+            "status": rng.choice(STATUSES),
+            "seq": number,
+            "tags": rng.sample(["hvqk", "sdt", "vmin", "cake"], rng.randint(0, 3)),
+            "report": {
+                "dll_inventory": [
+                    {"name": rng.choice(["a.dll", "b.dll", "c.dll"]), "size": rng.randint(1, 9)}
+                    for _ in range(rng.randint(0, 3))
+                ],
+                "owner": rng.choice(["ian", "sam", None]),
+            },
+            "ingested_at": datetime(2026, 1, 1) + timedelta(hours=rng.randint(0, 96)),
+        }
+        # "p" is a scalar in most documents and an array in some, like a field an index was
+        # declared on before anyone stored a list in it.
+        choice = rng.random()
+        if choice < 0.5:
+            document["p"] = rng.randint(0, 3)
+        elif choice < 0.8:
+            document["p"] = [rng.randint(0, 3), rng.randint(0, 3)]
+        if rng.random() < 0.3:
+            document["bypass_reason"] = rng.choice(["waiver", "Waiver pending", ""])
+        documents.append(document)
+    return documents
+
+
+FILTERS: List[Dict[str, Any]] = [
+    {},
+    {"tp_document_id": "TP1:abc"},
+    {"tp_document_id": {"$in": ["TP1:abc", "TP3:abc"]}},
+    {"status": "FAIL"},
+    {"status": None},
+    {"status": {"$ne": "Bypassed"}},
+    {"status": {"$in": ["PASS", None]}},
+    {"tp_document_id": "TP2:abc", "status": {"$ne": "PASS"}},
+    {"module": {"$regex": "^arr", "$options": "i"}},
+    {"module": {"$regex": "VCC"}},
+    {"module": re.compile("core", re.IGNORECASE)},
+    {"$or": [{"module": "ARR_ATOM"}, {"tags": "vmin"}]},
+    {"$or": [{"status": "FAIL"}, {"p": {"$gte": 2}}], "tp_document_id": "TP0:abc"},
+    {"$and": [{"tags": "hvqk"}, {"tags": "sdt"}]},
+    {"tags": "hvqk"},
+    {"tags": {"$in": ["cake", "sdt"]}},
+    {"tags": {"$size": 0}},
+    {"tags": {"$all": ["hvqk", "vmin"]}},
+    {"p": 1},
+    {"p": [1, 2]},
+    {"p": {"$gt": 1}},
+    {"p": {"$lte": 0}},
+    {"p": {"$exists": False}},
+    {"p": None},
+    {"report.dll_inventory.name": "a.dll"},
+    {"report.dll_inventory.name": {"$in": ["b.dll", "c.dll"]}},
+    {"report.dll_inventory.size": {"$gte": 7}},
+    {"report.dll_inventory": {"$elemMatch": {"name": "a.dll", "size": {"$lt": 4}}}},
+    {"report.owner": None},
+    {"report.owner": "sam"},
+    {"bypass_reason": {"$regex": "waiver", "$options": "i"}},
+    {"bypass_reason": {"$exists": True, "$ne": ""}},
+    {"ingested_at": {"$gte": datetime(2026, 1, 3)}},
+    {"ingested_at": {"$lt": datetime(2026, 1, 2), "$gt": datetime(2026, 1, 1, 12)}},
+    {"seq": {"$nin": [1, 2, 3]}, "module": {"$not": re.compile("^ARR")}},
+    {"$nor": [{"status": "PASS"}, {"tags": "cake"}]},
+    {"_id": "doc0007"},
+    {"_id": {"$in": ["doc0001", "doc0002", "missing"]}},
+]
+
+
+def _collections(indexed: bool) -> Tuple[Any, Any]:
+    documents = _documents()
+    sqlite_collection = SQLiteClient(":memory:")["tpfd"]["test_instances"]
+    mongo_collection = mongomock.MongoClient()["tpfd"]["test_instances"]
+    # Indexes arrive between two batches, so some arrays predate them and some follow.
+    half = len(documents) // 2
+    sqlite_collection.insert_many(copy.deepcopy(documents[:half]))
+    mongo_collection.insert_many(copy.deepcopy(documents[:half]))
+    if indexed:
+        for field in INDEXED_FIELDS:
+            sqlite_collection.create_index([(field, 1)])
+            mongo_collection.create_index([(field, 1)])
+    sqlite_collection.insert_many(copy.deepcopy(documents[half:]))
+    mongo_collection.insert_many(copy.deepcopy(documents[half:]))
+    return sqlite_collection, mongo_collection
+
+
+def _both() -> Iterator[Tuple[bool, Any, Any]]:
+    for indexed in (False, True):
+        sqlite_collection, mongo_collection = _collections(indexed)
+        yield indexed, sqlite_collection, mongo_collection
+
+
+def _ids(documents: Any) -> List[str]:
+    return [document["_id"] for document in documents]
+
+
+def test_find_and_count() -> None:
+    for indexed, sqlite_collection, mongo_collection in _both():
+        for query in FILTERS:
+            label = f"indexed={indexed} filter={query}"
+            expected = sorted(_ids(mongo_collection.find(query)))
+            assert sorted(_ids(sqlite_collection.find(query))) == expected, label
+            assert sqlite_collection.count_documents(query) == len(expected), label
+            first = sqlite_collection.find_one(query)
+            assert (first is None) == (not expected), label
+
+
+def test_sort_limit_projection() -> None:
+    for indexed, sqlite_collection, mongo_collection in _both():
+        for query in FILTERS:
+            label = f"indexed={indexed} filter={query}"
+            for sort in (
+                [("seq", -1)],
+                [("ingested_at", 1), ("seq", 1)],
+                [("module", 1), ("seq", -1)],
+                [("status", 1), ("seq", 1)],
+            ):
+                expected = _ids(mongo_collection.find(query).sort(sort).skip(2).limit(5))
+                assert _ids(sqlite_collection.find(query).sort(sort).skip(2).limit(5)) == expected, label
+            projection = {"report.dll_inventory.name": 1, "status": 1}
+            expected = list(mongo_collection.find(query, projection).sort("seq", 1))
+            assert list(sqlite_collection.find(query, projection).sort("seq", 1)) == expected, label
+            projection = {"report": 0, "_id": 0}
+            expected = list(mongo_collection.find(query, projection).sort("seq", 1))
+            assert list(sqlite_collection.find(query, projection).sort("seq", 1)) == expected, label
+
+
+def test_array_sort_keys() -> None:
+    # mongomock compares whole arrays, so MongoDB's rule is checked directly: an array sorts
+    # by its smallest element ascending and by its largest element descending.
+    for indexed in (False, True):
+        collection = SQLiteClient(":memory:")["tpfd"]["runs"]
+        if indexed:
+            collection.create_index([("p", 1)])
+        collection.insert_many([{"_id": 1, "p": [1, 3]}, {"_id": 2, "p": 2}, {"_id": 3}, {"_id": 4, "p": [5, 0]}])
+        assert _ids(collection.find().sort("p", 1)) == [3, 4, 1, 2]
+        assert _ids(collection.find().sort("p", -1)) == [4, 1, 2, 3]
+        assert _ids(collection.find({"p": {"$gte": 1}}).sort("p", 1).limit(2)) == [4, 1]
+
+
+def test_index_on_array_field() -> None:
+    collection = SQLiteClient(":memory:")["tpfd"]["runs"]
+    collection.insert_one({"_id": 1, "tags": ["a", "b"]})
+    assert collection.count_documents({"tags": "a"}) == 1
+    collection.create_index("tags")
+    assert collection.count_documents({"tags": "a"}) == 1
+    collection.insert_one({"_id": 2, "label": "x"})
+    collection.update_one({"_id": 2}, {"$set": {"label": ["x", "y"]}})
+    assert _ids(collection.find({"label": "y"})) == [2]
+
+
+def test_files_written_before_array_tracking() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tpfd.db"
+        client = SQLiteClient(path)
+        client["tpfd"]["runs"].insert_many([{"_id": 1, "tags": ["a", "b"]}, {"_id": 2, "tags": "a"}])
+        client._execute("DELETE FROM _tpfd_array_paths", [])
+        client._execute("DELETE FROM _tpfd_tracked", [])
+        client.close()
+        client = SQLiteClient(path)
+        assert sorted(_ids(client["tpfd"]["runs"].find({"tags": "a"}))) == [1, 2]
+        client.close()
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, dict):
+        return sorted((key, _canonical(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def test_distinct_and_group() -> None:
+    pipeline_tail = [
+        {"$group": {
+            "_id": "$status",
+            "count": {"$sum": 1},
+            "modules": {"$addToSet": "$module"},
+            "latest": {"$max": "$ingested_at"},
+        }},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+    for indexed, sqlite_collection, mongo_collection in _both():
+        for query in FILTERS:
+            label = f"indexed={indexed} filter={query}"
+            for key in ("module", "tags", "report.dll_inventory.name"):
+                expected = sorted(map(repr, mongo_collection.distinct(key, query)))
+                assert sorted(map(repr, sqlite_collection.distinct(key, query))) == expected, label
+            pipeline = [{"$match": query}, *pipeline_tail]
+            expected = [
+                {**row, "modules": sorted(row["modules"])} for row in mongo_collection.aggregate(pipeline)
+            ]
+            actual = [{**row, "modules": sorted(row["modules"])} for row in sqlite_collection.aggregate(pipeline)]
+            assert _canonical(actual) == _canonical(expected), label
+
+
+def test_updates_and_upserts() -> None:
+    updates = [
+        ({"tp_document_id": "TP1:abc", "status": "FAIL"}, {"$set": {"triage.owner": "ian"}, "$inc": {"retries": 1}}, False),
+        ({"tags": "hvqk"}, {"$unset": {"report": ""}, "$set": {"status": "PASS"}}, False),
+        ({"p": 3}, {"$inc": {"seq": 1000}}, False),
+        ({"_id": "doc0003"}, {"$addToSet": {"tags": "sdt"}, "$push": {"history": "touched"}}, False),
+        ({"_id": "new-1", "module": "NEW"}, {"$set": {"status": "PASS"}, "$setOnInsert": {"created": 1}}, True),
+        ({"_id": "new-1"}, {"$set": {"status": "FAIL"}, "$setOnInsert": {"created": 2}}, True),
+        ({"_id": "missing"}, {"$set": {"status": "FAIL"}}, False),
+    ]
+    for indexed, sqlite_collection, mongo_collection in _both():
+        for query, update, upsert in updates:
+            label = f"indexed={indexed} update={update}"
+            expected = mongo_collection.update_one(query, update, upsert=upsert)
+            actual = sqlite_collection.update_one(query, update, upsert=upsert)
+            assert (actual.matched_count, actual.modified_count, actual.upserted_id) == (
+                expected.matched_count,
+                expected.modified_count,
+                expected.upserted_id,
+            ), label
+        replacement = {"module": "REPLACED", "status": None}
+        assert sqlite_collection.replace_one({"_id": "doc0010"}, replacement).modified_count == 1
+        mongo_collection.replace_one({"_id": "doc0010"}, replacement)
+        assert sqlite_collection.delete_many({"tags": "cake"}).deleted_count == (
+            mongo_collection.delete_many({"tags": "cake"}).deleted_count
+        )
+        expected = list(mongo_collection.find({}).sort("_id", 1))
+        assert list(sqlite_collection.find({}).sort("_id", 1)) == expected, f"indexed={indexed}"
+
+
+def test_unique_index_duplicates() -> None:
+    for collection in (SQLiteClient(":memory:")["tpfd"]["product_configs"], mongomock.MongoClient()["tpfd"]["product_configs"]):
+        collection.create_index([("product_code", 1)], unique=True)
+        collection.insert_one({"product_code": "8PXM"})
+        collection.insert_one({"product_code": "8ABC"})
+        for write in (
+            lambda: collection.insert_one({"product_code": "8PXM"}),
+            lambda: collection.insert_one({"_id": collection.find_one({"product_code": "8ABC"})["_id"]}),
+            lambda: collection.update_one({"product_code": "8ABC"}, {"$set": {"product_code": "8PXM"}}),
+        ):
+            try:
+                write()
+            except DuplicateKeyError:
+                continue
+            raise AssertionError(f"{type(collection).__name__} accepted a duplicate key")
+        assert collection.count_documents({}) == 2
+
+
+def _random_filter(rng: random.Random) -> Dict[str, Any]:
+    values: Dict[str, List[Any]] = {
+        "p": [0, 1, 2, 3, None, [1, 2]],
+        "tags": ["hvqk", "sdt", "cake", None],
+        "status": list(STATUSES),
+        "module": list(MODULES),
+        "tp_document_id": ["TP0:abc", "TP3:abc"],
+        "report.dll_inventory.name": ["a.dll", "c.dll", None],
+        "report.owner": ["ian", None],
+        "seq": [5, 100, 200],
+    }
+    query: Dict[str, Any] = {}
+    for field in rng.sample(sorted(values), rng.randint(1, 3)):
+        value = rng.choice(values[field])
+        shape = rng.randint(0, 4)
+        if shape == 0 or value is None or isinstance(value, list):
+            query[field] = value
+        elif shape == 1:
+            query[field] = {"$in": [value, rng.choice(values[field])]}
+        elif shape == 2:
+            query[field] = {"$ne": value}
+        elif shape == 3 and isinstance(value, int):
+            query[field] = {rng.choice(["$gt", "$gte", "$lt", "$lte"]): value}
+        else:
+            query[field] = {"$regex": str(value)[:2], "$options": "i"} if isinstance(value, str) else value
+    if rng.random() < 0.2:
+        query = {"$or": [query, _random_filter(rng)]}
+    return query
+
+
+def test_random_filters() -> None:
+    rng = random.Random(34)
+    queries = [_random_filter(rng) for _ in range(400)]
+    for indexed, sqlite_collection, mongo_collection in _both():
+        for query in queries:
+            expected = sorted(_ids(mongo_collection.find(query)))
+            assert sorted(_ids(sqlite_collection.find(query))) == expected, f"indexed={indexed} filter={query}"
+
+
+if __name__ == "__main__":
+    for name, case in sorted(globals().items()):
+        if name.startswith("test_") and callable(case):
+            case()
+            print(f"✅ {name}")
@@ -0,0 +1,166 @@
+"""Content-addressed blob storage for TP artifact payloads.
+
+Each distinct file content is stored once per database, keyed by its sha256, no matter how
+many TPs or products reference it.  The bytes are split into fixed-size chunks that are
+zlib-compressed independently, so a ranged read only fetches and inflates the chunks that
+overlap the requested range.
+
+Layout:
+
+* ``artifact_blobs``: ``{_id: sha256, size, chunk_size, chunk_count, stored_bytes,
+  compression, created_at}``.  Written last, so its presence means every chunk is stored.
+* ``artifact_blob_chunks``: ``{_id: "<sha256>:<n>", blob_id, n, data}`` with ``data`` the
+  compressed bytes of raw range ``[n * chunk_size, (n + 1) * chunk_size)``.
+
+Chunk ids are derived from the content, so writers storing the same content concurrently (or
+retrying after an interrupted upload) write identical chunks and each write simply replaces
+the previous one; nothing is ever deleted.
+
+GridFS would cover the chunking but not the compression, and it is not available on the
+mongomock/SQLite backends the tools also run against.
+"""
+from __future__ import annotations
+
+import hashlib
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+COMPRESSION = "zlib"
+_HASH_BLOCK = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _chunk_id(sha256: str, index: int) -> str:
+    return f"{sha256}:{index:06d}"
+
+
+class BlobStore:
+    """Chunked, compressed, content-addressed blobs in two Mongo collections."""
+
+    def __init__(
+        self,
+        blobs: Any,
+        chunks: Any,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        compress_level: int = 6,
+    ) -> None:
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self._blobs = blobs
+        self._chunks = chunks
+        self.chunk_size = chunk_size
+        self.compress_level = compress_level
+
+    def stat(self, sha256: str) -> Optional[Dict[str, Any]]:
+        return self._blobs.find_one({"_id": sha256})
+
+    def exists(self, sha256: str) -> bool:
+        return self._blobs.find_one({"_id": sha256}, {"_id": 1}) is not None
+
+    def known(self, digests: Iterable[str]) -> Set[str]:
+        """Return the subset of *digests* that are fully stored."""
+        wanted = sorted(set(digests))
+        if not wanted:
+            return set()
+        return {doc["_id"] for doc in self._blobs.find({"_id": {"$in": wanted}}, {"_id": 1})}
+
+    def put_file(self, path: Path, sha256: Optional[str] = None) -> Tuple[str, bool]:
+        """Store *path* unless its content is already present.
+
+        Returns the sha256 and whether this call stored it.  Pass *sha256* when it is already
+        known to skip the hashing pass.
+        """
+        sha256 = sha256 or file_sha256(path)
+        if self.exists(sha256):
+            return sha256, False
+        with path.open("rb") as handle:
+            return sha256, self._put_blocks(sha256, iter(lambda: handle.read(self.chunk_size), b""))
+
+    def put_bytes(self, data: bytes) -> Tuple[str, bool]:
+        sha256 = hashlib.sha256(data).hexdigest()
+        if self.exists(sha256):
+            return sha256, False
+        blocks = (data[start : start + self.chunk_size] for start in range(0, len(data), self.chunk_size))
+        return sha256, self._put_blocks(sha256, blocks)
+
+    def _put_blocks(self, sha256: str, blocks: Iterator[bytes]) -> bool:
+        digest = hashlib.sha256()
+        size = stored = count = 0
+        for index, block in enumerate(blocks):
+            digest.update(block)
+            data = zlib.compress(block, self.compress_level)
+            chunk_id = _chunk_id(sha256, index)
+            self._chunks.replace_one(
+                {"_id": chunk_id},
+                {"_id": chunk_id, "blob_id": sha256, "n": index, "data": data},
+                upsert=True,
+            )
+            size += len(block)
+            stored += len(data)
+            count = index + 1
+        if digest.hexdigest() != sha256:
+            # No blob document is written, so the chunks stay unreachable until an upload of
+            # the real content replaces them.
+            raise ValueError(f"Content changed while storing blob {sha256}")
+        try:
+            result = self._blobs.update_one(
+                {"_id": sha256},
+                {
+                    "$setOnInsert": {
+                        "size": size,
+                        "chunk_size": self.chunk_size,
+                        "chunk_count": count,
+                        "stored_bytes": stored,
+                        "compression": COMPRESSION,
+                        "created_at": datetime.now(timezone.utc),
+                    }
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # Another writer stored the same content concurrently.
+            return False
+        return result.upserted_id is not None
+
+    def read(self, sha256: str, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """Return ``length`` bytes from ``offset`` (to the end when *length* is None).
+
+        Raises KeyError when the blob is not stored.
+        """
+        meta = self.stat(sha256)
+        if meta is None:
+            raise KeyError(sha256)
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must be non-negative")
+        size = meta["size"]
+        end = size if length is None else min(size, offset + length)
+        if offset >= end:
+            return b""
+        chunk_size = meta["chunk_size"]
+        first, last = offset // chunk_size, (end - 1) // chunk_size
+        cursor = self._chunks.find({"blob_id": sha256, "n": {"$gte": first, "$lte": last}}).sort("n", 1)
+        parts = []
+        expected = first
+        for chunk in cursor:
+            if chunk["n"] != expected:
+                raise ValueError(f"Blob {sha256} is missing chunk {expected}")
+            parts.append(zlib.decompress(chunk["data"]))
+            expected += 1
+        if expected != last + 1:
+            raise ValueError(f"Blob {sha256} is missing chunk {expected}")
+        data = b"".join(parts)
+        start = offset - first * chunk_size
+        return data[start : start + (end - offset)]
@@ -0,0 +1,124 @@
+"""Bulk sync of Products.json entries into the ``product_configs`` collection.
+
+Both ``sync_products_to_mongo.py`` and the scanner's end-of-run ``update_products_json`` push
+the whole catalog, which used to cost one ``update_one`` round trip per product plus a
+``count_documents``.  :func:`sync_product_catalog` reads the stored ``content_hash`` of every
+product in one query, then sends only the products whose document changed as a single
+unordered ``bulk_write``.  The hash covers the serialized document without ``updated_at``, so
+an unchanged catalog costs one read and no writes.
+
+``MongoWriter.upsert_product_config`` clears ``content_hash`` when ingestion rewrites a product
+document, so the next catalog sync rewrites that product instead of trusting a stale hash.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from pymongo import UpdateOne
+
+HASH_FIELD = "content_hash"
+PRODUCT_FIELDS = {
+    "ProductCode",
+    "ProductName",
+    "NetworkPath",
+    "LatestTP",
+    "NumberOfReleases",
+    "ListOfReleases",
+    "LastRunDate",
+}
+
+
+def product_document(product: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+    """The ``product_configs`` document for one Products.json entry (None without a code)."""
+    code = (product.get("ProductCode") or "").upper()
+    if not code:
+        return None
+    return {
+        "product_code": code,
+        "product_name": product.get("ProductName"),
+        "network_path": product.get("NetworkPath"),
+        "latest_tp": product.get("LatestTP"),
+        "number_of_releases": product.get("NumberOfReleases") or 0,
+        "releases": product.get("ListOfReleases", []) or [],
+        "last_run_date": product.get("LastRunDate"),
+        "additional_attributes": {k: v for k, v in product.items() if k not in PRODUCT_FIELDS},
+    }
+
+
+def content_hash(document: Mapping[str, Any]) -> str:
+    payload = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CatalogSyncResult:
+    """Product codes by outcome; ``total`` is the collection size after the (possibly dry) sync."""
+
+    inserted: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    total: int = 0
+    dry_run: bool = False
+
+    @property
+    def written(self) -> int:
+        return len(self.inserted) + len(self.updated)
+
+
+def sync_product_catalog(
+    collection: Any,
+    products: Iterable[Mapping[str, Any]],
+    *,
+    dry_run: bool = False,
+    force: bool = False,
+) -> CatalogSyncResult:
+    """Upsert every product whose document hash differs from the stored one.
+
+    With *dry_run* nothing is written; ``inserted``/``updated`` list what would be.  *force*
+    rewrites every product regardless of its stored hash.  A later entry for the same code
+    replaces an earlier one, matching what sequential upserts produced.
+    """
+    documents: Dict[str, Dict[str, Any]] = {}
+    for product in products:
+        document = product_document(product)
+        if document is not None:
+            documents[document["product_code"]] = document
+
+    stored: Dict[str, Optional[str]] = {
+        row["product_code"]: row.get(HASH_FIELD)
+        for row in collection.find({}, {"product_code": 1, HASH_FIELD: 1, "_id": 0})
+        if row.get("product_code")
+    }
+
+    result = CatalogSyncResult(dry_run=dry_run)
+    operations: List[UpdateOne] = []
+    codes: List[str] = []
+    now = datetime.now(timezone.utc).isoformat()
+    for code, document in documents.items():
+        digest = content_hash(document)
+        if not force and stored.get(code) == digest:
+            result.unchanged.append(code)
+            continue
+        codes.append(code)
+        operations.append(
+            UpdateOne(
+                {"product_code": code},
+                {"$set": {**document, HASH_FIELD: digest, "updated_at": now}},
+                upsert=True,
+            )
+        )
+
+    if dry_run or not operations:
+        for code in codes:
+            (result.updated if code in stored else result.inserted).append(code)
+    else:
+        outcome = collection.bulk_write(operations, ordered=False)
+        upserted = {codes[index] for index in outcome.upserted_ids}
+        for code in codes:
+            (result.inserted if code in upserted else result.updated).append(code)
+    result.total = len(stored) + len(result.inserted)
+    return result
@@ -0,0 +1,84 @@
+"""Process-wide MongoClient registry.
+
+A ``MongoClient`` owns a connection pool plus monitoring threads, and opening one against the
+three-node TLS replica set costs several handshakes.  Writers and scripts should borrow the
+shared client for their URI from :func:`get_client` instead of constructing their own; the
+registry closes every client at interpreter exit.  Pool sizing can be tuned through the
+``TPFD_MONGO_MAX_POOL_SIZE``/``TPFD_MONGO_MIN_POOL_SIZE``/``TPFD_MONGO_MAX_IDLE_MS`` env vars.
+``sqlite:///<path>`` URIs open the embedded store in :mod:`tp_ingest.sqlite_store` instead.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from typing import Any, Dict
+
+from pymongo import MongoClient
+
+from .sqlite_store import SQLiteClient, is_sqlite_uri
+
+try:
+    import mongomock
+except ImportError:  # pragma: no cover - optional dependency
+    mongomock = None
+
+DEFAULT_MAX_POOL_SIZE = 16
+DEFAULT_MIN_POOL_SIZE = 1
+DEFAULT_MAX_IDLE_MS = 300_000
+
+_CLIENTS: Dict[str, Any] = {}
+_LOCK = threading.Lock()
+_OWNER_PID = os.getpid()
+
+
+def pool_options() -> Dict[str, Any]:
+    """Connection-pool keyword arguments applied to every registry client."""
+    return {
+        "maxPoolSize": int(os.environ.get("TPFD_MONGO_MAX_POOL_SIZE", DEFAULT_MAX_POOL_SIZE)),
+        "minPoolSize": int(os.environ.get("TPFD_MONGO_MIN_POOL_SIZE", DEFAULT_MIN_POOL_SIZE)),
+        "maxIdleTimeMS": int(os.environ.get("TPFD_MONGO_MAX_IDLE_MS", DEFAULT_MAX_IDLE_MS)),
+        "retryWrites": True,
+    }
+
+
+def is_mock_uri(uri: str) -> bool:
+    return uri.startswith("mongomock://")
+
+
+def get_client(uri: str) -> MongoClient:
+    """Return the shared client for *uri*, creating it on first use.
+
+    ``mongomock://`` URIs map to one in-memory client per URI so writers in the same process
+    see each other's data; ``sqlite:///`` URIs map to one connection per database file.
+    Clients are not shared across ``fork``: a child process starts with an empty registry.
+    """
+    global _OWNER_PID
+    with _LOCK:
+        if os.getpid() != _OWNER_PID:
+            _CLIENTS.clear()
+            _OWNER_PID = os.getpid()
+        client = _CLIENTS.get(uri)
+        if client is None:
+            if is_mock_uri(uri):
+                if mongomock is None:
+                    raise RuntimeError("mongomock URI requested but mongomock is not installed.")
+                client = mongomock.MongoClient()
+            elif is_sqlite_uri(uri):
+                client = SQLiteClient.from_uri(uri)
+            else:
+                client = MongoClient(uri, **pool_options())
+            _CLIENTS[uri] = client
+        return client
+
+
+def close_clients() -> None:
+    """Close every registered client (runs automatically at exit)."""
+    with _LOCK:
+        clients = list(_CLIENTS.values()) if os.getpid() == _OWNER_PID else []
+        _CLIENTS.clear()
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_clients)
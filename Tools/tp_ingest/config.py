@@ -24,6 +24,10 @@ class MongoSettings:
     flow_map_collection: str
     artifacts_collection: str
     hvqk_collection: str
+    hvqk_blob_collection: str = "hvqk_blobs"
+    artifact_blob_collection: str = "artifact_blobs"
+    artifact_chunk_collection: str = "artifact_blob_chunks"
+    query_activity_collection: str = "query_activity"
     tls: bool = True
 
     @classmethod
@@ -55,6 +59,12 @@ class MongoSettings:
         flow_map_collection = os.environ.get("TPFD_MONGO_FLOW_MAP_COLLECTION", "flow_map")
         artifacts_collection = os.environ.get("TPFD_MONGO_ARTIFACTS_COLLECTION", "artifacts")
         hvqk_collection = os.environ.get("TPFD_MONGO_HVQK_COLLECTION", "hvqk_configs")
+        hvqk_blob_collection = os.environ.get("TPFD_MONGO_HVQK_BLOB_COLLECTION", "hvqk_blobs")
+        artifact_blob_collection = os.environ.get("TPFD_MONGO_ARTIFACT_BLOB_COLLECTION", "artifact_blobs")
+        artifact_chunk_collection = os.environ.get(
+            "TPFD_MONGO_ARTIFACT_CHUNK_COLLECTION", "artifact_blob_chunks"
+        )
+        query_activity_collection = os.environ.get("TPFD_MONGO_QUERY_ACTIVITY_COLLECTION", "query_activity")
         tls = os.environ.get("TPFD_MONGO_TLS", "true").lower() in {"1", "true", "yes"}
         return cls(
             uri=uri,
@@ -72,6 +82,10 @@ class MongoSettings:
             flow_map_collection=flow_map_collection,
             artifacts_collection=artifacts_collection,
             hvqk_collection=hvqk_collection,
+            hvqk_blob_collection=hvqk_blob_collection,
+            artifact_blob_collection=artifact_blob_collection,
+            artifact_chunk_collection=artifact_chunk_collection,
+            query_activity_collection=query_activity_collection,
             tls=tls,
         )
 
@@ -81,10 +95,29 @@ class IngestSettings:
     tp_root: Path
     mongo: MongoSettings
     repo_root: Path
+    parquet_root: Optional[Path] = None
+    snapshot_dir: Optional[Path] = None
+    csv_engine: str = "python"
+    artifact_blob_max_bytes: int = 64 * 1024 * 1024
+    hvqk_index_dir: Optional[Path] = None
 
     @classmethod
     def from_env(cls, repo_root: Optional[Path] = None) -> "IngestSettings":
         repo_root = repo_root or Path.cwd()
         tp_root_env = os.environ.get("TPFD_TP_ROOT")
         tp_root = Path(tp_root_env) if tp_root_env else repo_root / "Test Programs"
-        return cls(tp_root=tp_root, mongo=MongoSettings.from_env(), repo_root=repo_root)
+        parquet_root_env = os.environ.get("TPFD_PARQUET_ROOT")
+        snapshot_dir_env = os.environ.get("TPFD_SNAPSHOT_DIR")
+        hvqk_index_dir_env = os.environ.get("TPFD_HVQK_INDEX_DIR")
+        return cls(
+            tp_root=tp_root,
+            mongo=MongoSettings.from_env(),
+            repo_root=repo_root,
+            parquet_root=Path(parquet_root_env) if parquet_root_env else None,
+            snapshot_dir=Path(snapshot_dir_env) if snapshot_dir_env else None,
+            csv_engine=os.environ.get("TPFD_CSV_ENGINE", "python"),
+            artifact_blob_max_bytes=int(
+                os.environ.get("TPFD_ARTIFACT_BLOB_MAX_BYTES", str(cls.artifact_blob_max_bytes))
+            ),
+            hvqk_index_dir=Path(hvqk_index_dir_env) if hvqk_index_dir_env else None,
+        )
@@ -0,0 +1,33 @@
+"""Small filesystem helpers shared by the ingestion tooling."""
+from __future__ import annotations
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+
+@contextmanager
+def atomic_writer(path: Path, mode: str = "w", *, encoding: Optional[str] = None) -> Iterator[IO]:
+    """Open a temp file next to *path* and rename it over *path* once the block succeeds."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Path, text: str, *, encoding: str = "utf-8") -> None:
+    """Write *text* to *path* via a temp file and rename so readers never see a partial file."""
+    with atomic_writer(path, "w", encoding=encoding) as handle:
+        handle.write(text)
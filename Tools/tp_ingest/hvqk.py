@@ -0,0 +1,348 @@
+"""Discovery and indexing of the per-module HVQK waterfall configs.
+
+Every ``*.hvqk.config.json`` lives somewhere under ``Modules/<module>/InputFiles``.
+:func:`walk_hvqk_tree` is the one walker over that layout; ingestion and the HVQK listing
+scripts share it.
+
+Walking every module's InputFiles and re-reading every JSON is slow on a network share, so
+:class:`HVQKIndexCache` keeps the parsed configs of each TP in a small JSON file.  The walker
+records the mtime of every directory it visited, so a cached index stays valid while none of
+those directories and none of the indexed files changed: a cache hit costs one ``stat`` per
+directory and file and no listing.  Adding or removing a config changes its directory's
+mtime, and a new subdirectory changes its parent's.
+
+:func:`fetch_hvqk_index` reads the same entries back from the ``hvqk_configs`` collection
+(joined with ``hvqk_blobs``) for TPs that have been ingested.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from . import models
+from .clients import get_client
+from .config import IngestSettings
+from .fileio import atomic_write_text
+from .product_config import load_product_catalog
+
+LOGGER = logging.getLogger(__name__)
+
+HVQK_SUFFIX = ".hvqk.config.json"
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".hvqk-index.json"
+LOCAL_SOURCE = "local"
+MONGO_SOURCE = "mongo"
+SOURCES = (LOCAL_SOURCE, MONGO_SOURCE)
+
+
+@dataclass
+class HVQKTree:
+    """HVQK config files under one TP plus the mtime of every directory visited to find them."""
+
+    files: List[Tuple[str, Path]] = field(default_factory=list)
+    directories: Dict[str, int] = field(default_factory=dict)
+
+
+def _scan_input_dir(input_dir: Path, directories: Dict[str, int]) -> List[Path]:
+    found: List[Path] = []
+    pending = [input_dir]
+    while pending:
+        current = pending.pop()
+        try:
+            directories[str(current)] = current.stat().st_mtime_ns
+            with os.scandir(current) as iterator:
+                for item in iterator:
+                    if item.is_dir():
+                        pending.append(Path(item.path))
+                    elif item.name.endswith(HVQK_SUFFIX) and item.is_file():
+                        found.append(Path(item.path))
+        except OSError as exc:
+            LOGGER.warning("Unable to list %s: %s", current, exc)
+    return sorted(found, key=lambda path: path.relative_to(input_dir).as_posix().lower())
+
+
+def walk_hvqk_tree(tp_dir: Path) -> HVQKTree:
+    """Find every HVQK config under ``tp_dir/Modules/*/InputFiles``, modules in name order."""
+    tree = HVQKTree()
+    modules_dir = tp_dir / "Modules"
+    try:
+        tree.directories[str(modules_dir)] = modules_dir.stat().st_mtime_ns
+        module_dirs = sorted((p for p in modules_dir.iterdir() if p.is_dir()), key=lambda p: p.name.lower())
+    except OSError:
+        # Watch the TP folder itself so a Modules directory created later invalidates the index.
+        try:
+            tree.directories = {str(tp_dir): tp_dir.stat().st_mtime_ns}
+        except OSError:
+            pass
+        return tree
+    for module_dir in module_dirs:
+        try:
+            tree.directories[str(module_dir)] = module_dir.stat().st_mtime_ns
+        except OSError:
+            continue
+        input_dir = module_dir / "InputFiles"
+        if not input_dir.is_dir():
+            continue
+        tree.files.extend((module_dir.name, path) for path in _scan_input_dir(input_dir, tree.directories))
+    return tree
+
+
+def iter_hvqk_files(tp_dir: Path) -> Iterator[Tuple[str, Path]]:
+    """Yield ``(module_name, path)`` for every HVQK config under *tp_dir*."""
+    yield from walk_hvqk_tree(tp_dir).files
+
+
+def _entries_from_files(
+    tp_dir: Path,
+    files: Iterable[Tuple[str, Path]],
+    known_blobs: Optional[Callable[[Iterable[str]], Set[str]]] = None,
+) -> List[models.HVQKConfigEntry]:
+    read: List[Tuple[str, Path, bytes, str]] = []
+    for module_name, file_path in files:
+        try:
+            raw_bytes = file_path.read_bytes()
+        except OSError:
+            continue
+        read.append((module_name, file_path, raw_bytes, hashlib.sha256(raw_bytes).hexdigest()))
+    known = known_blobs(digest for *_, digest in read) if known_blobs and read else set()
+
+    entries: List[models.HVQKConfigEntry] = []
+    for module_name, file_path, raw_bytes, digest in read:
+        config_payload: Optional[Dict[str, Any]] = None
+        if digest not in known:
+            try:
+                text = raw_bytes.decode("utf-8")
+            except UnicodeDecodeError:
+                text = raw_bytes.decode("utf-8", errors="ignore")
+            try:
+                config_payload = json.loads(text)
+            except json.JSONDecodeError as exc:
+                config_payload = {"__parse_error__": str(exc)}
+        entries.append(
+            models.HVQKConfigEntry(
+                module_name=module_name,
+                file_name=file_path.name,
+                relative_path=file_path.relative_to(tp_dir).as_posix(),
+                size_bytes=len(raw_bytes),
+                sha256=digest,
+                config=config_payload,
+            )
+        )
+    return entries
+
+
+def collect_hvqk_configs(
+    tp_dir: Path,
+    known_blobs: Optional[Callable[[Iterable[str]], Set[str]]] = None,
+) -> List[models.HVQKConfigEntry]:
+    """Hash and parse every HVQK config under *tp_dir*.
+
+    *known_blobs* maps digests to the subset already in the blob store (see
+    ``MongoWriter.known_hvqk_blobs``); those files are hashed but not parsed and get
+    ``config=None``.
+    """
+    return _entries_from_files(tp_dir, iter_hvqk_files(tp_dir), known_blobs)
+
+
+def _stat_marker(path: Path) -> Optional[List[int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class HVQKIndexCache:
+    """Directory of ``<tp_name>-<key>.hvqk-index.json`` files, one per TP folder."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _path(self, tp_dir: Path) -> Path:
+        key = hashlib.sha1(str(tp_dir.resolve()).encode("utf-8")).hexdigest()[:12]
+        return self.directory / f"{tp_dir.name}-{key}{INDEX_SUFFIX}"
+
+    def load(self, tp_dir: Path) -> Optional[List[models.HVQKConfigEntry]]:
+        """Return the cached entries for *tp_dir*, or None when missing or stale."""
+        path = self._path(tp_dir)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            LOGGER.warning("Ignoring unreadable HVQK index %s: %s", path, exc)
+            return None
+        if payload.get("version") != INDEX_VERSION:
+            return None
+        for directory, mtime_ns in payload.get("directories", {}).items():
+            try:
+                if Path(directory).stat().st_mtime_ns != mtime_ns:
+                    return None
+            except OSError:
+                return None
+        for relative, marker in payload.get("files", {}).items():
+            if _stat_marker(tp_dir / relative) != marker:
+                return None
+        try:
+            return [models.HVQKConfigEntry(**entry) for entry in payload.get("entries", [])]
+        except TypeError:
+            return None
+
+    def store(self, tp_dir: Path, tree: HVQKTree, entries: List[models.HVQKConfigEntry]) -> Path:
+        path = self._path(tp_dir)
+        files = {}
+        for entry in entries:
+            marker = _stat_marker(tp_dir / entry.relative_path)
+            if marker is not None:
+                files[entry.relative_path] = marker
+        payload = {
+            "version": INDEX_VERSION,
+            "tp_dir": str(tp_dir),
+            "directories": tree.directories,
+            "files": files,
+            "entries": [asdict(entry) for entry in entries],
+        }
+        atomic_write_text(path, json.dumps(payload, ensure_ascii=False))
+        return path
+
+    def load_or_build(self, tp_dir: Path, *, refresh: bool = False) -> Tuple[List[models.HVQKConfigEntry], bool]:
+        """Return the HVQK entries of *tp_dir* and whether they came from the cache."""
+        if not refresh:
+            cached = self.load(tp_dir)
+            if cached is not None:
+                return cached, True
+        tree = walk_hvqk_tree(tp_dir)
+        entries = _entries_from_files(tp_dir, tree.files)
+        self.store(tp_dir, tree, entries)
+        return entries, False
+
+
+def fetch_hvqk_index(
+    db: Any,
+    hvqk_collection: str,
+    blob_collection: str,
+    *,
+    tp_name: Optional[str] = None,
+    product_code: Optional[str] = None,
+    git_hash: Optional[str] = None,
+    module_name: Optional[str] = None,
+    with_configs: bool = True,
+) -> Tuple[Optional[str], List[models.HVQKConfigEntry]]:
+    """Read the HVQK entries of an ingested TP from MongoDB.
+
+    Without *git_hash* the most recent ingest of *tp_name* (or, without a TP name, of
+    *product_code*) is used.  Returns its ``tp_document_id`` (None when nothing was ingested)
+    and the entries sorted by module and file name; configs are joined from the blob
+    collection only when *with_configs* is set.
+    """
+    collection = db[hvqk_collection]
+    if tp_name and git_hash:
+        tp_document_id: Optional[str] = f"{tp_name}:{git_hash}"
+    else:
+        filters: Dict[str, Any] = {"tp_name": tp_name} if tp_name else {"product_code": product_code}
+        latest = collection.find_one(filters, {"tp_document_id": 1}, sort=[("ingested_at", -1)])
+        tp_document_id = latest.get("tp_document_id") if latest else None
+    if tp_document_id is None:
+        return None, []
+
+    filters = {"tp_document_id": tp_document_id}
+    if module_name:
+        filters["module_name"] = module_name
+    projection = None if with_configs else {"config": 0}
+    docs = list(collection.find(filters, projection))
+    if with_configs:
+        missing = sorted({doc["sha256"] for doc in docs if "config" not in doc and doc.get("sha256")})
+        if missing:
+            blobs = {
+                blob["_id"]: blob.get("config")
+                for blob in db[blob_collection].find({"_id": {"$in": missing}}, {"config": 1})
+            }
+            for doc in docs:
+                if "config" not in doc:
+                    doc["config"] = blobs.get(doc.get("sha256"))
+    entries = [
+        models.HVQKConfigEntry(
+            module_name=doc.get("module_name", ""),
+            file_name=doc.get("file_name", ""),
+            relative_path=doc.get("relative_path", ""),
+            size_bytes=doc.get("size_bytes", 0),
+            config=doc.get("config"),
+            sha256=doc.get("sha256"),
+        )
+        for doc in docs
+    ]
+    entries.sort(key=lambda entry: (entry.module_name.lower(), entry.relative_path.lower()))
+    return tp_document_id, entries
+
+
+def _resolve_local_tp_dir(
+    settings: IngestSettings,
+    tp_name: Optional[str],
+    product: Optional[models.ProductConfig],
+) -> Path:
+    if product is not None:
+        tp_name = tp_name or product.latest_tp
+        if not tp_name:
+            raise ValueError(f"Product {product.product_code} has no LatestTP in Products.json")
+        if product.network_path and (Path(product.network_path) / tp_name).is_dir():
+            return Path(product.network_path) / tp_name
+    tp_dir = settings.tp_root / tp_name
+    if not tp_dir.is_dir():
+        raise FileNotFoundError(f"TP directory not found at {tp_dir}")
+    return tp_dir
+
+
+def load_hvqk_index(
+    settings: IngestSettings,
+    *,
+    source: str = LOCAL_SOURCE,
+    tp_name: Optional[str] = None,
+    product_code: Optional[str] = None,
+    product_config_path: Optional[Path] = None,
+    module_name: Optional[str] = None,
+    refresh: bool = False,
+    with_configs: bool = True,
+) -> Tuple[str, List[models.HVQKConfigEntry]]:
+    """Return a label for the TP and its HVQK entries, from *source*.
+
+    ``"local"`` walks the TP folder once and reuses the index cached under
+    ``settings.hvqk_index_dir`` afterwards; ``"mongo"`` reads the last ingest.  Without
+    *tp_name*, *product_code* selects the product's latest TP (``LatestTP`` in Products.json
+    for the local source, the newest ingest for the product in Mongo).
+    """
+    if not tp_name and not product_code:
+        raise ValueError("A TP name or a product code is required")
+    if source == MONGO_SOURCE:
+        db = get_client(settings.mongo.uri)[settings.mongo.database]
+        tp_document_id, entries = fetch_hvqk_index(
+            db,
+            settings.mongo.hvqk_collection,
+            settings.mongo.hvqk_blob_collection,
+            tp_name=tp_name,
+            product_code=product_code.upper() if product_code else None,
+            module_name=module_name,
+            with_configs=with_configs,
+        )
+        if tp_document_id is None:
+            raise LookupError(f"No HVQK configs ingested for {tp_name or product_code}")
+        return tp_document_id, entries
+    if source != LOCAL_SOURCE:
+        raise ValueError(f"Unknown HVQK index source {source!r}; expected one of {', '.join(SOURCES)}")
+
+    product: Optional[models.ProductConfig] = None
+    if product_code:
+        path = product_config_path or settings.repo_root / "Products.json"
+        product = load_product_catalog(path).product(product_code)
+        if product is None:
+            raise LookupError(f"Product {product_code} not found in {path}")
+    tp_dir = _resolve_local_tp_dir(settings, tp_name, product)
+    cache_dir = settings.hvqk_index_dir or settings.repo_root / "state" / "hvqk_index"
+    entries, _from_cache = HVQKIndexCache(cache_dir).load_or_build(tp_dir, refresh=refresh)
+    if module_name:
+        entries = [entry for entry in entries if entry.module_name == module_name]
+    return tp_dir.name, entries
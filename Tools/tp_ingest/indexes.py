@@ -0,0 +1,330 @@
+"""Declarative index schema for every TP Front Desk collection.
+
+All indexes used by ingestion and by the query tool are declared once in ``INDEXES``.
+``ensure_schema`` compares the database's ``schema_versions`` marker with ``SCHEMA_VERSION``
+and, when they differ, applies only the missing or changed indexes.  Bump ``SCHEMA_VERSION``
+whenever ``INDEXES`` changes.  ``Tools/manage_indexes.py`` wraps the same functions as a CLI.
+
+Collections are referred to by role (``"test_instances"``, ``"ingest"``, ...) so deployments
+that rename collections through ``TPFD_MONGO_*`` settings share one declaration.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from .config import MongoSettings
+
+LOGGER = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+MARKER_COLLECTION = "schema_versions"
+MARKER_ID = "ingest_indexes"
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    role: str
+    name: str
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+
+    def options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        return options
+
+
+INDEXES: Tuple[IndexSpec, ...] = (
+    IndexSpec("ingest", "tp_git_idx", (("tp_name", ASCENDING), ("git_hash", ASCENDING))),
+    IndexSpec("ingest", "dll_inventory_name_idx", (("report.dll_inventory.name", ASCENDING),)),
+    # The query tool resolves the newest TP of a product with
+    # {$or: [{product.product_code}, {metadata.product_code}]} sorted by ingested_at.
+    IndexSpec(
+        "ingest",
+        "product_code_ingested_idx",
+        (("product.product_code", ASCENDING), ("ingested_at", DESCENDING)),
+    ),
+    IndexSpec(
+        "ingest",
+        "metadata_product_code_ingested_idx",
+        (("metadata.product_code", ASCENDING), ("ingested_at", DESCENDING)),
+    ),
+    IndexSpec(
+        "test_instances",
+        "test_instances_tp_instance_idx",
+        (("tp_document_id", ASCENDING), ("instance_name", ASCENDING)),
+        unique=True,
+    ),
+    IndexSpec(
+        "test_instances",
+        "test_instances_module_status_idx",
+        (("tp_document_id", ASCENDING), ("module_name", ASCENDING), ("status", ASCENDING)),
+    ),
+    IndexSpec(
+        "test_instances",
+        "test_instances_tp_subflow_idx",
+        (("tp_document_id", ASCENDING), ("subflow", ASCENDING)),
+    ),
+    IndexSpec(
+        "module_summary",
+        "module_summary_tp_module_idx",
+        (("tp_document_id", ASCENDING), ("module_name", ASCENDING)),
+        unique=True,
+    ),
+    IndexSpec(
+        "port_results",
+        "port_results_tp_instance_idx",
+        (("tp_document_id", ASCENDING), ("instance_name_port", ASCENDING)),
+        unique=True,
+    ),
+    IndexSpec(
+        "port_results",
+        "port_results_module_port_idx",
+        (("tp_document_id", ASCENDING), ("module_name", ASCENDING), ("port", ASCENDING)),
+    ),
+    IndexSpec(
+        "flow_map",
+        "flow_map_tp_module_dut_idx",
+        (("tp_document_id", ASCENDING), ("module", ASCENDING), ("dutflow", ASCENDING)),
+    ),
+    IndexSpec(
+        "artifacts",
+        "artifacts_tp_category_idx",
+        (("tp_document_id", ASCENDING), ("category", ASCENDING)),
+    ),
+    IndexSpec(
+        "artifact_chunks",
+        "artifact_chunks_blob_idx",
+        (("blob_id", ASCENDING), ("n", ASCENDING)),
+        unique=True,
+    ),
+    IndexSpec("hvqk", "hvqk_tp_module_idx", (("tp_document_id", ASCENDING), ("module_name", ASCENDING))),
+    IndexSpec("hvqk", "hvqk_tp_file_idx", (("tp_document_id", ASCENDING), ("file_name", ASCENDING))),
+    IndexSpec("plist", "plist_tp_idx", (("tp_document_id", ASCENDING),)),
+    IndexSpec("plist", "plist_pattern_idx", (("pattern_name", ASCENDING),)),
+    IndexSpec("cake", "cake_tp_idx", (("tp_document_id", ASCENDING),)),
+    IndexSpec("cake", "cake_domain_shift_idx", (("domain_name", ASCENDING), ("shift_name", ASCENDING))),
+    IndexSpec("vmin", "vmin_tp_idx", (("tp_document_id", ASCENDING),)),
+    IndexSpec("vmin", "vmin_module_test_idx", (("module", ASCENDING), ("test_name", ASCENDING))),
+    IndexSpec("scoreboard", "scoreboard_tp_idx", (("tp_document_id", ASCENDING),)),
+    IndexSpec(
+        "scoreboard",
+        "scoreboard_module_test_idx",
+        (("module", ASCENDING), ("test_instance", ASCENDING)),
+    ),
+    IndexSpec("product", "product_code_idx", (("product_code", ASCENDING),), unique=True),
+    IndexSpec("setpoints", "setpoints_tp_idx", (("tp_document_id", ASCENDING),)),
+    IndexSpec(
+        "setpoints",
+        "setpoints_module_test_idx",
+        (("module", ASCENDING), ("test_instance", ASCENDING)),
+    ),
+)
+
+# Schema versions already verified in this process, keyed by (client, database, collection layout).
+_VERIFIED: Set[Tuple[int, str, Tuple[Tuple[str, str], ...]]] = set()
+
+
+def collection_names(settings: MongoSettings) -> Dict[str, str]:
+    """Map each index role to the collection name configured in *settings*."""
+    return {
+        "ingest": settings.collection,
+        "test_instances": settings.test_instances_collection,
+        "plist": settings.plist_collection,
+        "cake": settings.cake_collection,
+        "vmin": settings.vmin_collection,
+        "scoreboard": settings.scoreboard_collection,
+        "product": settings.product_collection,
+        "setpoints": settings.setpoints_collection,
+        "module_summary": settings.module_summary_collection,
+        "port_results": settings.port_results_collection,
+        "flow_map": settings.flow_map_collection,
+        "artifacts": settings.artifacts_collection,
+        "artifact_chunks": settings.artifact_chunk_collection,
+        "hvqk": settings.hvqk_collection,
+    }
+
+
+def _layout(collections: Mapping[str, str]) -> List[List[str]]:
+    return [[role, collections[role]] for role in sorted(collections)]
+
+
+def _normalize_keys(keys: Any) -> Tuple[Tuple[str, int], ...]:
+    return tuple((str(field), int(direction)) for field, direction in keys)
+
+
+@dataclass
+class IndexChange:
+    collection: str
+    name: str
+    action: str  # "create", "replace" or "present"
+    detail: str = ""
+
+
+def plan_changes(db: Any, collections: Mapping[str, str]) -> List[IndexChange]:
+    """Compare declared indexes with the live ones and list what ``apply_schema`` would do."""
+    changes: List[IndexChange] = []
+    existing_by_collection: Dict[str, Dict[str, Any]] = {}
+    for spec in INDEXES:
+        collection_name = collections[spec.role]
+        if collection_name not in existing_by_collection:
+            existing_by_collection[collection_name] = db[collection_name].index_information()
+        existing = existing_by_collection[collection_name]
+        current = existing.get(spec.name)
+        if current is not None:
+            same_keys = _normalize_keys(current.get("key", ())) == spec.keys
+            same_unique = bool(current.get("unique", False)) == spec.unique
+            if same_keys and same_unique:
+                changes.append(IndexChange(collection_name, spec.name, "present"))
+            else:
+                changes.append(IndexChange(collection_name, spec.name, "replace", "definition changed"))
+            continue
+        renamed = next(
+            (
+                name
+                for name, info in existing.items()
+                if _normalize_keys(info.get("key", ())) == spec.keys
+                and bool(info.get("unique", False)) == spec.unique
+            ),
+            None,
+        )
+        if renamed:
+            changes.append(IndexChange(collection_name, spec.name, "present", f"exists as {renamed}"))
+        else:
+            changes.append(IndexChange(collection_name, spec.name, "create"))
+    return changes
+
+
+def apply_schema(
+    db: Any,
+    collections: Mapping[str, str],
+    *,
+    background: bool = False,
+) -> List[IndexChange]:
+    """Create missing indexes, rebuild changed ones and record SCHEMA_VERSION."""
+    changes = plan_changes(db, collections)
+    specs = {(collections[spec.role], spec.name): spec for spec in INDEXES}
+    for change in changes:
+        if change.action == "present":
+            continue
+        spec = specs[(change.collection, change.name)]
+        collection = db[change.collection]
+        if change.action == "replace":
+            LOGGER.info("Rebuilding index %s.%s (%s)", change.collection, change.name, change.detail)
+            collection.drop_index(change.name)
+        else:
+            LOGGER.info("Creating index %s.%s", change.collection, change.name)
+        options = spec.options()
+        if background:
+            options["background"] = True
+        collection.create_index(list(spec.keys), **options)
+    db[MARKER_COLLECTION].update_one(
+        {"_id": MARKER_ID},
+        {
+            "$set": {
+                "version": SCHEMA_VERSION,
+                "collections": _layout(collections),
+                "indexes": sorted(spec.name for spec in INDEXES),
+                "updated_at": datetime.now(timezone.utc),
+            }
+        },
+        upsert=True,
+    )
+    return changes
+
+
+def schema_is_current(db: Any, collections: Mapping[str, str]) -> bool:
+    marker = db[MARKER_COLLECTION].find_one({"_id": MARKER_ID})
+    return bool(
+        marker
+        and marker.get("version") == SCHEMA_VERSION
+        and marker.get("collections") == _layout(collections)
+    )
+
+
+def ensure_schema(db: Any, collections: Mapping[str, str]) -> bool:
+    """Bring indexes up to SCHEMA_VERSION unless already verified; True when work was done.
+
+    The marker is read at most once per process per database/collection layout.
+    """
+    key = (id(db.client), db.name, tuple((role, collections[role]) for role in sorted(collections)))
+    if key in _VERIFIED:
+        return False
+    applied = False
+    if not schema_is_current(db, collections):
+        apply_schema(db, collections)
+        applied = True
+    _VERIFIED.add(key)
+    return applied
+
+
+@dataclass
+class IndexFinding:
+    collection: str
+    name: str
+    issue: str  # "unused", "duplicate", "redundant" or "undeclared"
+    detail: str = ""
+
+
+def _is_prefix(shorter: Sequence[Tuple[str, int]], longer: Sequence[Tuple[str, int]]) -> bool:
+    return len(shorter) < len(longer) and tuple(longer[: len(shorter)]) == tuple(shorter)
+
+
+def review_indexes(db: Any, collections: Iterable[str]) -> List[IndexFinding]:
+    """Report unused, duplicate, redundant (key prefix of another index) and undeclared indexes.
+
+    Usage counts come from ``$indexStats`` and reset when a server restarts, so "unused"
+    only means "not used since the server started".
+    """
+    declared = {(spec.role, spec.name) for spec in INDEXES}
+    declared_names = {name for _, name in declared}
+    findings: List[IndexFinding] = []
+    for collection_name in sorted(set(collections)):
+        collection = db[collection_name]
+        info = collection.index_information()
+        keyed = {
+            name: _normalize_keys(details.get("key", ()))
+            for name, details in info.items()
+            if name != "_id_"
+        }
+        seen: Dict[Tuple[Tuple[str, int], ...], str] = {}
+        for name, keys in sorted(keyed.items()):
+            if keys in seen:
+                findings.append(IndexFinding(collection_name, name, "duplicate", f"same keys as {seen[keys]}"))
+            else:
+                seen[keys] = name
+            unique = bool(info[name].get("unique", False))
+            for other_name, other_keys in keyed.items():
+                if other_name != name and not unique and _is_prefix(keys, other_keys):
+                    findings.append(
+                        IndexFinding(collection_name, name, "redundant", f"prefix of {other_name}")
+                    )
+                    break
+            if name not in declared_names:
+                findings.append(IndexFinding(collection_name, name, "undeclared"))
+        try:
+            stats = list(collection.aggregate([{"$indexStats": {}}]))
+        except (OperationFailure, NotImplementedError) as exc:
+            LOGGER.debug("$indexStats unavailable for %s: %s", collection_name, exc)
+            continue
+        for entry in stats:
+            name = entry.get("name")
+            if name == "_id_":
+                continue
+            ops = (entry.get("accesses") or {}).get("ops", 0)
+            if not ops:
+                since = (entry.get("accesses") or {}).get("since")
+                findings.append(IndexFinding(collection_name, name, "unused", f"0 ops since {since}"))
+    return findings
+
+
+def declared_collections(collections: Mapping[str, str], roles: Optional[Iterable[str]] = None) -> List[str]:
+    wanted = set(roles) if roles else {spec.role for spec in INDEXES}
+    return sorted({collections[role] for role in wanted if role in collections})
@@ -0,0 +1,375 @@
+"""SQLite-backed ledger for daily scanner state, job attempts, and alerts."""
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+FAILURE_STATUSES = {
+    "network-unavailable",
+    "copy-timeout",
+    "copy-failed",
+    "ingest-failed",
+}
+
+LEDGER_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_code TEXT PRIMARY KEY,
+    product_name TEXT,
+    last_scan TEXT
+);
+CREATE TABLE IF NOT EXISTS processed_tps (
+    product_code TEXT NOT NULL,
+    tp_name TEXT NOT NULL,
+    last_processed TEXT NOT NULL,
+    git_hash TEXT,
+    mongo_doc_id TEXT,
+    PRIMARY KEY (product_code, tp_name)
+);
+CREATE INDEX IF NOT EXISTS processed_tps_tp_idx ON processed_tps (tp_name);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    product_code TEXT,
+    tp_name TEXT,
+    status TEXT,
+    attempt INTEGER,
+    final_attempt INTEGER NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_product_status_idx ON attempts (product_code, status);
+CREATE INDEX IF NOT EXISTS attempts_tp_idx ON attempts (tp_name);
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    product_code TEXT,
+    tp_name TEXT,
+    status TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alerts_timestamp_idx ON alerts (timestamp);
+CREATE INDEX IF NOT EXISTS alerts_product_idx ON alerts (product_code, status);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL,
+    options TEXT
+);
+CREATE TABLE IF NOT EXISTS run_items (
+    run_id INTEGER NOT NULL,
+    product_code TEXT NOT NULL,
+    tp_name TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, product_code, tp_name)
+);
+"""
+
+# Checkpoint stages written per TP while a run is in flight. Terminal stages mean the TP
+# needs no further work when an interrupted run is resumed.
+STAGE_COPIED = "copied"
+STAGE_INGESTED = "ingested"
+STAGE_PARSED = "parsed"
+TERMINAL_STAGES = {STAGE_INGESTED, STAGE_PARSED}
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def is_ledger_path(path: Path) -> bool:
+    return path.suffix.lower() in LEDGER_SUFFIXES
+
+
+class ScannerLedger:
+    """Embedded job ledger shared by the scanner and the config tooling.
+
+    Every write is a short transaction, so recording a processed TP costs one
+    row upsert instead of rewriting the whole state file. WAL journaling plus a
+    busy timeout lets several scanner workers update the ledger concurrently.
+    """
+
+    def __init__(self, path: Path, *, timeout: float = 30.0) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(path),
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    # Processed TPs ---------------------------------------------------------------------
+    def is_processed(self, product_code: str, tp_name: str) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM processed_tps WHERE product_code = ? AND tp_name = ?",
+            (product_code, tp_name),
+        ).fetchone()
+        return row is not None
+
+    def processed_tp_names(self, product_code: str) -> Set[str]:
+        rows = self._conn.execute(
+            "SELECT tp_name FROM processed_tps WHERE product_code = ?",
+            (product_code,),
+        )
+        return {row["tp_name"] for row in rows}
+
+    def record_processed(
+        self,
+        product_code: str,
+        tp_name: str,
+        *,
+        git_hash: Optional[str],
+        mongo_id: Optional[str],
+        product_name: Optional[str] = None,
+    ) -> None:
+        stamp = _now_iso()
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO processed_tps (product_code, tp_name, last_processed, git_hash, mongo_doc_id)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (product_code, tp_name) DO UPDATE SET
+                    last_processed = excluded.last_processed,
+                    git_hash = excluded.git_hash,
+                    mongo_doc_id = excluded.mongo_doc_id
+                """,
+                (product_code, tp_name, stamp, git_hash or "unknown", mongo_id or "unknown"),
+            )
+            self._touch_product(conn, product_code, product_name, stamp)
+
+    def touch_product(self, product_code: str, product_name: Optional[str] = None) -> None:
+        with self.transaction() as conn:
+            self._touch_product(conn, product_code, product_name, _now_iso())
+
+    @staticmethod
+    def _touch_product(
+        conn: sqlite3.Connection,
+        product_code: str,
+        product_name: Optional[str],
+        stamp: str,
+    ) -> None:
+        conn.execute(
+            """
+            INSERT INTO products (product_code, product_name, last_scan) VALUES (?, ?, ?)
+            ON CONFLICT (product_code) DO UPDATE SET
+                product_name = COALESCE(excluded.product_name, products.product_name),
+                last_scan = excluded.last_scan
+            """,
+            (product_code, product_name, stamp),
+        )
+
+    # Attempts and alerts ---------------------------------------------------------------
+    def record_attempt(self, entry: Dict[str, Any]) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO attempts (timestamp, product_code, tp_name, status, attempt, final_attempt, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    entry.get("timestamp") or _now_iso(),
+                    entry.get("product_code"),
+                    entry.get("tp_name"),
+                    entry.get("status"),
+                    entry.get("attempt"),
+                    1 if entry.get("final_attempt") else 0,
+                    json.dumps(entry),
+                ),
+            )
+
+    def record_alert(self, entry: Dict[str, Any]) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO alerts (timestamp, product_code, tp_name, status, payload)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    entry.get("timestamp") or _now_iso(),
+                    entry.get("product_code"),
+                    entry.get("tp_name"),
+                    entry.get("status"),
+                    json.dumps(entry),
+                ),
+            )
+
+    def recent_alerts(self, *, since: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        query = "SELECT payload FROM alerts"
+        params: List[Any] = []
+        if since:
+            query += " WHERE timestamp > ?"
+            params.append(since)
+        query += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+        return [json.loads(row["payload"]) for row in self._conn.execute(query, params)]
+
+    def failure_rates(
+        self,
+        *,
+        since: Optional[str] = None,
+        failure_statuses: Iterable[str] = FAILURE_STATUSES,
+    ) -> List[Dict[str, Any]]:
+        """Return final-attempt totals and failure rates grouped by product."""
+        statuses = sorted(failure_statuses)
+        placeholders = ", ".join("?" for _ in statuses)
+        query = (
+            "SELECT product_code, COUNT(*) AS total, "
+            f"SUM(CASE WHEN status IN ({placeholders}) THEN 1 ELSE 0 END) AS failures "
+            "FROM attempts WHERE final_attempt = 1"
+        )
+        params: List[Any] = list(statuses)
+        if since:
+            query += " AND timestamp >= ?"
+            params.append(since)
+        query += " GROUP BY product_code ORDER BY product_code"
+        results: List[Dict[str, Any]] = []
+        for row in self._conn.execute(query, params):
+            total = row["total"] or 0
+            failures = row["failures"] or 0
+            results.append(
+                {
+                    "product_code": row["product_code"],
+                    "total": total,
+                    "failures": failures,
+                    "failure_rate": (failures / total) if total else None,
+                }
+            )
+        return results
+
+    # Run checkpoints ---------------------------------------------------------------------
+    def start_run(self, options: Optional[Dict[str, Any]] = None) -> int:
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (started_at, status, options) VALUES (?, 'running', ?)",
+                (_now_iso(), json.dumps(options or {}, default=str)),
+            )
+            return int(cursor.lastrowid)
+
+    def finish_run(self, run_id: int, status: str = "completed") -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE runs SET finished_at = ?, status = ? WHERE run_id = ?",
+                (_now_iso(), status, run_id),
+            )
+
+    def latest_interrupted_run(self) -> Optional[int]:
+        """Return the most recent run if it never finished, otherwise ``None``."""
+        row = self._conn.execute(
+            "SELECT run_id, status FROM runs ORDER BY run_id DESC LIMIT 1"
+        ).fetchone()
+        if row is None or row["status"] != "running":
+            return None
+        return int(row["run_id"])
+
+    def checkpoint(self, run_id: int, product_code: str, tp_name: str, stage: str) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO run_items (run_id, product_code, tp_name, stage, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (run_id, product_code, tp_name) DO UPDATE SET
+                    stage = excluded.stage,
+                    updated_at = excluded.updated_at
+                """,
+                (run_id, product_code, tp_name, stage, _now_iso()),
+            )
+
+    def run_stages(self, run_id: int) -> Dict[Tuple[str, str], str]:
+        rows = self._conn.execute(
+            "SELECT product_code, tp_name, stage FROM run_items WHERE run_id = ?",
+            (run_id,),
+        )
+        return {(row["product_code"], row["tp_name"]): row["stage"] for row in rows}
+
+    # Legacy state interop ---------------------------------------------------------------
+    def is_empty(self) -> bool:
+        row = self._conn.execute("SELECT 1 FROM processed_tps LIMIT 1").fetchone()
+        return row is None
+
+    def import_state(self, state: Dict[str, Any]) -> int:
+        """Load a legacy ``daily_scanner_state.json`` payload; returns rows imported."""
+        imported = 0
+        products = state.get("products", {}) if isinstance(state, dict) else {}
+        with self.transaction() as conn:
+            for product_code, bucket in products.items():
+                if not isinstance(bucket, dict):
+                    continue
+                conn.execute(
+                    "INSERT OR IGNORE INTO products (product_code, last_scan) VALUES (?, ?)",
+                    (product_code, bucket.get("last_scan")),
+                )
+                for tp_name, metadata in (bucket.get("processed_tps") or {}).items():
+                    metadata = metadata or {}
+                    cursor = conn.execute(
+                        """
+                        INSERT OR IGNORE INTO processed_tps
+                            (product_code, tp_name, last_processed, git_hash, mongo_doc_id)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        (
+                            product_code,
+                            tp_name,
+                            metadata.get("last_processed") or _now_iso(),
+                            metadata.get("git_hash"),
+                            metadata.get("mongo_doc_id"),
+                        ),
+                    )
+                    imported += cursor.rowcount
+        return imported
+
+    def to_state_dict(self) -> Dict[str, Any]:
+        """Render the ledger in the legacy ``{"products": {...}}`` state shape."""
+        products: Dict[str, Dict[str, Any]] = {}
+        for row in self._conn.execute("SELECT product_code, last_scan FROM products"):
+            bucket = products.setdefault(row["product_code"], {"processed_tps": {}})
+            if row["last_scan"]:
+                bucket["last_scan"] = row["last_scan"]
+        rows = self._conn.execute(
+            "SELECT product_code, tp_name, last_processed, git_hash, mongo_doc_id "
+            "FROM processed_tps ORDER BY last_processed"
+        )
+        for row in rows:
+            bucket = products.setdefault(row["product_code"], {"processed_tps": {}})
+            bucket["processed_tps"][row["tp_name"]] = {
+                "last_processed": row["last_processed"],
+                "git_hash": row["git_hash"] or "unknown",
+                "mongo_doc_id": row["mongo_doc_id"] or "unknown",
+            }
+        return {"products": products}
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def load_scanner_state(path: Path) -> Dict[str, Any]:
+    """Read scanner state from either a ledger database or a legacy JSON file."""
+    if is_ledger_path(path):
+        if not path.exists():
+            return {"products": {}}
+        ledger = ScannerLedger(path)
+        try:
+            return ledger.to_state_dict()
+        finally:
+            ledger.close()
+    return json.loads(path.read_text(encoding="utf-8"))
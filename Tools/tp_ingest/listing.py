@@ -0,0 +1,188 @@
+"""Cached enumeration of TP folders on product network shares.
+
+Listing a large production share over SMB and stat-ing every child is the slowest part of
+discovery, and the scanner, config service and seeding tool all do it.  The cache keeps the
+last listing of each share (child names and mtimes) in a small JSON file:
+
+* if the share's own mtime is unchanged, the cached listing is returned without enumerating;
+* otherwise only child names are enumerated, names already in the cache reuse their mtime,
+  and the remaining names are stat-ed concurrently.  Names the caller already knows about
+  (e.g. TPs recorded in the scanner ledger) are reported separately from genuinely new ones.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional
+
+from .fileio import atomic_write_text
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+DEFAULT_STAT_WORKERS = 8
+
+
+@dataclass
+class ShareListing:
+    """Directories found under one network share, newest first."""
+
+    network_path: Path
+    directories: List[Path]
+    new_names: List[str] = field(default_factory=list)
+    from_cache: bool = False
+    latest_mtime: Optional[float] = None
+
+    @property
+    def names(self) -> List[str]:
+        return [directory.name for directory in self.directories]
+
+
+class DirectoryListingCache:
+    """Remembers the last listing of each share so repeat scans avoid per-child stats."""
+
+    def __init__(self, path: Optional[Path] = None, *, max_workers: int = DEFAULT_STAT_WORKERS) -> None:
+        self.path = path
+        self.max_workers = max(1, max_workers)
+        self._shares: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        # Shares may be listed from several threads (see tp_ingest.shares).
+        self._lock = threading.Lock()
+        if path is not None:
+            self._load(path)
+
+    def _load(self, path: Path) -> None:
+        if not path.exists():
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            LOGGER.warning("Ignoring unreadable listing cache %s: %s", path, exc)
+            return
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return
+        shares = data.get("shares")
+        if isinstance(shares, dict):
+            self._shares = shares
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        with self._lock:
+            payload = {"version": CACHE_VERSION, "shares": dict(self._shares)}
+            self._dirty = False
+        atomic_write_text(self.path, json.dumps(payload, indent=2, sort_keys=True))
+
+    def list_share(
+        self,
+        network_path: Path,
+        *,
+        known_names: Collection[str] = (),
+        refresh: bool = False,
+    ) -> ShareListing:
+        """Return the child directories of *network_path* sorted newest first.
+
+        Raises FileNotFoundError when the share cannot be enumerated.
+        """
+        key = str(network_path)
+        try:
+            share_mtime = network_path.stat().st_mtime
+        except OSError as exc:
+            raise FileNotFoundError(f"Unable to enumerate {network_path}: {exc}") from exc
+
+        cached = self._shares.get(key)
+        cached_entries: Dict[str, float] = dict(cached.get("entries") or {}) if cached else {}
+        if cached and not refresh and cached.get("mtime") == share_mtime:
+            return ShareListing(
+                network_path,
+                _ordered(network_path, cached_entries),
+                from_cache=True,
+                latest_mtime=max(cached_entries.values(), default=None),
+            )
+
+        try:
+            with os.scandir(network_path) as iterator:
+                names = [entry.name for entry in iterator if _is_dir(entry)]
+        except OSError as exc:
+            raise FileNotFoundError(f"Unable to enumerate {network_path}: {exc}") from exc
+
+        known = set(known_names)
+        entries: Dict[str, float] = {}
+        uncached: List[str] = []
+        for name in names:
+            if name in cached_entries and not refresh:
+                entries[name] = cached_entries[name]
+            else:
+                uncached.append(name)
+        new_names = [name for name in uncached if name not in known and name not in cached_entries]
+        entries.update(self._stat_children(network_path, uncached))
+
+        with self._lock:
+            self._shares[key] = {
+                "mtime": share_mtime,
+                "listed_at": datetime.now(timezone.utc).isoformat(),
+                "entries": entries,
+            }
+            self._dirty = True
+        if new_names:
+            LOGGER.info("Found %s new TP folder(s) under %s", len(new_names), network_path)
+        return ShareListing(
+            network_path,
+            _ordered(network_path, entries),
+            new_names=new_names,
+            latest_mtime=max(entries.values(), default=None),
+        )
+
+    def sorted_directories(
+        self,
+        network_path: Path,
+        *,
+        known_names: Collection[str] = (),
+        refresh: bool = False,
+    ) -> List[Path]:
+        return self.list_share(network_path, known_names=known_names, refresh=refresh).directories
+
+    def _stat_children(self, network_path: Path, names: List[str]) -> Dict[str, float]:
+        if not names:
+            return {}
+        if len(names) == 1 or self.max_workers == 1:
+            return {name: _child_mtime(network_path / name) for name in names}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names))) as executor:
+            mtimes = executor.map(_child_mtime, [network_path / name for name in names])
+            return dict(zip(names, mtimes))
+
+
+def _is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _child_mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def _ordered(network_path: Path, entries: Dict[str, float]) -> List[Path]:
+    ordered = sorted(entries.items(), key=lambda item: (item[1], item[0]), reverse=True)
+    return [network_path / name for name, _ in ordered]
+
+
+def sorted_directories(
+    network_path: Path,
+    *,
+    cache: Optional[DirectoryListingCache] = None,
+    known_names: Collection[str] = (),
+) -> List[Path]:
+    """List TP folders under *network_path* newest first, using *cache* when provided."""
+    listing_cache = cache if cache is not None else DirectoryListingCache()
+    return listing_cache.sorted_directories(network_path, known_names=known_names)
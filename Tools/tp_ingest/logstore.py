@@ -0,0 +1,508 @@
+"""Compaction, retention and indexed reads for the scanner's JSON-lines logs.
+
+``daily_scanner.py`` appends one JSON object per line to ``logs/daily_scanner.log`` and
+``state/daily_scanner_alerts.jsonl``.  :func:`compact_log` moves the complete lines of such a
+live file into gzip segments under ``<file>.segments/``: one segment per day of
+``timestamp``, each holding a contiguous byte range of the original file, verbatim.
+``index.json`` in the same directory lists every segment with its time range, line count,
+sizes, per-status counts and the inode/offsets of the bytes it came from.  All segments of one
+compaction share a ``source_id`` generated for it, because inodes are reused once a compacted
+file has been deleted.
+
+Compaction renames the live file aside before reading it; the scanner opens the log per
+append, so its next write starts a fresh file and nothing is lost.  A rename left behind by
+an interrupted compaction is finished by the next run.
+
+:func:`iter_entries` and :func:`status_counts` consult the index and only open segments whose
+time range and statuses can match; :func:`replay_source` returns the lines of a compacted
+file after a given offset plus every file compacted after it (how ``monitor_alerts.py`` catches
+up after a compaction).
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .fileio import atomic_write_text
+
+LOGGER = logging.getLogger(__name__)
+
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+SEGMENT_SUFFIX = ".jsonl.gz"
+COMPACTING_SUFFIX = ".compacting"
+_RENAME_ATTEMPTS = 5
+
+
+@dataclass
+class Segment:
+    """One compressed segment as recorded in the index."""
+
+    file: str
+    day: str
+    start: Optional[str]
+    end: Optional[str]
+    lines: int
+    raw_bytes: int
+    stored_bytes: int
+    status_counts: Dict[str, int] = field(default_factory=dict)
+    source_inode: int = 0
+    source_start: int = 0
+    source_end: int = 0
+    source_id: str = ""
+
+
+@dataclass
+class CompactionResult:
+    path: str
+    segments_written: List[str] = field(default_factory=list)
+    lines_compacted: int = 0
+    bytes_compacted: int = 0
+    segments_removed: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SourceReplay:
+    """Entries returned by :func:`replay_source` and where in the compacted files they end."""
+
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+    replayed: int = 0
+    source_id: str = ""
+    source_inode: int = 0
+    offset: int = 0
+
+
+def segments_dir_for(path: Path) -> Path:
+    return path.with_name(path.name + ".segments")
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class LogIndex:
+    """``index.json`` of one segments directory."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.path = directory / INDEX_NAME
+        self.segments: List[Segment] = []
+        self.next_sequence = 1
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            LOGGER.warning("Rebuilding unreadable log index %s: %s", self.path, exc)
+            self._rebuild()
+            return
+        if payload.get("version") != INDEX_VERSION:
+            self._rebuild()
+            return
+        self.segments = [Segment(**item) for item in payload.get("segments", [])]
+        self.next_sequence = int(payload.get("next_sequence", len(self.segments) + 1))
+
+    def _rebuild(self) -> None:
+        """Recreate the index from the segment files themselves (source offsets are lost)."""
+        self.segments = []
+        for segment_path in sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}")):
+            with gzip.open(segment_path, "rb") as handle:
+                lines = list(handle)
+            day = segment_path.name.split(".")[-4] if segment_path.name.count(".") >= 4 else ""
+            self.segments.append(
+                _describe_segment(segment_path, day, lines, source_inode=0, source_start=0)
+            )
+        self.next_sequence = len(self.segments) + 1
+        self.save()
+
+    def save(self) -> None:
+        payload = {
+            "version": INDEX_VERSION,
+            "next_sequence": self.next_sequence,
+            "segments": [asdict(segment) for segment in self.segments],
+        }
+        atomic_write_text(self.path, json.dumps(payload, indent=2))
+
+    def select(
+        self,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        statuses: Optional[Sequence[str]] = None,
+    ) -> List[Segment]:
+        """Segments that may hold entries in ``[since, until]`` with one of *statuses*."""
+        wanted = set(statuses) if statuses else None
+        selected: List[Segment] = []
+        for segment in self.segments:
+            start, end = _parse_time(segment.start), _parse_time(segment.end)
+            if since and end and end < since:
+                continue
+            if until and start and start > until:
+                continue
+            if wanted is not None and not wanted.intersection(segment.status_counts):
+                continue
+            selected.append(segment)
+        return selected
+
+
+def _describe_segment(
+    segment_path: Path,
+    day: str,
+    lines: List[bytes],
+    *,
+    source_inode: int,
+    source_start: int,
+    source_id: str = "",
+) -> Segment:
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    counts: Dict[str, int] = {}
+    for raw in lines:
+        entry = _decode(raw)
+        if entry is None:
+            continue
+        stamp = _parse_time(entry.get("timestamp"))
+        if stamp:
+            start = stamp if start is None or stamp < start else start
+            end = stamp if end is None or stamp > end else end
+        status = str(entry.get("status", "unknown"))
+        counts[status] = counts.get(status, 0) + 1
+    raw_bytes = sum(len(raw) for raw in lines)
+    return Segment(
+        file=segment_path.name,
+        day=day,
+        start=_iso(start),
+        end=_iso(end),
+        lines=len(lines),
+        raw_bytes=raw_bytes,
+        stored_bytes=segment_path.stat().st_size,
+        status_counts=counts,
+        source_inode=source_inode,
+        source_start=source_start,
+        source_end=source_start + raw_bytes,
+        source_id=source_id,
+    )
+
+
+def _decode(raw: bytes) -> Optional[Dict[str, Any]]:
+    text = raw.decode("utf-8", errors="replace").strip()
+    if not text:
+        return None
+    try:
+        entry = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def _day_of(raw: bytes, fallback: str) -> str:
+    entry = _decode(raw)
+    stamp = _parse_time(entry.get("timestamp")) if entry else None
+    return stamp.astimezone(timezone.utc).strftime("%Y-%m-%d") if stamp else fallback
+
+
+def _rename_aside(path: Path, aside: Path) -> bool:
+    for attempt in range(_RENAME_ATTEMPTS):
+        try:
+            os.replace(path, aside)
+            return True
+        except FileNotFoundError:
+            return False
+        except PermissionError:
+            # Windows refuses while the scanner has the file open for an append.
+            time.sleep(0.2 * (attempt + 1))
+    raise PermissionError(f"Could not move {path} aside for compaction")
+
+
+def _compact_file(source: Path, index: LogIndex, result: CompactionResult) -> None:
+    with source.open("rb") as handle:
+        inode = os.fstat(handle.fileno()).st_ino
+        source_id = uuid.uuid4().hex
+        fallback_day = datetime.fromtimestamp(os.fstat(handle.fileno()).st_mtime, timezone.utc).strftime("%Y-%m-%d")
+        groups: List[Tuple[str, int, List[bytes]]] = []
+        offset = 0
+        for raw in handle:
+            if not raw.endswith(b"\n"):
+                raw += b"\n"
+            day = _day_of(raw, fallback_day)
+            if not groups or groups[-1][0] != day:
+                groups.append((day, offset, []))
+            groups[-1][2].append(raw)
+            offset += len(raw)
+
+    index.directory.mkdir(parents=True, exist_ok=True)
+    for day, start_offset, lines in groups:
+        name = f"{source.name.split('.')[0]}.{day}.{index.next_sequence:05d}{SEGMENT_SUFFIX}"
+        segment_path = index.directory / name
+        tmp_path = segment_path.with_name(f".{name}.tmp")
+        with gzip.open(tmp_path, "wb") as handle:
+            handle.writelines(lines)
+        os.replace(tmp_path, segment_path)
+        index.segments.append(
+            _describe_segment(
+                segment_path, day, lines, source_inode=inode, source_start=start_offset, source_id=source_id
+            )
+        )
+        index.next_sequence += 1
+        result.segments_written.append(name)
+        result.lines_compacted += len(lines)
+        result.bytes_compacted += sum(len(raw) for raw in lines)
+    index.save()
+
+
+def apply_retention(
+    index: LogIndex,
+    *,
+    keep_days: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """Delete segments older than *keep_days* and the oldest ones beyond *max_bytes* stored."""
+    now = now or datetime.now(timezone.utc)
+    doomed: List[Segment] = []
+    kept: List[Segment] = []
+    cutoff = now - timedelta(days=keep_days) if keep_days is not None else None
+    for segment in index.segments:
+        end = _parse_time(segment.end)
+        if cutoff and end and end < cutoff:
+            doomed.append(segment)
+        else:
+            kept.append(segment)
+    if max_bytes is not None:
+        total = sum(segment.stored_bytes for segment in kept)
+        while kept and total > max_bytes:
+            oldest = kept.pop(0)
+            total -= oldest.stored_bytes
+            doomed.append(oldest)
+    for segment in doomed:
+        try:
+            (index.directory / segment.file).unlink()
+        except FileNotFoundError:
+            pass
+    if doomed:
+        index.segments = kept
+        index.save()
+    return [segment.file for segment in doomed]
+
+
+def compact_log(
+    path: Path,
+    *,
+    segments_dir: Optional[Path] = None,
+    keep_days: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+) -> CompactionResult:
+    """Move the live lines of *path* into dated segments, then apply retention."""
+    index = LogIndex(segments_dir or segments_dir_for(path))
+    result = CompactionResult(path=str(path))
+    aside = path.with_name(path.name + COMPACTING_SUFFIX)
+    if aside.exists():
+        LOGGER.info("Finishing interrupted compaction of %s", aside)
+        _compact_file(aside, index, result)
+        aside.unlink()
+    if path.exists() and path.stat().st_size and _rename_aside(path, aside):
+        _compact_file(aside, index, result)
+        aside.unlink()
+    result.segments_removed = apply_retention(index, keep_days=keep_days, max_bytes=max_bytes)
+    return result
+
+
+def _iter_lines(segment_path: Path) -> Iterator[bytes]:
+    with gzip.open(segment_path, "rb") as handle:
+        yield from handle
+
+
+def _matches(
+    entry: Dict[str, Any],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    statuses: Optional[Sequence[str]],
+) -> bool:
+    if statuses and str(entry.get("status", "unknown")) not in statuses:
+        return False
+    if since or until:
+        stamp = _parse_time(entry.get("timestamp"))
+        if stamp is None:
+            return False
+        if (since and stamp < since) or (until and stamp > until):
+            return False
+    return True
+
+
+def _iter_live(path: Path) -> Iterator[bytes]:
+    """Lines of a compaction left in progress, then of the live file."""
+    for live in (path.with_name(path.name + COMPACTING_SUFFIX), path):
+        try:
+            handle = live.open("rb")
+        except FileNotFoundError:
+            continue
+        with handle:
+            yield from handle
+
+
+def iter_entries(
+    path: Path,
+    *,
+    segments_dir: Optional[Path] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    statuses: Optional[Sequence[str]] = None,
+    include_live: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """Entries of the compacted and live log in file order, filtered by time and status."""
+    index = LogIndex(segments_dir or segments_dir_for(path))
+    for segment in index.select(since=since, until=until, statuses=statuses):
+        for raw in _iter_lines(index.directory / segment.file):
+            entry = _decode(raw)
+            if entry is not None and _matches(entry, since, until, statuses):
+                yield entry
+    if include_live:
+        for raw in _iter_live(path):
+            entry = _decode(raw)
+            if entry is not None and _matches(entry, since, until, statuses):
+                yield entry
+
+
+def status_counts(
+    path: Path,
+    *,
+    segments_dir: Optional[Path] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """Entries per status; segments entirely inside the range are counted from the index."""
+    index = LogIndex(segments_dir or segments_dir_for(path))
+    counts: Dict[str, int] = {}
+    scanned: List[Iterator[bytes]] = []
+    for segment in index.select(since=since, until=until):
+        start, end = _parse_time(segment.start), _parse_time(segment.end)
+        inside = (not since or (start and start >= since)) and (not until or (end and end <= until))
+        if inside:
+            for status, count in segment.status_counts.items():
+                counts[status] = counts.get(status, 0) + count
+        else:
+            scanned.append(_iter_lines(index.directory / segment.file))
+    scanned.append(_iter_live(path))
+    for lines in scanned:
+        for raw in lines:
+            entry = _decode(raw)
+            if entry is not None and _matches(entry, since, until, None):
+                status = str(entry.get("status", "unknown"))
+                counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def _source_runs(segments: Sequence[Segment]) -> List[List[Segment]]:
+    """Segments grouped by the compacted file they came from, oldest compaction first."""
+    runs: List[List[Segment]] = []
+    for segment in segments:
+        if runs:
+            previous = runs[-1][-1]
+            if segment.source_id or previous.source_id:
+                same_file = segment.source_id == previous.source_id
+            else:
+                # Index written before source ids: one file's segments are contiguous.
+                same_file = (
+                    segment.source_inode == previous.source_inode and segment.source_start == previous.source_end
+                )
+            if same_file:
+                runs[-1].append(segment)
+                continue
+        runs.append([segment])
+    return runs
+
+
+def _run_head(directory: Path, run: Sequence[Segment], length: int) -> Optional[str]:
+    """SHA-256 of the first *length* bytes of a compacted file; None once retention removed them."""
+    if run[0].source_start != 0:
+        return None
+    data = b""
+    try:
+        for segment in run:
+            for raw in _iter_lines(directory / segment.file):
+                data += raw
+                if len(data) >= length:
+                    return hashlib.sha256(data[:length]).hexdigest()
+    except FileNotFoundError:
+        return None
+    return hashlib.sha256(data).hexdigest()
+
+
+def replay_source(
+    path: Path,
+    source_inode: int,
+    offset: int,
+    *,
+    head: Optional[str] = None,
+    head_length: int = 0,
+    source_id: Optional[str] = None,
+    segments_dir: Optional[Path] = None,
+) -> SourceReplay:
+    """Entries compacted since a reader stopped at byte *offset* of one file.
+
+    The file is named by the *source_id* of its compaction when the reader knows it, otherwise
+    by *source_inode* and the SHA-256 *head* of its first *head_length* bytes; the inode alone
+    is ambiguous once the filesystem reuses it.  The latest compaction matching that identity
+    is replayed from *offset*, followed by every file compacted after it.  Nothing is replayed
+    when no compaction matches.  The result ends at the last byte of the newest compacted file.
+    """
+    index = LogIndex(segments_dir or segments_dir_for(path))
+    runs = _source_runs(index.segments)
+    result = SourceReplay()
+    match: Optional[int] = None
+    for position in range(len(runs) - 1, -1, -1):
+        first = runs[position][0]
+        if source_id:
+            found = first.source_id == source_id
+        else:
+            found = bool(source_inode) and first.source_inode == source_inode
+            if found and head and head_length:
+                # A head deleted by retention cannot be checked; the inode has to do.
+                found = _run_head(index.directory, runs[position], head_length) in (head, None)
+        if found:
+            match = position
+            break
+    if match is None:
+        return result
+    for position, run in enumerate(runs[match:]):
+        same_file = position == 0
+        for segment in run:
+            if same_file and segment.source_end <= offset:
+                continue
+            line_end = segment.source_start
+            for raw in _iter_lines(index.directory / segment.file):
+                line_start = line_end
+                line_end += len(raw)
+                if same_file and line_start < offset:
+                    continue
+                result.replayed += 1
+                entry = _decode(raw)
+                if entry is not None:
+                    result.entries.append(entry)
+    last = runs[-1][-1]
+    result.source_id = last.source_id
+    result.source_inode = last.source_inode
+    result.offset = last.source_end
+    return result
@@ -1,4 +1,9 @@
-"""Dataclasses describing normalized ingestion artifacts."""
+"""Dataclasses describing normalized ingestion artifacts.
+
+Row-level models (one instance per PAS record, port row, flow-map cell, ...) are declared with
+``slots=True``: a large TP creates hundreds of thousands of them and a per-instance ``__dict__``
+dominates parse memory.  Use :func:`dataclasses.asdict` rather than ``__dict__`` on them.
+"""
 from __future__ import annotations
 
 from dataclasses import dataclass, field
@@ -6,7 +11,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ProgramIdentification:
     program_family: str
     subfamily: str
@@ -15,14 +20,14 @@ class ProgramIdentification:
     tp_git_repo_url: str
 
 
-@dataclass
+@dataclass(slots=True)
 class PatternRevision:
     module: str
     revision: str
     dependencies: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ComponentRevision:
     name: str
     owner: str
@@ -51,7 +56,7 @@ class IntegrationReport:
     warnings: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class FlowRow:
     columns: Dict[str, str]
 
@@ -63,7 +68,7 @@ class FlowTable:
     rows: List[FlowRow]
 
 
-@dataclass
+@dataclass(slots=True)
 class DllEntry:
     name: str
     version: str
@@ -72,7 +77,7 @@ class DllEntry:
     path: str
 
 
-@dataclass
+@dataclass(slots=True)
 class PASRecord:
     instance_name: str
     status: str
@@ -104,7 +109,7 @@ class PASRecord:
     instance_user: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class PlistEntry:
     pattern_name: str
     total_patterns: Optional[int]
@@ -121,14 +126,14 @@ class PlistEntry:
     keep_alive: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CakeAuditEntry:
     domain_name: str
     shift_name: str
     gsds: str
 
 
-@dataclass
+@dataclass(slots=True)
 class VMinSearchRecord:
     module: str
     test_name: str
@@ -144,7 +149,7 @@ class VMinSearchRecord:
     search_result: Optional[float]
 
 
-@dataclass
+@dataclass(slots=True)
 class ScoreboardEntry:
     module: str
     test_instance: str
@@ -154,7 +159,7 @@ class ScoreboardEntry:
     extra_info: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class ModuleSummaryEntry:
     module_name: str
     total_tests: Optional[int]
@@ -173,7 +178,7 @@ class ModuleSummaryEntry:
     source_path: Optional[Path] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PortResultRow:
     instance_name_port: str
     status: Optional[str]
@@ -207,7 +212,7 @@ class PortResultRow:
     module_summary_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class FlowMapEntry:
     module: str
     dutflow: str
@@ -235,7 +240,7 @@ class ProductConfig:
     additional_attributes: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class SetpointEntry:
     module: str
     test_instance: str
@@ -244,7 +249,7 @@ class SetpointEntry:
     values: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ArtifactReference:
     name: str
     relative_path: str
@@ -254,13 +259,14 @@ class ArtifactReference:
     exists_on_disk: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class HVQKConfigEntry:
     module_name: str
     file_name: str
     relative_path: str
     size_bytes: int
-    config: Dict[str, Any]
+    # None when the blob store already held this sha256 and the JSON was not parsed again.
+    config: Optional[Dict[str, Any]]
     sha256: Optional[str] = None
 
 
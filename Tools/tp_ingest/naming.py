@@ -0,0 +1,25 @@
+"""Helpers for decoding fields from Intel TP folder names."""
+from __future__ import annotations
+
+from typing import Tuple
+
+
+def tp_name_sort_key(tp_name: str) -> Tuple[str, int, str, int, str]:
+    """Extract a sort key from a TP name based on Intel naming standard.
+    
+    TP naming convention (18 chars):
+    - [10-12]: TP Revision - primary sort key
+    - [13]: Milestone (0-4)
+    - [14]: Sequential Release Number (0-9)
+    - [15-18]: Release Date (YYWW)
+    """
+    if not tp_name or len(tp_name) < 15:
+        return ("000", 0, "0", 0, "0000")
+    
+    tp_upper = tp_name.upper()
+    tp_revision = tp_upper[10:13] if len(tp_upper) >= 13 else "000"
+    milestone = int(tp_upper[13]) if len(tp_upper) >= 14 and tp_upper[13].isdigit() else 0
+    release_num = tp_upper[14] if len(tp_upper) >= 15 else "0"
+    release_date = tp_upper[15:19] if len(tp_upper) >= 19 else "0000"
+    
+    return (tp_revision, milestone, release_num, 0, release_date)
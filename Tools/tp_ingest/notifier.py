@@ -0,0 +1,207 @@
+"""Digest building and rate-limited dispatch of scanner alert notifications.
+
+New alerts are grouped into one :class:`Digest` per (product, status) so a night with dozens
+of identical failures produces a handful of messages.  :class:`Dispatcher` delivers every
+digest to every sink through a bounded thread pool; each sink is a destination with its own
+rate limit, and a failed delivery is retried with exponential backoff.
+
+Sinks are either a shell command (:class:`ShellCommandSink`, the historical
+``--notify-command``) or any in-process callable taking a :class:`Digest`
+(:class:`CallableSink`, loadable from a ``"module:function"`` spec with :func:`load_sink`).
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_GROUP_BY = ("product_code", "status")
+DEFAULT_WORKERS = 4
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BACKOFF_SECONDS = 2.0
+
+
+class NotificationError(RuntimeError):
+    """Raised by a sink when a delivery failed and may be retried."""
+
+
+@dataclass
+class Digest:
+    """New alerts sharing the same values for the grouping fields."""
+
+    key: Dict[str, str]
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.entries)
+
+    def context(self) -> Dict[str, Any]:
+        """Format placeholders: every field of the first alert, the group key, and totals.
+
+        ``tp_name`` and ``error`` hold the distinct values of the whole group, so a command
+        written for single alerts (``"{tp_name} failed ({status})"``) still reads well.
+        """
+        first = self.entries[0] if self.entries else {}
+        values: Dict[str, Any] = {k: ("" if v is None else v) for k, v in first.items()}
+        values.update(self.key)
+        for name in ("tp_name", "error"):
+            distinct = list(dict.fromkeys(str(e[name]) for e in self.entries if e.get(name)))
+            values[name] = ", ".join(distinct)
+        values["count"] = self.count
+        values["message"] = self.message()
+        return values
+
+    def message(self) -> str:
+        label = " / ".join(value for value in self.key.values() if value)
+        tps = list(dict.fromkeys(str(e.get("tp_name")) for e in self.entries if e.get("tp_name")))
+        text = f"{self.count} alert(s) for {label}"
+        if tps:
+            shown = ", ".join(tps[:10])
+            text += f": {shown}" + (f" (+{len(tps) - 10} more)" if len(tps) > 10 else "")
+        return text
+
+
+def build_digests(
+    entries: Iterable[Dict[str, Any]],
+    group_by: Sequence[str] = DEFAULT_GROUP_BY,
+) -> List[Digest]:
+    """Group *entries* by *group_by*; digests keep the order of their first alert.
+
+    An empty *group_by* yields one digest per alert.
+    """
+    if not group_by:
+        return [Digest(key={}, entries=[entry]) for entry in entries]
+    digests: Dict[Tuple[str, ...], Digest] = {}
+    for entry in entries:
+        values = tuple(str(entry.get(name) or "unknown") for name in group_by)
+        digest = digests.get(values)
+        if digest is None:
+            digest = digests[values] = Digest(key=dict(zip(group_by, values)))
+        digest.entries.append(entry)
+    return list(digests.values())
+
+
+class RateLimiter:
+    """Spaces calls at least ``60 / per_minute`` seconds apart; thread-safe."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class ShellCommandSink:
+    """Runs *command* (``str.format`` placeholders from :meth:`Digest.context`) in a shell."""
+
+    def __init__(self, command: str, *, timeout: Optional[float] = 120.0) -> None:
+        self.command = command
+        self.timeout = timeout
+        self.name = f"command:{command.split()[0] if command.split() else command}"
+
+    def __call__(self, digest: Digest) -> None:
+        formatted = self.command.format(**digest.context())
+        LOGGER.info("Running notify command: %s", formatted)
+        try:
+            completed = subprocess.run(formatted, shell=True, check=False, timeout=self.timeout)
+        except subprocess.TimeoutExpired as exc:
+            raise NotificationError(f"timed out after {exc.timeout}s") from exc
+        if completed.returncode != 0:
+            raise NotificationError(f"exit code {completed.returncode}")
+
+
+class CallableSink:
+    """Wraps an in-process callable that receives each :class:`Digest`."""
+
+    def __init__(self, func: Callable[[Digest], Any], name: Optional[str] = None) -> None:
+        self.func = func
+        self.name = name or getattr(func, "__qualname__", repr(func))
+
+    def __call__(self, digest: Digest) -> None:
+        self.func(digest)
+
+
+def load_sink(spec: str) -> CallableSink:
+    """Import ``"package.module:function"`` as a :class:`CallableSink`."""
+    module_name, _, attribute = spec.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"Sink spec {spec!r} must look like 'module:function'")
+    func = getattr(importlib.import_module(module_name), attribute)
+    if not callable(func):
+        raise ValueError(f"Sink {spec!r} is not callable")
+    return CallableSink(func, name=spec)
+
+
+@dataclass
+class DeliveryResult:
+    destination: str
+    key: Dict[str, str]
+    count: int
+    attempts: int
+    ok: bool
+    error: Optional[str] = None
+
+
+class Dispatcher:
+    """Delivers digests to sinks concurrently with per-sink rate limits and retries."""
+
+    def __init__(
+        self,
+        sinks: Sequence[Any],
+        *,
+        max_workers: int = DEFAULT_WORKERS,
+        max_attempts: int = DEFAULT_ATTEMPTS,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+        per_minute: float = 0.0,
+    ) -> None:
+        self.sinks = list(sinks)
+        self.max_workers = max(1, max_workers)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self._limiters = {self._name(sink): RateLimiter(per_minute) for sink in self.sinks}
+
+    @staticmethod
+    def _name(sink: Any) -> str:
+        return getattr(sink, "name", None) or repr(sink)
+
+    def _deliver(self, sink: Any, digest: Digest) -> DeliveryResult:
+        name = self._name(sink)
+        limiter = self._limiters[name]
+        error: Optional[str] = None
+        for attempt in range(1, self.max_attempts + 1):
+            limiter.acquire()
+            try:
+                sink(digest)
+            except Exception as exc:  # noqa: BLE001 - any sink failure is retried and reported
+                error = str(exc) or exc.__class__.__name__
+                LOGGER.warning("Notification to %s failed (attempt %s/%s): %s", name, attempt, self.max_attempts, error)
+                if attempt < self.max_attempts and self.backoff_seconds:
+                    time.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+                continue
+            return DeliveryResult(name, digest.key, digest.count, attempt, True)
+        return DeliveryResult(name, digest.key, digest.count, self.max_attempts, False, error)
+
+    def dispatch(self, digests: Sequence[Digest]) -> List[DeliveryResult]:
+        """Send every digest to every sink; results follow digest then sink order."""
+        jobs = [(sink, digest) for digest in digests for sink in self.sinks]
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+            return list(executor.map(lambda job: self._deliver(*job), jobs))
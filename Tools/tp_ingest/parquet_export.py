@@ -0,0 +1,163 @@
+"""Partitioned Parquet export of the normalized per-TP datasets.
+
+Each ingested TP can be written to::
+
+    <root>/product_code=<code>/tp_name=<tp>/<dataset>.parquet
+
+with one file per dataset (``test_instances``, ``port_results``, ...).  Column types come from
+the dataclasses in :mod:`tp_ingest.models`, so every TP shares one schema per dataset and a
+cross-release scan never has to reconcile types.  :func:`load_dataset` reads one dataset across
+TPs with hive partitioning, so filters on ``product_code``/``tp_name`` prune whole directories.
+
+pyarrow is optional; exporting without it raises ``RuntimeError``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import typing
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+from urllib.parse import quote
+
+from . import models
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pa_dataset = None
+    pq = None
+
+DATASETS: Dict[str, type] = {
+    "test_instances": models.PASRecord,
+    "port_results": models.PortResultRow,
+    "module_summary": models.ModuleSummaryEntry,
+    "flow_map": models.FlowMapEntry,
+    "scoreboard": models.ScoreboardEntry,
+    "vmin_search": models.VMinSearchRecord,
+    "setpoints": models.SetpointEntry,
+    "plist": models.PlistEntry,
+    "cake_audit": models.CakeAuditEntry,
+}
+
+PARTITION_KEYS = ("product_code", "tp_name")
+UNKNOWN_PRODUCT = "unknown"
+COMPRESSION = "zstd"
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("Parquet export requested but pyarrow is not installed.")
+
+
+def _arrow_type(annotation: Any) -> Any:
+    if typing.get_origin(annotation) is typing.Union:
+        members = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(members) == 1:
+            return _arrow_type(members[0])
+    if typing.get_origin(annotation) in (list, List):
+        (item,) = typing.get_args(annotation) or (str,)
+        return pa.list_(_arrow_type(item))
+    if annotation is bool:
+        return pa.bool_()
+    if annotation is int:
+        return pa.int64()
+    if annotation is float:
+        return pa.float64()
+    # str, Path and anything structured (stored as JSON text).
+    return pa.string()
+
+
+def schema_for(dataset: str) -> "pa.Schema":
+    """Arrow schema of *dataset*: ``git_hash`` followed by the model's fields in declaration order."""
+    _require_pyarrow()
+    model = DATASETS[dataset]
+    hints = typing.get_type_hints(model)
+    columns = [pa.field("git_hash", pa.string())]
+    columns.extend(pa.field(item.name, _arrow_type(hints[item.name])) for item in fields(model))
+    return pa.schema(columns)
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True, default=str)
+    if isinstance(value, list):
+        return [_cell(item) for item in value]
+    return value
+
+
+def to_table(dataset: str, entries: Sequence[Any], *, git_hash: str) -> "pa.Table":
+    schema = schema_for(dataset)
+    names = [item.name for item in fields(DATASETS[dataset])]
+    columns: Dict[str, List[Any]] = {"git_hash": [git_hash] * len(entries)}
+    for name in names:
+        columns[name] = [_cell(getattr(entry, name)) for entry in entries]
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def partition_dir(root: Path, product_code: Optional[str], tp_name: str) -> Path:
+    product = (product_code or UNKNOWN_PRODUCT).strip().upper() or UNKNOWN_PRODUCT
+    return root / f"product_code={quote(product, safe='')}" / f"tp_name={quote(tp_name, safe='')}"
+
+
+def export_tp_datasets(
+    root: Path,
+    *,
+    tp_name: str,
+    git_hash: str,
+    product_code: Optional[str],
+    datasets: Mapping[str, Sequence[Any]],
+) -> Dict[str, int]:
+    """Write each dataset of one TP to its partition, replacing earlier exports; returns row counts.
+
+    Empty datasets are written too so every partition carries the full schema.
+    """
+    _require_pyarrow()
+    target = partition_dir(root, product_code, tp_name)
+    target.mkdir(parents=True, exist_ok=True)
+    counts: Dict[str, int] = {}
+    for dataset, entries in datasets.items():
+        table = to_table(dataset, entries, git_hash=git_hash)
+        destination = target / f"{dataset}.parquet"
+        temp_path = destination.with_suffix(".parquet.tmp")
+        pq.write_table(table, temp_path, compression=COMPRESSION)
+        os.replace(temp_path, destination)
+        counts[dataset] = table.num_rows
+    return counts
+
+
+def load_dataset(
+    root: Path,
+    dataset: str,
+    *,
+    columns: Optional[Sequence[str]] = None,
+    filter: Any = None,
+) -> "pa.Table":
+    """Read *dataset* across every exported TP.
+
+    *filter* is a ``pyarrow.compute`` expression; conditions on ``product_code``/``tp_name``
+    skip non-matching partitions and the remaining predicates are pushed into the Parquet scan.
+    """
+    _require_pyarrow()
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset {dataset!r}; expected one of {sorted(DATASETS)}")
+    partition_schema = pa.schema([pa.field(key, pa.string()) for key in PARTITION_KEYS])
+    schema = pa.unify_schemas([schema_for(dataset), partition_schema])
+    files = sorted(str(path) for path in root.glob(f"product_code=*/tp_name=*/{dataset}.parquet"))
+    if not files:
+        return schema.empty_table()
+    partitioning = pa_dataset.partitioning(partition_schema, flavor="hive")
+    scan = pa_dataset.dataset(
+        files,
+        schema=schema,
+        format="parquet",
+        partitioning=partitioning,
+        partition_base_dir=str(root),
+    )
+    return scan.to_table(columns=list(columns) if columns else None, filter=filter)
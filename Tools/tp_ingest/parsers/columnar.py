@@ -0,0 +1,128 @@
+"""Optional pandas-backed reader for the large PAS CSV reports.
+
+The default parsers walk ``csv.reader`` rows and clean each cell through per-row helpers.  With
+``engine="pandas"`` the PAS and PortLevel parsers instead let pandas' C tokenizer read the whole
+file into Python strings (``dtype=object``; the Arrow-backed string dtype costs more to convert
+back than it saves), then strip and convert column by column before building the same
+dataclasses.  Blank lines are kept while reading (``skip_blank_lines=False``) so each data row
+keeps the line number the Python path reports in warnings.  Files the C tokenizer rejects
+(e.g. rows with more cells than the header) raise :class:`ColumnarParseError` so callers can
+fall back to the Python path.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import compress
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional dependency
+    pd = None
+
+PYTHON_ENGINE = "python"
+PANDAS_ENGINE = "pandas"
+ENGINES = (PYTHON_ENGINE, PANDAS_ENGINE)
+
+
+class ColumnarParseError(ValueError):
+    """Raised when pandas cannot read a report that the Python path can."""
+
+
+@dataclass
+class CellColumns:
+    """Stripped cells of a CSV report, stored column-wise.
+
+    ``columns`` holds the data rows only (header and blank lines removed); ``line_numbers[i]``
+    is the 1-based file line of data row ``i``.
+    """
+
+    header: List[str]
+    columns: List[List[str]]
+    line_numbers: List[int]
+
+    def __len__(self) -> int:
+        return len(self.line_numbers)
+
+    def column(self, position: int) -> List[str]:
+        if position < len(self.columns):
+            return self.columns[position]
+        return [""] * len(self)
+
+
+def validate_engine(engine: str) -> str:
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown CSV engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    if engine == PANDAS_ENGINE and pd is None:
+        raise RuntimeError("CSV engine 'pandas' requested but pandas is not installed.")
+    return engine
+
+
+def read_cells(csv_path: Path) -> Optional[CellColumns]:
+    """Read *csv_path* column-wise; returns None for an empty file."""
+    try:
+        frame = pd.read_csv(
+            csv_path,
+            header=None,
+            dtype=object,
+            keep_default_na=False,
+            skip_blank_lines=False,
+            encoding="utf-8-sig",
+        )
+    except pd.errors.EmptyDataError:
+        return None
+    except pd.errors.ParserError as exc:
+        raise ColumnarParseError(str(exc)) from exc
+    # Short rows and blank lines come back as NaN; everything else is already a str.
+    cells = [
+        list(map(str.strip, values.fillna("").tolist() if values.hasnans else values.tolist()))
+        for _, values in frame.items()
+    ]
+    header = [column[0] for column in cells]
+    columns = [column[1:] for column in cells]
+    # A blank line is blank in every column, so only rows with an empty first cell need a look.
+    blank = [
+        row for row, value in enumerate(columns[0])
+        if not value and not any(column[row] for column in columns)
+    ]
+    if blank:
+        keep = [True] * len(columns[0])
+        for row in blank:
+            keep[row] = False
+        columns = [list(compress(column, keep)) for column in columns]
+        line_numbers = [row + 2 for row in compress(range(len(keep)), keep)]
+    else:
+        line_numbers = list(range(2, len(columns[0]) + 2))
+    return CellColumns(header=header, columns=columns, line_numbers=line_numbers)
+
+
+def text_values(values: List[str]) -> List[Optional[str]]:
+    return [value or None for value in values]
+
+
+def int_values(values: List[str], *, allow_float: bool = False) -> List[Optional[int]]:
+    """``int(value)`` per cell (``int(float(value))`` as a fallback with *allow_float*); else None."""
+    present = list(map(bool, values))
+    try:
+        if all(present):
+            return list(map(int, values))
+        converted = iter(list(map(int, compress(values, present))))
+        return [next(converted) if flag else None for flag in present]
+    except ValueError:
+        pass
+    return [_to_int(value, allow_float) for value in values]
+
+
+def _to_int(value: str, allow_float: bool) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        if not allow_float:
+            return None
+    try:
+        return int(float(value))
+    except (ValueError, OverflowError):
+        return None
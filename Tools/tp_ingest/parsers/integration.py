@@ -3,85 +3,251 @@ from __future__ import annotations
 
 import csv
 import re
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, List, Optional, Union
 
 from .. import models
 
 _SECTION_PATTERN = re.compile(r"^\[(?P<name>.+?)\]\s*$")
 _FIELD_PATTERN = re.compile(r"^<(?P<key>[^>]+)>\s*(?P<value>.*)$")
 _DOUBLE_SPACE_SPLIT = re.compile(r"\s{2,}")
+_PATTERN_ROW = re.compile(r"(?P<module>\S+)\s+(?P<rev>\S+)\s+(?P<deps>.+)")
 
+_FLOW_SECTIONS = (
+    ("tp_flow_structure", "TP Flow Structure"),
+    ("fork_flows", "Fork Flows"),
+    ("special_flows", "Special Flows"),
+)
 
-@dataclass
-class _SectionedText:
-    sections: Dict[str, List[str]]
 
-    @classmethod
-    def from_lines(cls, lines: Iterable[str]) -> "_SectionedText":
-        sections: Dict[str, List[str]] = {}
-        current_name: str | None = None
-        current_buffer: List[str] = []
+class _FieldSection:
+    """``<Key> value`` lines; later keys win."""
 
-        def commit() -> None:
-            nonlocal current_name, current_buffer
-            if current_name is not None:
-                sections[current_name] = current_buffer.copy()
-            current_buffer = []
+    def __init__(self) -> None:
+        self.fields: Dict[str, str] = {}
 
-        for raw_line in lines:
-            line = raw_line.rstrip("\n")
-            if line.startswith("#-" ):
+    def feed(self, line: str) -> None:
+        match = _FIELD_PATTERN.match(line.strip())
+        if match:
+            self.fields[match.group("key").strip()] = match.group("value").strip()
+
+    def close(self) -> None:
+        pass
+
+
+class _EnvironmentSection(_FieldSection):
+    """Fields plus the pattern revision table that follows the ``Pattern Module`` header."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pattern_revs: List[models.PatternRevision] = []
+        self._table_state = "before"  # before -> collecting -> done
+
+    def feed(self, line: str) -> None:
+        super().feed(line)
+        if self._table_state == "done":
+            return
+        if "Pattern Module" in line:
+            self._table_state = "collecting"
+            return
+        if self._table_state == "before":
+            return
+        stripped = line.strip()
+        if not stripped:
+            self._table_state = "done"
+            return
+        if stripped.startswith("#"):
+            return
+        match = _PATTERN_ROW.match(stripped)
+        if not match:
+            return
+        deps = [dep.strip() for dep in match.group("deps").split(",") if dep.strip()]
+        self.pattern_revs.append(
+            models.PatternRevision(
+                module=match.group("module"),
+                revision=match.group("rev"),
+                dependencies=deps,
+            )
+        )
+
+
+class _ComponentSection:
+    def __init__(self) -> None:
+        self.shared: List[models.ComponentRevision] = []
+        self.modules: List[models.ComponentRevision] = []
+        self.warnings: List[str] = []
+        self._target: List[models.ComponentRevision] | None = None
+
+    def feed(self, line: str) -> None:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            return
+        if stripped.startswith("<Shared>"):
+            self._target = self.shared
+            return
+        if stripped.startswith("<TP Modules>"):
+            self._target = self.modules
+            return
+        if self._target is None or stripped.startswith("|"):
+            # Before the first group, or a header row.
+            return
+        record = self._parse_row(stripped)
+        if record:
+            self._target.append(record)
+
+    def close(self) -> None:
+        pass
+
+    def _parse_row(self, stripped: str) -> models.ComponentRevision | None:
+        cells = [cell for cell in _DOUBLE_SPACE_SPLIT.split(stripped) if cell]
+        if len(cells) < 4:
+            self.warnings.append(f"Component row malformed: '{stripped}'")
+            return None
+        name, owner, timestamp_sha, comment = cells[0], cells[1], cells[2], cells[3]
+        timestamp, sha = _split_timestamp_sha(timestamp_sha)
+        return models.ComponentRevision(name=name, owner=owner, timestamp=timestamp, sha=sha, comment=comment)
+
+
+class _FlowSection:
+    """Builds flow tables row by row and keeps the section text for ``flows_raw``.
+
+    Only this section's lines are buffered, and they are joined into the raw text once, in
+    :meth:`close`, instead of being copied per section and then joined from a whole-file list.
+    """
+
+    def __init__(self, default_name: str) -> None:
+        self.default_name = default_name
+        self.tables: List[models.FlowTable] = []
+        self.warnings: List[str] = []
+        self.raw = ""
+        self._raw_lines: List[str] = []
+        self._current: models.FlowTable | None = None
+
+    def feed(self, line: str) -> None:
+        self._raw_lines.append(line)
+        line = line.rstrip()
+        if not line:
+            return
+        if line.startswith("<") and ">" in line:
+            name = line[line.find("<") + 1 : line.find(">")].strip()
+            self._current = models.FlowTable(
+                name=name or self.default_name,
+                columns=_parse_flow_headers(line),
+                rows=[],
+            )
+            self.tables.append(self._current)
+            return
+        if self._current is None:
+            return
+        row = self._split_row(line.lstrip(), self._current.columns)
+        if row is not None:
+            self._current.rows.append(models.FlowRow(columns=row))
+
+    def close(self) -> None:
+        self.raw = "\n".join(self._raw_lines)
+        self._raw_lines = []
+
+    def _split_row(self, stripped: str, columns: List[str]) -> Dict[str, str] | None:
+        if not columns:
+            return None
+        # Runs of 2+ whitespace are consumed whole, so the cells of a stripped line need no strip.
+        tokens = _DOUBLE_SPACE_SPLIT.split(stripped)
+        if len(tokens) > len(columns):
+            self.warnings.append(f"Flow row has {len(tokens)} columns but expected {len(columns)}: '{stripped}'")
+        elif len(tokens) < len(columns):
+            tokens.extend([""] * (len(columns) - len(tokens)))
+        return dict(zip(columns, tokens))
+
+
+_SectionHandler = Union[_FieldSection, _ComponentSection, _FlowSection]
+
+
+def _new_section_handler(name: str) -> Optional[_SectionHandler]:
+    if name == "program_identification":
+        return _FieldSection()
+    if name == "environment_settings":
+        return _EnvironmentSection()
+    if name == "component_revisions":
+        return _ComponentSection()
+    for key, friendly in _FLOW_SECTIONS:
+        if name == key:
+            return _FlowSection(friendly)
+    return None
+
+
+def _read_sections(path: Path) -> Dict[str, _SectionHandler]:
+    """Stream *path* once, feeding each line to the handler of the section it belongs to.
+
+    Sections without a handler are skipped without being buffered.  When a section name repeats,
+    the last occurrence wins.
+    """
+    handlers: Dict[str, _SectionHandler] = {}
+    current: Optional[_SectionHandler] = None
+    with path.open(encoding="utf-8", errors="ignore") as handle:
+        for raw_line in handle:
+            line = raw_line.rstrip("\r\n")
+            if line.startswith("#-"):
                 # Separator from Cake output.
                 continue
-            section_match = _SECTION_PATTERN.match(line.strip())
-            if section_match:
-                commit()
-                name = section_match.group("name").strip().lower().replace(" ", "_")
-                current_name = name
-                continue
-            if current_name is not None:
-                current_buffer.append(line)
-        commit()
-        return cls(sections=sections)
+            if "[" in line:
+                section_match = _SECTION_PATTERN.match(line.strip())
+                if section_match:
+                    if current is not None:
+                        current.close()
+                    name = section_match.group("name").strip().lower().replace(" ", "_")
+                    current = _new_section_handler(name)
+                    if current is not None:
+                        handlers[name] = current
+                    continue
+            if current is not None:
+                current.feed(line)
+    if current is not None:
+        current.close()
+    return handlers
 
 
 class IntegrationReportParser:
     """Parses key metadata from `Integration_Report.txt`."""
 
     def parse(self, path: Path) -> models.IntegrationReport:
-        lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
-        sectioned = _SectionedText.from_lines(lines)
-        program_section = sectioned.sections.get("program_identification", [])
-        environment_section = sectioned.sections.get("environment_settings", [])
-        component_section = sectioned.sections.get("component_revisions", [])
+        sections = _read_sections(path)
         self._warnings: List[str] = []
-        flow_sections = {
-            key: "\n".join(value)
-            for key, value in sectioned.sections.items()
-            if key in {"tp_flow_structure", "fork_flows", "special_flows"}
-        }
-
-        program = self._parse_program(program_section)
-        environment = self._parse_environment(environment_section)
-        shared_components, tp_modules = self._parse_components(component_section)
-        flow_tables = self._parse_flow_tables(sectioned)
+        program_fields = sections.get("program_identification") or _FieldSection()
+        environment = sections.get("environment_settings") or _EnvironmentSection()
+        components = sections.get("component_revisions") or _ComponentSection()
+        self._warnings.extend(components.warnings)
+
+        flow_sections: Dict[str, str] = {}
+        flow_tables: List[models.FlowTable] = []
+        for key, _friendly in _FLOW_SECTIONS:
+            flow = sections.get(key)
+            if flow is None:
+                continue
+            flow_tables.extend(flow.tables)
+            self._warnings.extend(flow.warnings)
+        for key, handler in sections.items():
+            if isinstance(handler, _FlowSection):
+                flow_sections[key] = handler.raw
+
+        program = self._parse_program(program_fields.fields)
         dll_inventory = self._parse_dll_inventory(path.parent / "CAKE_DLLVersions.csv")
         return models.IntegrationReport(
             path=path,
             program=program,
-            environment=environment,
-            shared_components=shared_components,
-            tp_modules=tp_modules,
+            environment=models.EnvironmentSettings(
+                prime_rev=environment.fields.get("Prime Rev"),
+                fuse_file_rev=environment.fields.get("Fuse File Rev"),
+                pattern_revs=environment.pattern_revs,
+            ),
+            shared_components=components.shared,
+            tp_modules=components.modules,
             flows_raw=flow_sections,
             flow_tables=flow_tables,
             dll_inventory=dll_inventory,
             warnings=self._warnings.copy(),
         )
 
-    def _parse_program(self, lines: List[str]) -> models.ProgramIdentification:
-        data = self._collect_fields(lines)
+    def _parse_program(self, data: Dict[str, str]) -> models.ProgramIdentification:
         return models.ProgramIdentification(
             program_family=data.get("Program Family", ""),
             subfamily=data.get("Subfamily", ""),
@@ -90,113 +256,6 @@ class IntegrationReportParser:
             tp_git_repo_url=data.get("TP Git Repo URL", ""),
         )
 
-    def _parse_environment(self, lines: List[str]) -> models.EnvironmentSettings:
-        data = self._collect_fields(lines)
-        pattern_table = self._extract_pattern_table(lines)
-        return models.EnvironmentSettings(
-            prime_rev=data.get("Prime Rev"),
-            fuse_file_rev=data.get("Fuse File Rev"),
-            pattern_revs=pattern_table,
-        )
-
-    def _parse_components(self, lines: List[str]) -> tuple[List[models.ComponentRevision], List[models.ComponentRevision]]:
-        shared: List[models.ComponentRevision] = []
-        modules: List[models.ComponentRevision] = []
-        current_target: List[models.ComponentRevision] | None = None
-        for line in lines:
-            stripped = line.strip()
-            if not stripped or stripped.startswith("#"):
-                continue
-            if stripped.startswith("<Shared>"):
-                current_target = shared
-                continue
-            if stripped.startswith("<TP Modules>"):
-                current_target = modules
-                continue
-            if current_target is None:
-                continue
-            if stripped.startswith("|"):
-                # header row
-                continue
-            record = self._parse_component_row(stripped)
-            if record:
-                current_target.append(record)
-        return shared, modules
-
-    def _parse_component_row(self, stripped: str) -> models.ComponentRevision | None:
-        cells = [cell for cell in _DOUBLE_SPACE_SPLIT.split(stripped) if cell]
-        if len(cells) < 4:
-            self._warnings.append(f"Component row malformed: '{stripped}'")
-            return None
-        name, owner, timestamp_sha, comment = cells[0], cells[1], cells[2], cells[3]
-        timestamp, sha = self._split_timestamp_sha(timestamp_sha)
-        return models.ComponentRevision(name=name, owner=owner, timestamp=timestamp, sha=sha, comment=comment)
-
-    def _parse_flow_tables(self, sectioned: _SectionedText) -> List[models.FlowTable]:
-        tables: List[models.FlowTable] = []
-        for section_key, friendly in (
-            ("tp_flow_structure", "TP Flow Structure"),
-            ("fork_flows", "Fork Flows"),
-            ("special_flows", "Special Flows"),
-        ):
-            lines = sectioned.sections.get(section_key, [])
-            tables.extend(self._extract_flow_tables(lines, friendly))
-        return tables
-
-    def _extract_flow_tables(self, lines: List[str], default_name: str) -> List[models.FlowTable]:
-        tables: List[models.FlowTable] = []
-        current: Tuple[str, List[str], List[models.FlowRow]] | None = None
-        for raw in lines:
-            line = raw.rstrip()
-            if not line:
-                continue
-            if line.startswith("<") and ">" in line:
-                if current:
-                    name, columns, rows = current
-                    tables.append(models.FlowTable(name=name, columns=columns, rows=rows))
-                name = line[line.find("<") + 1 : line.find(">")].strip()
-                columns = self._parse_flow_headers(line)
-                if not columns:
-                    columns = []
-                current = (name or default_name, columns, [])
-                continue
-            if current is None:
-                continue
-            _, columns, rows = current
-            row_dict = self._split_flow_row(line, columns)
-            if row_dict is None:
-                continue
-            rows.append(models.FlowRow(columns=row_dict))
-        if current:
-            name, columns, rows = current
-            tables.append(models.FlowTable(name=name, columns=columns, rows=rows))
-        return tables
-
-    def _parse_flow_headers(self, header_line: str) -> List[str]:
-        if "|" not in header_line:
-            # fallback: squeeze whitespace
-            columns = [token.strip() for token in _DOUBLE_SPACE_SPLIT.split(header_line) if token.strip()]
-            return columns[1:] if columns else []
-        parts = [part.strip() for part in header_line.split("|") if part.strip()]
-        if parts and parts[0].startswith("<"):
-            parts = parts[1:]
-        return parts
-
-    def _split_flow_row(self, line: str, columns: List[str]) -> Dict[str, str] | None:
-        if not columns:
-            return None
-        tokens = [token.strip() for token in _DOUBLE_SPACE_SPLIT.split(line.strip()) if token.strip()]
-        if not tokens:
-            return None
-        if len(tokens) > len(columns):
-            self._warnings.append(
-                f"Flow row has {len(tokens)} columns but expected {len(columns)}: '{line.strip()}'"
-            )
-        row: Dict[str, str] = {}
-        for idx, column in enumerate(columns):
-            row[column] = tokens[idx] if idx < len(tokens) else ""
-        return row
-
     def _parse_dll_inventory(self, dll_path: Path) -> List[models.DllEntry]:
         entries: List[models.DllEntry] = []
         if not dll_path.exists():
@@ -247,47 +306,22 @@ class IntegrationReportParser:
             self._warnings.append(f"Failed reading DLL inventory at {dll_path}: {exc}")
         return entries
 
-    def _split_timestamp_sha(self, value: str) -> tuple[str, str]:
-        parts = value.split()
-        if not parts:
-            return "", ""
-        if len(parts) == 1:
-            return parts[0], ""
-        return parts[0], parts[1]
-
-    def _extract_pattern_table(self, lines: List[str]) -> List[models.PatternRevision]:
-        pattern_rows: List[models.PatternRevision] = []
-        collecting = False
-        for line in lines:
-            if "Pattern Module" in line:
-                collecting = True
-                continue
-            if not collecting:
-                continue
-            stripped = line.strip()
-            if not stripped:
-                break
-            if stripped.startswith("#"):
-                continue
-            match = re.match(r"(?P<module>\S+)\s+(?P<rev>\S+)\s+(?P<deps>.+)", stripped)
-            if not match:
-                continue
-            deps = [dep.strip() for dep in match.group("deps").split(",") if dep.strip()]
-            pattern_rows.append(
-                models.PatternRevision(
-                    module=match.group("module"),
-                    revision=match.group("rev"),
-                    dependencies=deps,
-                )
-            )
-        return pattern_rows
-
-    def _collect_fields(self, lines: List[str]) -> Dict[str, str]:
-        collected: Dict[str, str] = {}
-        for line in lines:
-            match = _FIELD_PATTERN.match(line.strip())
-            if match:
-                key = match.group("key").strip()
-                value = match.group("value").strip()
-                collected[key] = value
-        return collected
+
+def _split_timestamp_sha(value: str) -> tuple[str, str]:
+    parts = value.split()
+    if not parts:
+        return "", ""
+    if len(parts) == 1:
+        return parts[0], ""
+    return parts[0], parts[1]
+
+
+def _parse_flow_headers(header_line: str) -> List[str]:
+    if "|" not in header_line:
+        # fallback: squeeze whitespace
+        columns = [token.strip() for token in _DOUBLE_SPACE_SPLIT.split(header_line) if token.strip()]
+        return columns[1:] if columns else []
+    parts = [part.strip() for part in header_line.split("|") if part.strip()]
+    if parts and parts[0].startswith("<"):
+        parts = parts[1:]
+    return parts
@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import List
 
 from .. import models
+from . import columnar
 
 
 @dataclass
@@ -49,12 +50,20 @@ class PASReportParser:
         "InstanceUser",
     ]
 
+    def __init__(self, engine: str = columnar.PYTHON_ENGINE) -> None:
+        self.engine = columnar.validate_engine(engine)
+
     def parse(self, csv_path: Path) -> PASParseResult:
         records: List[models.PASRecord] = []
         warnings: List[str] = []
         if not csv_path.exists():
             warnings.append(f"PAS report not found at {csv_path}")
             return PASParseResult(records=records, warnings=warnings)
+        if self.engine == columnar.PANDAS_ENGINE:
+            try:
+                return self._parse_columnar(csv_path)
+            except columnar.ColumnarParseError as exc:
+                warnings.append(f"pandas could not read {csv_path.name} ({exc}); used the Python parser")
 
         with csv_path.open(newline="", encoding="utf-8-sig") as handle:
             reader = csv.reader(handle)
@@ -112,6 +121,29 @@ class PASReportParser:
                 records.append(record)
         return PASParseResult(records=records, warnings=warnings)
 
+    def _parse_columnar(self, csv_path: Path) -> PASParseResult:
+        warnings: List[str] = []
+        cells = columnar.read_cells(csv_path)
+        if cells is None:
+            warnings.append("PAS report file is empty")
+            return PASParseResult(records=[], warnings=warnings)
+        if cells.header != self.HEADER_SEQUENCE:
+            warnings.append(
+                "Unexpected PAS header sequence; parsing will continue but verify format."
+            )
+        integer_positions = {8, 9, 10}
+        columns = [
+            columnar.int_values(cells.column(position))
+            if position in integer_positions
+            else columnar.text_values(cells.column(position))
+            for position in range(len(self.HEADER_SEQUENCE))
+        ]
+        # instance_name and status are required strings.
+        columns[0] = cells.column(0)
+        columns[1] = cells.column(1)
+        records = [models.PASRecord(*values) for values in zip(*columns)]
+        return PASParseResult(records=records, warnings=warnings)
+
 
 def _clean_value(row: List[str], index: int) -> str | None:
     if index >= len(row):
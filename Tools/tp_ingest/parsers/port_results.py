@@ -3,10 +3,12 @@ from __future__ import annotations
 
 import csv
 from dataclasses import dataclass
+from itertools import compress
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from .. import models
+from . import columnar
 
 
 @dataclass
@@ -18,12 +20,22 @@ class PortResultsParseResult:
 class PortResultsParser:
     """Parse the verbose port-level PAS report."""
 
+    INTEGER_LABELS = ("Bin", "HB", "SB", "Counter", "MonitorPatCount", "KILLPatCount", "SkippedPatCount")
+
+    def __init__(self, engine: str = columnar.PYTHON_ENGINE) -> None:
+        self.engine = columnar.validate_engine(engine)
+
     def parse(self, csv_path: Path) -> PortResultsParseResult:
         entries: List[models.PortResultRow] = []
         warnings: List[str] = []
         if not csv_path.exists():
             warnings.append(f"Port-level PAS report not found at {csv_path}")
             return PortResultsParseResult(entries=entries, warnings=warnings)
+        if self.engine == columnar.PANDAS_ENGINE:
+            try:
+                return self._parse_columnar(csv_path)
+            except columnar.ColumnarParseError as exc:
+                warnings.append(f"pandas could not read {csv_path.name} ({exc}); used the Python parser")
 
         with csv_path.open(newline="", encoding="utf-8-sig") as handle:
             reader = csv.reader(handle)
@@ -81,6 +93,72 @@ class PortResultsParser:
                 entries.append(entry)
         return PortResultsParseResult(entries=entries, warnings=warnings)
 
+    def _parse_columnar(self, csv_path: Path) -> PortResultsParseResult:
+        warnings: List[str] = []
+        cells = columnar.read_cells(csv_path)
+        if cells is None:
+            warnings.append("Port-level PAS report is empty")
+            return PortResultsParseResult(entries=[], warnings=warnings)
+
+        # Later columns win for repeated labels, as in _map_row.
+        positions = {label: idx for idx, label in _normalize_headers(cells.header).items()}
+        key_position = positions.get("InstanceName_Port")
+        keep = [bool(key) for key in cells.column(key_position)] if key_position is not None else [False] * len(cells)
+        if not all(keep):
+            for line_number, present in zip(cells.line_numbers, keep):
+                if not present:
+                    warnings.append(f"Line {line_number} missing InstanceName_Port; row skipped")
+
+        def column(label: str) -> List[Optional[object]]:
+            if label not in positions:
+                return [None] * len(cells)
+            values = cells.column(positions[label])
+            if label in self.INTEGER_LABELS:
+                return columnar.int_values(values, allow_float=True)
+            return columnar.text_values(values)
+
+        instance_name_ports = column("InstanceName_Port")
+        ports = column("Port")
+        module_names = column("ModuleName")
+        instance_names = [
+            _strip_port_suffix(name, port) if name else name
+            for name, port in zip(instance_name_ports, ports)
+        ]
+        rows = zip(
+            instance_name_ports,
+            column("STATUS"),
+            column("Bypass"),
+            column("Bin"),
+            column("HB"),
+            column("SB"),
+            column("Counter"),
+            column("PLIST"),
+            column("MonitorPatCount"),
+            column("KILLPatCount"),
+            column("SkippedPatCount"),
+            column("Content Directory"),
+            column("PatternVREV"),
+            column("TestType"),
+            column("TpOptions"),
+            column("Scrum"),
+            module_names,
+            column("ModuleUser"),
+            column("TestCategory"),
+            column("Partition"),
+            column("TestTypeFlag"),
+            column("SubFlow"),
+            column("PatternRatio"),
+            column("VoltageDomain"),
+            column("Corner"),
+            column("Frequency"),
+            column("ModuleUser__2"),
+            ports,
+            instance_names,
+            module_names,
+        )
+        entries = [models.PortResultRow(*values) for values in compress(rows, keep)]
+        return PortResultsParseResult(entries=entries, warnings=warnings)
+
 
 def _normalize_headers(headers: List[str]) -> Dict[int, str]:
     label_counts: Dict[str, int] = {}
@@ -120,7 +198,7 @@ def _to_int(value: str | None) -> int | None:
     except ValueError:
         try:
             return int(float(value))
-        except ValueError:
+        except (ValueError, OverflowError):
             return None
 
 
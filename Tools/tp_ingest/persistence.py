@@ -3,9 +3,8 @@ from __future__ import annotations
 
 import re
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional, Tuple
-
-from pymongo import ASCENDING, MongoClient
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 try:
     import mongomock
@@ -13,6 +12,10 @@ except ImportError:  # pragma: no cover - optional dependency
     mongomock = None
 
 from . import models
+from .blobs import BlobStore
+from .catalog import HASH_FIELD
+from .clients import get_client
+from .indexes import ensure_schema
 from .serialization import (
     artifact_reference_to_document,
     cake_audit_entry_to_document,
@@ -28,6 +31,7 @@ from .serialization import (
     setpoint_entry_to_document,
     vmin_search_record_to_document,
 )
+from .sqlite_store import sqlite_uri
 
 
 _ID_SANITIZER = re.compile(r"[^A-Za-z0-9._-]+")
@@ -67,14 +71,6 @@ def _ratio_float(numerator: Optional[int], denominator: Optional[int]) -> Option
     return numerator / denominator
 
 
-def _build_client(uri: str) -> MongoClient:
-    if uri.startswith("mongomock://"):
-        if mongomock is None:
-            raise RuntimeError("mongomock URI requested but mongomock is not installed.")
-        return mongomock.MongoClient()
-    return MongoClient(uri)
-
-
 class DatabaseWriter:
     """Abstract writer so ingestion can be tested without a live database."""
 
@@ -102,8 +98,13 @@ class MongoWriter(DatabaseWriter):
         flow_map_collection: str = "flow_map",
         artifacts_collection: str = "artifacts",
         hvqk_collection: str = "hvqk_configs",
+        query_activity_collection: str = "query_activity",
+        hvqk_blob_collection: str = "hvqk_blobs",
+        artifact_blob_collection: str = "artifact_blobs",
+        artifact_chunk_collection: str = "artifact_blob_chunks",
     ) -> None:
-        self._client = _build_client(uri)
+        self._db_name = db_name
+        self._client = get_client(uri)
         self._collection = self._client[db_name][collection]
         self._test_instances_collection = self._client[db_name][test_instances_collection]
         self._plist_collection = self._client[db_name][plist_collection]
@@ -117,6 +118,13 @@ class MongoWriter(DatabaseWriter):
         self._flow_map_collection = self._client[db_name][flow_map_collection]
         self._artifacts_collection = self._client[db_name][artifacts_collection]
         self._hvqk_collection = self._client[db_name][hvqk_collection]
+        self._hvqk_blob_collection = self._client[db_name][hvqk_blob_collection]
+        self._artifact_chunk_collection = self._client[db_name][artifact_chunk_collection]
+        self.blob_store = BlobStore(
+            self._client[db_name][artifact_blob_collection],
+            self._artifact_chunk_collection,
+        )
+        self._query_activity_collection = self._client[db_name][query_activity_collection]
         self._is_mock = mongomock is not None and isinstance(self._client, mongomock.MongoClient)
         self._ensure_indexes()
 
@@ -128,91 +136,29 @@ class MongoWriter(DatabaseWriter):
         self._collection.update_one({"_id": document_id}, {"$set": doc}, upsert=True)
         return document_id
 
+    def _index_collections(self) -> Dict[str, str]:
+        return {
+            "ingest": self._collection.name,
+            "test_instances": self._test_instances_collection.name,
+            "plist": self._plist_collection.name,
+            "cake": self._cake_collection.name,
+            "vmin": self._vmin_collection.name,
+            "scoreboard": self._scoreboard_collection.name,
+            "product": self._product_collection.name,
+            "setpoints": self._setpoints_collection.name,
+            "module_summary": self._module_summary_collection.name,
+            "port_results": self._port_results_collection.name,
+            "flow_map": self._flow_map_collection.name,
+            "artifacts": self._artifacts_collection.name,
+            "artifact_chunks": self._artifact_chunk_collection.name,
+            "hvqk": self._hvqk_collection.name,
+        }
+
     def _ensure_indexes(self) -> None:
-        """Create the indexes expected by the ingestion/query paths."""
+        """Bring the indexes declared in tp_ingest.indexes up to date (once per process)."""
         if self._is_mock:
             return
-
-        self._collection.create_index(
-            [("tp_name", ASCENDING), ("git_hash", ASCENDING)], name="tp_git_idx"
-        )
-        self._collection.create_index(
-            [("report.dll_inventory.name", ASCENDING)], name="dll_inventory_name_idx"
-        )
-        self._test_instances_collection.create_index(
-            [("tp_document_id", ASCENDING), ("instance_name", ASCENDING)],
-            name="test_instances_tp_instance_idx",
-            unique=True,
-        )
-        self._test_instances_collection.create_index(
-            [("tp_document_id", ASCENDING), ("module_name", ASCENDING), ("status", ASCENDING)],
-            name="test_instances_module_status_idx",
-        )
-        self._module_summary_collection.create_index(
-            [("tp_document_id", ASCENDING), ("module_name", ASCENDING)],
-            name="module_summary_tp_module_idx",
-            unique=True,
-        )
-        self._port_results_collection.create_index(
-            [("tp_document_id", ASCENDING), ("instance_name_port", ASCENDING)],
-            name="port_results_tp_instance_idx",
-            unique=True,
-        )
-        self._port_results_collection.create_index(
-            [("tp_document_id", ASCENDING), ("module_name", ASCENDING), ("port", ASCENDING)],
-            name="port_results_module_port_idx",
-        )
-        self._flow_map_collection.create_index(
-            [("tp_document_id", ASCENDING), ("module", ASCENDING), ("dutflow", ASCENDING)],
-            name="flow_map_tp_module_dut_idx",
-        )
-        self._artifacts_collection.create_index(
-            [("tp_document_id", ASCENDING), ("category", ASCENDING)],
-            name="artifacts_tp_category_idx",
-        )
-        self._hvqk_collection.create_index(
-            [("tp_document_id", ASCENDING), ("module_name", ASCENDING)],
-            name="hvqk_tp_module_idx",
-        )
-        self._hvqk_collection.create_index(
-            [("tp_document_id", ASCENDING), ("file_name", ASCENDING)],
-            name="hvqk_tp_file_idx",
-        )
-        self._plist_collection.create_index(
-            [("tp_document_id", ASCENDING)], name="plist_tp_idx"
-        )
-        self._plist_collection.create_index(
-            [("pattern_name", ASCENDING)], name="plist_pattern_idx"
-        )
-        self._cake_collection.create_index(
-            [("tp_document_id", ASCENDING)], name="cake_tp_idx"
-        )
-        self._cake_collection.create_index(
-            [("domain_name", ASCENDING), ("shift_name", ASCENDING)],
-            name="cake_domain_shift_idx",
-        )
-        self._vmin_collection.create_index(
-            [("tp_document_id", ASCENDING)], name="vmin_tp_idx"
-        )
-        self._vmin_collection.create_index(
-            [("module", ASCENDING), ("test_name", ASCENDING)],
-            name="vmin_module_test_idx",
-        )
-        self._scoreboard_collection.create_index(
-            [("tp_document_id", ASCENDING)], name="scoreboard_tp_idx"
-        )
-        self._scoreboard_collection.create_index(
-            [("module", ASCENDING), ("test_instance", ASCENDING)],
-            name="scoreboard_module_test_idx",
-        )
-        self._product_collection.create_index([("product_code", ASCENDING)], name="product_code_idx", unique=True)
-        self._setpoints_collection.create_index(
-            [("tp_document_id", ASCENDING)], name="setpoints_tp_idx"
-        )
-        self._setpoints_collection.create_index(
-            [("module", ASCENDING), ("test_instance", ASCENDING)],
-            name="setpoints_module_test_idx",
-        )
+        ensure_schema(self._client[self._db_name], self._index_collections())
 
     def write_module_summary_entries(
         self,
@@ -321,12 +267,32 @@ class MongoWriter(DatabaseWriter):
         artifacts: Iterable[models.ArtifactReference],
         *,
         product_code: Optional[str] = None,
+        tp_dir: Optional[Path] = None,
+        blob_max_bytes: int = 0,
     ) -> int:
+        """Replace the TP's artifact documents.
+
+        With *tp_dir*, every artifact up to *blob_max_bytes* is hashed and its content put in
+        :attr:`blob_store` (a no-op for content already stored by any TP); the document's
+        ``blob_stored`` flag says whether ``sha256`` can be read back from it.  Larger artifacts
+        are not read, so their documents carry no ``sha256``.
+        """
         tp_document_id = f"{tp_name}:{git_hash}"
         docs: List[Dict[str, Any]] = []
         timestamp = datetime.now(timezone.utc)
         for artifact in artifacts:
             doc = artifact_reference_to_document(artifact)
+            doc["blob_stored"] = False
+            if (
+                tp_dir is not None
+                and artifact.exists_on_disk
+                and artifact.size_bytes <= blob_max_bytes
+            ):
+                try:
+                    doc["sha256"], _ = self.blob_store.put_file(tp_dir / artifact.relative_path, artifact.sha256)
+                    doc["blob_stored"] = True
+                except (OSError, ValueError):
+                    pass
             doc["tp_document_id"] = tp_document_id
             doc["tp_name"] = tp_name
             doc["git_hash"] = git_hash
@@ -348,11 +314,34 @@ class MongoWriter(DatabaseWriter):
         *,
         product_code: Optional[str] = None,
     ) -> int:
+        """Store each config once in the blob collection and reference it from per-TP documents.
+
+        Per-TP documents carry ``sha256`` instead of the parsed ``config``; entries without a
+        hash (or whose blob cannot be created) keep the config inline.
+        """
         tp_document_id = f"{tp_name}:{git_hash}"
         docs: List[Dict[str, Any]] = []
         timestamp = datetime.now(timezone.utc)
+        entries = list(entries)
+        stored = self.known_hvqk_blobs(entry.sha256 for entry in entries if entry.sha256)
         for entry in entries:
             doc = hvqk_config_entry_to_document(entry)
+            if entry.sha256 and (entry.sha256 in stored or entry.config is not None):
+                if entry.sha256 not in stored:
+                    self._hvqk_blob_collection.update_one(
+                        {"_id": entry.sha256},
+                        {
+                            "$setOnInsert": {
+                                "config": entry.config,
+                                "size_bytes": entry.size_bytes,
+                                "first_tp_document_id": tp_document_id,
+                                "created_at": timestamp,
+                            }
+                        },
+                        upsert=True,
+                    )
+                    stored.add(entry.sha256)
+                del doc["config"]
             doc["tp_document_id"] = tp_document_id
             doc["tp_name"] = tp_name
             doc["git_hash"] = git_hash
@@ -366,6 +355,14 @@ class MongoWriter(DatabaseWriter):
             self._hvqk_collection.insert_many(docs)
         return len(docs)
 
+    def known_hvqk_blobs(self, digests: Iterable[str]) -> Set[str]:
+        """Return the subset of *digests* already present in the HVQK blob collection."""
+        wanted = sorted(set(digests))
+        if not wanted:
+            return set()
+        cursor = self._hvqk_blob_collection.find({"_id": {"$in": wanted}}, {"_id": 1})
+        return {doc["_id"] for doc in cursor}
+
     def write_test_instances(
         self,
         tp_name: str,
@@ -528,15 +525,37 @@ class MongoWriter(DatabaseWriter):
         doc["updated_at"] = datetime.now(timezone.utc)
         self._product_collection.update_one(
             {"product_code": config.product_code},
-            {"$set": doc},
+            {"$set": doc, "$unset": {HASH_FIELD: ""}},
             upsert=True,
         )
         return config.product_code
 
+    def product_query_activity(self) -> Dict[str, datetime]:
+        """Last time users asked about each product, as recorded by the query tool."""
+        activity: Dict[str, datetime] = {}
+        for doc in self._query_activity_collection.find({}, {"last_queried_at": 1}):
+            queried_at = doc.get("last_queried_at")
+            if not isinstance(queried_at, datetime):
+                continue
+            if queried_at.tzinfo is None:
+                queried_at = queried_at.replace(tzinfo=timezone.utc)
+            activity[str(doc["_id"]).upper()] = queried_at
+        return activity
+
     def upsert_report(self, tp_name: str, git_hash: str, report: models.IntegrationReport) -> str:
         """Backwards-compatible helper for existing callers."""
         artifact = models.IngestArtifact(tp_name=tp_name, git_hash=git_hash, report=report)
         return self.write_ingest_artifact(artifact)
 
     def close(self) -> None:
-        self._client.close()
+        """Release the writer. The pooled client stays open for other writers in this process."""
+
+
+class SQLiteWriter(MongoWriter):
+    """Writes the same normalized collections into a local SQLite file instead of MongoDB.
+
+    Equivalent to ``MongoWriter("sqlite:///<path>", ...)``; see :mod:`tp_ingest.sqlite_store`.
+    """
+
+    def __init__(self, path: Path | str, db_name: str = "tpfrontdesk", **collections: str) -> None:
+        super().__init__(sqlite_uri(path), db_name, **collections)
@@ -1,12 +1,29 @@
-"""Helpers for loading and matching product configuration documents."""
+"""Helpers for loading and matching product configuration documents.
+
+Products.json is read by the scanner for every TP it ingests and by every CLI that touches
+product metadata.  :func:`load_product_catalog` parses it once per process and keeps the result
+until the file's mtime or size changes; the returned :class:`ProductCatalog` carries prebuilt
+lookups by product code and by every ``LatestTP``/``ListOfReleases`` name, so matching a TP to
+its product is a dict lookup.
+
+The catalog and its configs are shared between callers and must be treated as read-only.
+Callers that edit products take copies: :func:`load_product_configs` returns fresh
+``ProductConfig`` objects and :meth:`ProductCatalog.entries` fresh raw JSON entries.
+"""
 from __future__ import annotations
 
+import copy
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, overload
 
 from . import models
 
+_CACHE: Dict[str, "ProductCatalog"] = {}
+_CACHE_LOCK = threading.Lock()
+
 
 def _strip_json_comments(raw_text: str) -> str:
     cleaned_lines = []
@@ -19,11 +36,7 @@ def _strip_json_comments(raw_text: str) -> str:
     return "\n".join(cleaned_lines)
 
 
-def load_product_configs(path: Path) -> List[models.ProductConfig]:
-    if not path.exists():
-        raise FileNotFoundError(f"Product config file not found: {path}")
-
-    text = path.read_text(encoding="utf-8")
+def _parse_payload(text: str) -> Any:
     cleaned = _strip_json_comments(text)
 
     # Products.json is expected to be valid JSON. Some legacy config files historically
@@ -33,37 +46,139 @@ def load_product_configs(path: Path) -> List[models.ProductConfig]:
         data = json.loads(cleaned)
     except json.JSONDecodeError:
         data = json.loads(cleaned.replace("\\", "\\\\"))
-    items: Iterable[dict]
-    if isinstance(data, list):
-        items = data
-    elif isinstance(data, dict):
-        items = [data]
-    else:
+    if not isinstance(data, (list, dict)):
         raise ValueError("Unexpected product config payload; expected JSON object or array")
+    return data
+
+
+def _config_from_item(item: Dict[str, Any]) -> models.ProductConfig:
+    return models.ProductConfig(
+        product_code=item.get("ProductCode", ""),
+        product_name=item.get("ProductName", ""),
+        network_path=item.get("NetworkPath", ""),
+        latest_tp=item.get("LatestTP"),
+        number_of_releases=item.get("NumberOfReleases"),
+        releases=item.get("ListOfReleases", []) or [],
+        last_run_date=item.get("LastRunDate"),
+        additional_attributes={k: v for k, v in item.items() if k not in {
+            "ProductCode",
+            "ProductName",
+            "NetworkPath",
+            "LatestTP",
+            "NumberOfReleases",
+            "ListOfReleases",
+            "LastRunDate",
+        }},
+    )
+
+
+class _ProductIndex:
+    """TP-name lookups reproducing the precedence of a scan over *configs* in file order.
+
+    A ``LatestTP`` match wins over a ``ListOfReleases`` match; among ``LatestTP`` matches the
+    first product wins, among release matches the last one does.
+    """
+
+    def __init__(self, configs: Sequence[models.ProductConfig]) -> None:
+        self.by_code: Dict[str, models.ProductConfig] = {}
+        self.by_latest: Dict[str, models.ProductConfig] = {}
+        self.by_release: Dict[str, models.ProductConfig] = {}
+        self.by_code_latest: Dict[Tuple[str, str], models.ProductConfig] = {}
+        self.by_code_release: Dict[Tuple[str, str], models.ProductConfig] = {}
+        for config in configs:
+            code = config.product_code.upper() if config.product_code else None
+            latest = (config.latest_tp or "").upper()
+            self.by_latest.setdefault(latest, config)
+            for release in config.releases:
+                self.by_release[release.upper()] = config
+            if code is None:
+                continue
+            self.by_code.setdefault(code, config)
+            self.by_code_latest.setdefault((code, latest), config)
+            for release in config.releases:
+                self.by_code_release[(code, release.upper())] = config
+
+    def find(self, tp_name: str, product_code: Optional[str] = None) -> Optional[models.ProductConfig]:
+        tp_name = tp_name.upper()
+        if not product_code:
+            return self.by_latest.get(tp_name) or self.by_release.get(tp_name)
+        key = (product_code.upper(), tp_name)
+        return self.by_code_latest.get(key) or self.by_code_release.get(key) or self.by_code.get(key[0])
+
+
+class ProductCatalog(Sequence[models.ProductConfig]):
+    """One parse of Products.json: a read-only sequence of configs plus lookups."""
+
+    def __init__(self, path: Path, payload: Any, signature: Optional[Tuple[int, int]] = None) -> None:
+        self.path = path
+        self.signature = signature
+        self.is_list = isinstance(payload, list)
+        self._items: List[Dict[str, Any]] = payload if self.is_list else [payload]
+        self.configs: List[models.ProductConfig] = [_config_from_item(item) for item in self._items]
+        self._index = _ProductIndex(self.configs)
+
+    @overload
+    def __getitem__(self, index: int) -> models.ProductConfig: ...
 
-    configs: List[models.ProductConfig] = []
-    for item in items:
-        configs.append(
-            models.ProductConfig(
-                product_code=item.get("ProductCode", ""),
-                product_name=item.get("ProductName", ""),
-                network_path=item.get("NetworkPath", ""),
-                latest_tp=item.get("LatestTP"),
-                number_of_releases=item.get("NumberOfReleases"),
-                releases=item.get("ListOfReleases", []) or [],
-                last_run_date=item.get("LastRunDate"),
-                additional_attributes={k: v for k, v in item.items() if k not in {
-                    "ProductCode",
-                    "ProductName",
-                    "NetworkPath",
-                    "LatestTP",
-                    "NumberOfReleases",
-                    "ListOfReleases",
-                    "LastRunDate",
-                }},
-            )
-        )
-    return configs
+    @overload
+    def __getitem__(self, index: slice) -> List[models.ProductConfig]: ...
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.configs[index]
+
+    def __len__(self) -> int:
+        return len(self.configs)
+
+    def product(self, product_code: str) -> Optional[models.ProductConfig]:
+        """The first entry with *product_code* (case-insensitive)."""
+        return self._index.by_code.get(product_code.upper())
+
+    def find(self, tp_name: str, product_code: Optional[str] = None) -> Optional[models.ProductConfig]:
+        """The product owning *tp_name*, restricted to *product_code* when given.
+
+        With *product_code* and no release match, that product's entry is returned anyway.
+        """
+        return self._index.find(tp_name, product_code)
+
+    def copy_configs(self) -> List[models.ProductConfig]:
+        return copy.deepcopy(self.configs)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Deep copy of the raw JSON entries, for callers that edit and write them back."""
+        return copy.deepcopy(self._items)
+
+
+def load_product_catalog(path: Path) -> ProductCatalog:
+    """The parsed catalog at *path*, re-parsed only when its mtime or size changed."""
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Product config file not found: {path}") from None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = os.path.abspath(path)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+    if cached is not None and cached.signature == signature:
+        return cached
+    catalog = ProductCatalog(path, _parse_payload(path.read_text(encoding="utf-8")), signature)
+    with _CACHE_LOCK:
+        _CACHE[key] = catalog
+    return catalog
+
+
+def invalidate_product_catalog(path: Optional[Path] = None) -> None:
+    """Drop the cached parse of *path* (every path when None); call after rewriting the file."""
+    with _CACHE_LOCK:
+        if path is None:
+            _CACHE.clear()
+        else:
+            _CACHE.pop(os.path.abspath(path), None)
+
+
+def load_product_configs(path: Path) -> List[models.ProductConfig]:
+    """Fresh ``ProductConfig`` objects the caller may modify."""
+    return load_product_catalog(path).copy_configs()
 
 
 def find_product_config(
@@ -71,21 +186,7 @@ def find_product_config(
     tp_name: str,
     product_code: Optional[str] = None,
 ) -> Optional[models.ProductConfig]:
-    tp_name = tp_name.upper()
-    if product_code:
-        product_code = product_code.upper()
-    best_match: Optional[models.ProductConfig] = None
-    for config in configs:
-        code = config.product_code.upper() if config.product_code else None
-        if product_code and code != product_code:
-            continue
-        if (config.latest_tp or "").upper() == tp_name:
-            return config
-        if any(release.upper() == tp_name for release in config.releases):
-            best_match = config
-    if product_code and not best_match:
-        for config in configs:
-            code = config.product_code.upper() if config.product_code else None
-            if code == product_code:
-                return config
-    return best_match
+    """Match *tp_name* to a product; a :class:`ProductCatalog` answers from its prebuilt index."""
+    if isinstance(configs, ProductCatalog):
+        return configs.find(tp_name, product_code)
+    return _ProductIndex(list(configs)).find(tp_name, product_code)
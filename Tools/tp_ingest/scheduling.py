@@ -0,0 +1,88 @@
+"""Priority ordering for TP ingestion candidates.
+
+When a scan is capped by ``--limit`` or a time budget, the TPs users are most likely to
+ask about should be ingested first.  Each candidate folder is scored from:
+
+* whether it is the product's configured ``LatestTP``;
+* its revision rank within the product and its milestone digit, both decoded with
+  :func:`tp_ingest.naming.tp_name_sort_key` (later milestones, i.e. closer to PRQ, score higher);
+* how recently users queried the product, decaying with a half-life of a few days.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .naming import tp_name_sort_key
+
+LATEST_TP_WEIGHT = 100.0
+QUERY_WEIGHT = 50.0
+QUERY_HALF_LIFE_DAYS = 2.0
+REVISION_WEIGHT = 30.0
+MILESTONE_WEIGHT = 10.0
+
+
+@dataclass
+class ScheduledTP:
+    """A TP folder queued for ingestion together with its priority score."""
+
+    product_code: str
+    path: Path
+    score: float = 0.0
+    reasons: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def tp_name(self) -> str:
+        return self.path.name
+
+
+def query_recency_score(last_queried: Optional[datetime], now: Optional[datetime] = None) -> float:
+    if last_queried is None:
+        return 0.0
+    now = now or datetime.now(timezone.utc)
+    if last_queried.tzinfo is None:
+        last_queried = last_queried.replace(tzinfo=timezone.utc)
+    age_days = max(0.0, (now - last_queried).total_seconds() / 86400.0)
+    return QUERY_WEIGHT * 0.5 ** (age_days / QUERY_HALF_LIFE_DAYS)
+
+
+def score_product_candidates(
+    product_code: str,
+    directories: Sequence[Path],
+    *,
+    latest_tp: Optional[str] = None,
+    last_queried: Optional[datetime] = None,
+    now: Optional[datetime] = None,
+) -> List[ScheduledTP]:
+    """Score one product's candidate folders, highest priority first.
+
+    Ties keep the incoming (newest-mtime-first) order.
+    """
+    by_revision = sorted(directories, key=lambda directory: tp_name_sort_key(directory.name), reverse=True)
+    revision_rank = {directory.name: rank for rank, directory in enumerate(by_revision)}
+    query_score = query_recency_score(last_queried, now)
+    latest = (latest_tp or "").strip().upper()
+
+    scheduled: List[ScheduledTP] = []
+    for directory in directories:
+        _, milestone, _, _, _ = tp_name_sort_key(directory.name)
+        reasons = {
+            "revision": REVISION_WEIGHT / (1 + revision_rank[directory.name]),
+            "milestone": MILESTONE_WEIGHT * milestone,
+        }
+        if query_score:
+            reasons["recent_queries"] = query_score
+        if latest and directory.name.upper() == latest:
+            reasons["latest_tp"] = LATEST_TP_WEIGHT
+        scheduled.append(
+            ScheduledTP(
+                product_code=product_code,
+                path=directory,
+                score=round(sum(reasons.values()), 3),
+                reasons={key: round(value, 3) for key, value in reasons.items()},
+            )
+        )
+    scheduled.sort(key=lambda item: item.score, reverse=True)
+    return scheduled
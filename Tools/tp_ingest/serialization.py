@@ -1,22 +1,24 @@
 """Utilities for converting ingestion dataclasses into Mongo-friendly dicts."""
 from __future__ import annotations
 
+import typing
 from dataclasses import fields, is_dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 from . import models
 
 
+_SERIALIZERS: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
 def _to_mongo(value: Any) -> Any:
     """Recursively convert dataclasses, Paths, and containers into Mongo-safe types."""
     if isinstance(value, Path):
         return str(value)
-    if is_dataclass(value):
-        result: Dict[str, Any] = {}
-        for field in fields(value):
-            result[field.name] = _to_mongo(getattr(value, field.name))
-        return result
+    if is_dataclass(value) and not isinstance(value, type):
+        return serializer_for(type(value))(value)
     if isinstance(value, list):
         return [_to_mongo(item) for item in value]
     if isinstance(value, dict):
@@ -24,207 +26,91 @@ def _to_mongo(value: Any) -> Any:
     return value
 
 
+def _path_to_str(value: Optional[Path]) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def _field_expression(hint: Any, attribute: str, namespace: Dict[str, Any]) -> str:
+    """Python expression converting ``obj.<attribute>`` of declared type *hint*."""
+    access = f"obj.{attribute}"
+    origin = typing.get_origin(hint)
+    if origin is typing.Union:
+        members = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+        if len(members) == 1 and (members[0] in _PLAIN_TYPES or members[0] is Path):
+            hint = members[0]
+        elif all(member in _PLAIN_TYPES for member in members):
+            return access
+        else:
+            return f"_to_mongo({access})"
+        origin = None
+    if hint in _PLAIN_TYPES:
+        return access
+    if hint is Path:
+        return f"_path_to_str({access})"
+    if origin is list:
+        (item,) = typing.get_args(hint) or (Any,)
+        if item in _PLAIN_TYPES:
+            return f"list({access})"
+        if isinstance(item, type) and is_dataclass(item):
+            name = f"_ser_{item.__name__}"
+            namespace[name] = serializer_for(item)
+            return f"[{name}(item) for item in {access}]"
+    if origin is dict:
+        key, item = typing.get_args(hint) or (Any, Any)
+        if key is str and item in _PLAIN_TYPES:
+            return f"dict({access})"
+    if isinstance(hint, type) and is_dataclass(hint):
+        name = f"_ser_{hint.__name__}"
+        namespace[name] = serializer_for(hint)
+        return f"{name}({access})"
+    return f"_to_mongo({access})"
+
+
+def serializer_for(cls: type) -> Callable[[Any], Dict[str, Any]]:
+    """Return a compiled ``obj -> dict`` serializer for dataclass *cls*, built once per type.
+
+    The generated function reads each field directly and only recurses where the declared
+    type requires it (nested dataclasses, Paths, containers of non-primitive values), so the
+    result matches :func:`_to_mongo` without per-value ``fields()``/``isinstance`` checks.
+    """
+    serializer = _SERIALIZERS.get(cls)
+    if serializer is not None:
+        return serializer
+    # Placeholder so self-referencing types resolve to the generic path while compiling.
+    _SERIALIZERS[cls] = _to_mongo
+    hints = typing.get_type_hints(cls)
+    namespace: Dict[str, Any] = {"_to_mongo": _to_mongo, "_path_to_str": _path_to_str}
+    items = ", ".join(
+        f"{field.name!r}: {_field_expression(hints[field.name], field.name, namespace)}"
+        for field in fields(cls)
+    )
+    source = f"def serialize_{cls.__name__}(obj):\n    return {{{items}}}\n"
+    exec(compile(source, f"<serializer {cls.__qualname__}>", "exec"), namespace)
+    serializer = namespace[f"serialize_{cls.__name__}"]
+    _SERIALIZERS[cls] = serializer
+    return serializer
+
+
 def integration_report_to_document(report: models.IntegrationReport) -> Dict[str, Any]:
     """Serialize an IntegrationReport into a plain dictionary."""
-    return _to_mongo(report)
+    return serializer_for(models.IntegrationReport)(report)
 
 
 def ingest_artifact_to_document(artifact: models.IngestArtifact) -> Dict[str, Any]:
     """Serialize the top-level ingest artifact (program, git hash, report)."""
-    return _to_mongo(artifact)
-
-
-def pas_record_to_document(record: models.PASRecord) -> Dict[str, Any]:
-    return {
-        "instance_name": record.instance_name,
-        "status": record.status,
-        "bypass": record.bypass,
-        "bins": record.bins,
-        "counters": record.counters,
-        "level": record.level,
-        "timing": record.timing,
-        "plist": record.plist,
-        "monitor_pat_count": record.monitor_pat_count,
-        "kill_pat_count": record.kill_pat_count,
-        "skipped_pat_count": record.skipped_pat_count,
-        "content_directory": record.content_directory,
-        "pattern_vrev": record.pattern_vrev,
-        "test_type": record.test_type,
-        "tp_options": record.tp_options,
-        "scrum": record.scrum,
-        "module_name": record.module_name,
-        "module_user": record.module_user,
-        "test_category": record.test_category,
-        "partition": record.partition,
-        "test_type_detail": record.test_type_detail,
-        "test_type_flag": record.test_type_flag,
-        "subflow": record.subflow,
-        "pattern_ratio": record.pattern_ratio,
-        "voltage_domain": record.voltage_domain,
-        "corner": record.corner,
-        "frequency": record.frequency,
-        "instance_user": record.instance_user,
-    }
-
-
-def plist_entry_to_document(entry: models.PlistEntry) -> Dict[str, Any]:
-    return {
-        "pattern_name": entry.pattern_name,
-        "total_patterns": entry.total_patterns,
-        "commented_patterns": entry.commented_patterns,
-        "flatten": entry.flatten,
-        "burst_off": entry.burst_off,
-        "pre_burst": entry.pre_burst,
-        "post_burst": entry.post_burst,
-        "pre_burst_plist": entry.pre_burst_plist,
-        "post_burst_plist": entry.post_burst_plist,
-        "pre_pattern": entry.pre_pattern,
-        "post_pattern": entry.post_pattern,
-        "mask": entry.mask,
-        "keep_alive": entry.keep_alive,
-    }
-
-
-def cake_audit_entry_to_document(entry: models.CakeAuditEntry) -> Dict[str, Any]:
-    return {
-        "domain_name": entry.domain_name,
-        "shift_name": entry.shift_name,
-        "gsds": entry.gsds,
-    }
-
-
-def vmin_search_record_to_document(record: models.VMinSearchRecord) -> Dict[str, Any]:
-    return {
-        "module": record.module,
-        "test_name": record.test_name,
-        "template": record.template,
-        "execution_mode": record.execution_mode,
-        "vmin_predict": record.vmin_predict,
-        "low_search": record.low_search,
-        "hi_search": record.hi_search,
-        "gsds": record.gsds,
-        "search_pin": record.search_pin,
-        "overshoot_recv": record.overshoot_recv,
-        "vmin_pred_high": record.vmin_pred_high,
-        "search_result": record.search_result,
-    }
-
-
-def scoreboard_entry_to_document(entry: models.ScoreboardEntry) -> Dict[str, Any]:
-    return {
-        "module": entry.module,
-        "test_instance": entry.test_instance,
-        "base_number": entry.base_number,
-        "duplicate": entry.duplicate,
-        "in_range": entry.in_range,
-        "extra_info": entry.extra_info,
-    }
-
-
-def setpoint_entry_to_document(entry: models.SetpointEntry) -> Dict[str, Any]:
-    return {
-        "module": entry.module,
-        "test_instance": entry.test_instance,
-        "method": entry.method,
-        "source_file": str(entry.source_file),
-        "values": entry.values,
-    }
-
-
-def product_config_to_document(config: models.ProductConfig) -> Dict[str, Any]:
-    return {
-        "product_code": config.product_code,
-        "product_name": config.product_name,
-        "network_path": config.network_path,
-        "latest_tp": config.latest_tp,
-        "number_of_releases": config.number_of_releases,
-        "releases": config.releases,
-        "last_run_date": config.last_run_date,
-        "additional_attributes": config.additional_attributes,
-    }
-
-
-def module_summary_entry_to_document(entry: models.ModuleSummaryEntry) -> Dict[str, Any]:
-    return {
-        "module_name": entry.module_name,
-        "total_tests": entry.total_tests,
-        "total_tests_run": entry.total_tests_run,
-        "total_kill": entry.total_kill,
-        "total_edc": entry.total_edc,
-        "total_monitor": entry.total_monitor,
-        "total_float": entry.total_float,
-        "total_bypassed": entry.total_bypassed,
-        "always_bypassed": entry.always_bypassed,
-        "percent_kill": entry.percent_kill,
-        "percent_kill_monitor": entry.percent_kill_monitor,
-        "run_rate": entry.run_rate,
-        "kill_rate": entry.kill_rate,
-        "bypass_rate": entry.bypass_rate,
-        "source_path": str(entry.source_path) if entry.source_path else None,
-    }
-
-
-def port_result_row_to_document(row: models.PortResultRow) -> Dict[str, Any]:
-    return {
-        "instance_name_port": row.instance_name_port,
-        "status": row.status,
-        "bypass": row.bypass,
-        "bin": row.bin,
-        "hb": row.hb,
-        "sb": row.sb,
-        "counter": row.counter,
-        "plist": row.plist,
-        "monitor_pat_count": row.monitor_pat_count,
-        "kill_pat_count": row.kill_pat_count,
-        "skipped_pat_count": row.skipped_pat_count,
-        "content_directory": row.content_directory,
-        "pattern_vrev": row.pattern_vrev,
-        "test_type": row.test_type,
-        "tp_options": row.tp_options,
-        "scrum": row.scrum,
-        "module_name": row.module_name,
-        "module_user": row.module_user,
-        "test_category": row.test_category,
-        "partition": row.partition,
-        "test_type_flag": row.test_type_flag,
-        "subflow": row.subflow,
-        "pattern_ratio": row.pattern_ratio,
-        "voltage_domain": row.voltage_domain,
-        "corner": row.corner,
-        "frequency": row.frequency,
-        "port_owner": row.port_owner,
-        "port": row.port,
-        "instance_name": row.instance_name,
-        "module_summary_name": row.module_summary_name,
-    }
-
-
-def flow_map_entry_to_document(entry: models.FlowMapEntry) -> Dict[str, Any]:
-    return {
-        "module": entry.module,
-        "dutflow": entry.dutflow,
-        "instance": entry.instance,
-        "sequence_index": entry.sequence_index,
-    }
-
-
-def artifact_reference_to_document(entry: models.ArtifactReference) -> Dict[str, Any]:
-    return {
-        "name": entry.name,
-        "relative_path": entry.relative_path,
-        "category": entry.category,
-        "size_bytes": entry.size_bytes,
-        "sha256": entry.sha256,
-        "exists_on_disk": entry.exists_on_disk,
-    }
-
-
-def hvqk_config_entry_to_document(entry: models.HVQKConfigEntry) -> Dict[str, Any]:
-    return {
-        "module_name": entry.module_name,
-        "file_name": entry.file_name,
-        "relative_path": entry.relative_path,
-        "size_bytes": entry.size_bytes,
-        "sha256": entry.sha256,
-        "config": entry.config,
-    }
+    return serializer_for(models.IngestArtifact)(artifact)
+
+
+# Per-row serializers, compiled once at import.
+pas_record_to_document = serializer_for(models.PASRecord)
+plist_entry_to_document = serializer_for(models.PlistEntry)
+cake_audit_entry_to_document = serializer_for(models.CakeAuditEntry)
+vmin_search_record_to_document = serializer_for(models.VMinSearchRecord)
+scoreboard_entry_to_document = serializer_for(models.ScoreboardEntry)
+setpoint_entry_to_document = serializer_for(models.SetpointEntry)
+product_config_to_document = serializer_for(models.ProductConfig)
+module_summary_entry_to_document = serializer_for(models.ModuleSummaryEntry)
+port_result_row_to_document = serializer_for(models.PortResultRow)
+flow_map_entry_to_document = serializer_for(models.FlowMapEntry)
+artifact_reference_to_document = serializer_for(models.ArtifactReference)
+hvqk_config_entry_to_document = serializer_for(models.HVQKConfigEntry)
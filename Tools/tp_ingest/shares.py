@@ -0,0 +1,123 @@
+"""Concurrent, time-limited checks of product network shares.
+
+A stat or listing of an unreachable SMB share blocks for the full client timeout, so checking
+products one after another costs that timeout once per dead share.  :func:`run_with_timeouts`
+runs one call per share on daemon threads, at most ``max_workers`` at a time, and yields
+results as they complete; a call still running ``timeout`` seconds after it started is
+reported as a :class:`TimeoutError` and abandoned (a blocked SMB call cannot be cancelled,
+but a daemon thread does not keep the process alive).
+
+:class:`ShareHealthCache` remembers shares that just failed so later runs report them
+immediately instead of waiting on them again until ``down_ttl`` expires.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Sequence, Tuple, TypeVar
+
+from .fileio import atomic_write_text
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+DEFAULT_TIMEOUT_SECONDS = 10.0
+DEFAULT_WORKERS = 32
+DEFAULT_DOWN_TTL_MINUTES = 15.0
+
+T = TypeVar("T")
+
+
+def run_with_timeouts(
+    func: Callable[[T], Any],
+    items: Sequence[T],
+    *,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    max_workers: int = DEFAULT_WORKERS,
+) -> Iterator[Tuple[T, Any, Optional[BaseException]]]:
+    """Yield ``(item, result, error)`` for each item as its call completes or times out."""
+    results: "queue.Queue[Tuple[int, Any, Optional[BaseException]]]" = queue.Queue()
+    waiting: Deque[int] = deque(range(len(items)))
+    running: Dict[int, float] = {}
+    max_workers = max(1, max_workers)
+
+    def _call(position: int) -> None:
+        try:
+            results.put((position, func(items[position]), None))
+        except BaseException as exc:  # noqa: BLE001 - handed back to the caller
+            results.put((position, None, exc))
+
+    while waiting or running:
+        while waiting and len(running) < max_workers:
+            position = waiting.popleft()
+            running[position] = time.monotonic()
+            threading.Thread(target=_call, args=(position,), daemon=True, name=f"share-check-{position}").start()
+        deadline = min(running.values()) + timeout
+        try:
+            position, value, error = results.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            now = time.monotonic()
+            for position, started in sorted(running.items()):
+                if now - started >= timeout:
+                    del running[position]
+                    yield items[position], None, TimeoutError(f"timed out after {timeout:g}s")
+            continue
+        if running.pop(position, None) is None:
+            continue  # finished after it was already reported as timed out
+        yield items[position], value, error
+
+
+class ShareHealthCache:
+    """JSON file of shares that recently failed, keyed by path string."""
+
+    def __init__(self, path: Optional[Path] = None, *, down_ttl_minutes: float = DEFAULT_DOWN_TTL_MINUTES) -> None:
+        self.path = path
+        self.down_ttl = timedelta(minutes=down_ttl_minutes)
+        self._down: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        if path is not None:
+            self._load(path)
+
+    def _load(self, path: Path) -> None:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as exc:
+            LOGGER.warning("Ignoring unreadable share health cache %s: %s", path, exc)
+            return
+        if isinstance(data, dict) and data.get("version") == CACHE_VERSION and isinstance(data.get("down"), dict):
+            self._down = data["down"]
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        atomic_write_text(self.path, json.dumps({"version": CACHE_VERSION, "down": self._down}, indent=2, sort_keys=True))
+        self._dirty = False
+
+    def known_down(self, share: str, now: Optional[datetime] = None) -> Optional[str]:
+        """The recorded error when *share* failed less than ``down_ttl`` ago, else None."""
+        record = self._down.get(share)
+        if not record:
+            return None
+        try:
+            failed_at = datetime.fromisoformat(record["failed_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if (now or datetime.now(timezone.utc)) - failed_at >= self.down_ttl:
+            return None
+        return str(record.get("error") or "unavailable")
+
+    def mark_down(self, share: str, error: str) -> None:
+        self._down[share] = {"failed_at": datetime.now(timezone.utc).isoformat(), "error": error}
+        self._dirty = True
+
+    def mark_up(self, share: str) -> None:
+        if self._down.pop(share, None) is not None:
+            self._dirty = True
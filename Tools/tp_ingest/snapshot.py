@@ -0,0 +1,121 @@
+"""Local cache of fully parsed TPs.
+
+Parsing every CSV and text report of a large TP takes far longer than loading the resulting
+dataclass graph, so :class:`SnapshotCache` stores a :class:`ParsedTP` per TP as a pickle
+(protocol 5) next to a small header.  A snapshot is reused only while
+
+* its format stamp matches: ``SNAPSHOT_VERSION`` plus a digest of the sources of
+  ``tp_ingest.models`` and ``tp_ingest.parsers``, so editing a parser or model invalidates
+  every snapshot without a manual bump; and
+* its input fingerprint matches: path, size and mtime of every file the parsers read.
+
+Snapshots are trusted local files (pickle executes code on load); keep the cache directory
+private to the account running the tools.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import models
+from .fileio import atomic_writer
+from .parsers.cake_vadt import CakeAuditParseResult
+from .parsers.flow_map import FlowMapParseResult
+from .parsers.module_summary import ModuleSummaryParseResult
+from .parsers.pas import PASParseResult
+from .parsers.plist_master import PlistMasterParseResult
+from .parsers.port_results import PortResultsParseResult
+from .parsers.scoreboard import ScoreboardParseResult
+from .parsers.setpoints import SetpointParserResult
+from .parsers.vmin_search import VMinSearchParseResult
+
+LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+PICKLE_PROTOCOL = 5
+SNAPSHOT_SUFFIX = ".snapshot"
+
+_FORMAT_STAMP: Optional[str] = None
+
+
+@dataclass
+class ParsedTP:
+    """Everything ``run_ingestion`` parses from one TP folder."""
+
+    integration: models.IntegrationReport
+    pas: PASParseResult
+    plist: PlistMasterParseResult
+    cake: CakeAuditParseResult
+    vmin: VMinSearchParseResult
+    scoreboard: ScoreboardParseResult
+    module_summary: ModuleSummaryParseResult
+    port_results: PortResultsParseResult
+    flow_map: FlowMapParseResult
+    setpoints: SetpointParserResult
+    artifacts: List[models.ArtifactReference] = field(default_factory=list)
+    hvqk_configs: List[models.HVQKConfigEntry] = field(default_factory=list)
+
+
+def format_stamp() -> str:
+    """Snapshot format identifier; changes whenever the models or parsers change."""
+    global _FORMAT_STAMP
+    if _FORMAT_STAMP is None:
+        package_dir = Path(__file__).resolve().parent
+        sources = [package_dir / "models.py", *sorted((package_dir / "parsers").glob("*.py"))]
+        digest = hashlib.sha256(str(SNAPSHOT_VERSION).encode("ascii"))
+        for source in sources:
+            digest.update(source.name.encode("utf-8"))
+            digest.update(source.read_bytes())
+        _FORMAT_STAMP = f"{SNAPSHOT_VERSION}:{digest.hexdigest()[:16]}"
+    return _FORMAT_STAMP
+
+
+def fingerprint(paths: Iterable[Path]) -> str:
+    """Digest of the path, size and mtime of each input; missing files count as absent."""
+    digest = hashlib.sha256()
+    for path in sorted(set(paths)):
+        try:
+            stat = path.stat()
+            marker = f"{stat.st_size}:{stat.st_mtime_ns}"
+        except OSError:
+            marker = "missing"
+        digest.update(f"{path}\0{marker}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """Directory of ``<tp_name>-<key>.snapshot`` files, one per parsed TP folder."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _path(self, tp_dir: Path) -> Path:
+        key = hashlib.sha1(str(tp_dir.resolve()).encode("utf-8")).hexdigest()[:12]
+        return self.directory / f"{tp_dir.name}-{key}{SNAPSHOT_SUFFIX}"
+
+    def load(self, tp_dir: Path, input_fingerprint: str) -> Optional[ParsedTP]:
+        path = self._path(tp_dir)
+        try:
+            with path.open("rb") as handle:
+                header: Dict[str, Any] = pickle.load(handle)
+                if header.get("format") != format_stamp() or header.get("fingerprint") != input_fingerprint:
+                    return None
+                parsed = pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as exc:
+            LOGGER.warning("Ignoring unreadable snapshot %s: %s", path, exc)
+            return None
+        return parsed if isinstance(parsed, ParsedTP) else None
+
+    def store(self, tp_dir: Path, input_fingerprint: str, parsed: ParsedTP) -> Path:
+        path = self._path(tp_dir)
+        header = {"format": format_stamp(), "fingerprint": input_fingerprint, "tp_dir": str(tp_dir)}
+        with atomic_writer(path, "wb") as handle:
+            pickle.dump(header, handle, protocol=PICKLE_PROTOCOL)
+            pickle.dump(parsed, handle, protocol=PICKLE_PROTOCOL)
+        return path
@@ -0,0 +1,1408 @@
+"""Embedded SQLite document store with the subset of the PyMongo API the TP tools use.
+
+``sqlite:///<path>`` URIs resolve to a :class:`SQLiteClient` through
+:func:`tp_ingest.clients.get_client`, so ``MongoWriter`` can write every normalized
+collection into one local file and ``test_program_intelligence.Tools`` can read it back.
+Offline analysis, CI and benchmarks then run at disk speed without the replica set.
+
+Each collection is a table ``(_id TEXT PRIMARY KEY, doc TEXT)`` holding the document as JSON.
+Indexes declared in :mod:`tp_ingest.indexes` become SQLite expression indexes over
+``json_extract(doc, ...)``, so ``manage_indexes.py`` and ``ensure_schema`` work unchanged and the
+tables can also be queried directly with SQL.
+
+Queries are translated to SQL as far as possible: equality, ``$in``, range and ``$regex``
+conditions become ``json_extract`` predicates (which use those indexes), sorts become
+``ORDER BY`` and skip/limit become ``LIMIT``/``OFFSET``.  Every write records which dotted
+paths of the collection have ever held an array (table ``_tpfd_array_paths``); conditions and
+sorts on fields with no array along their path are answered by SQL alone.  On the other fields
+Mongo matches array elements, which ``json_extract`` cannot express, so SQL only narrows the
+candidate rows and :func:`_matches` re-checks the full filter in Python over those rows, and
+sorting follows Mongo's min/max-element rule.  Whether a field is indexed never changes the
+result.  Projections, ``count_documents``, ``distinct`` and the
+``$group`` stage decode just the top-level fields they need instead of whole documents.
+Updates and pipeline stages after the leading ``$match`` are evaluated in Python; operators
+outside the supported subset raise :class:`~pymongo.errors.OperationFailure`.
+
+The database name is ignored: one file holds one database.
+"""
+from __future__ import annotations
+
+import base64
+import copy
+import functools
+import itertools
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError, InvalidOperation, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+SQLITE_SCHEME = "sqlite://"
+_INDEX_TABLE = "_tpfd_indexes"
+_ARRAY_TABLE = "_tpfd_array_paths"
+_TRACKED_TABLE = "_tpfd_tracked"
+_MISSING = object()
+_DELETE_BATCH = 500
+_RANGE_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+_REGEX_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+_PIPELINE_STAGES = {"$match", "$group", "$sort", "$limit", "$skip", "$project", "$count", "$unwind"}
+
+
+def is_sqlite_uri(uri: str) -> bool:
+    return uri.startswith(SQLITE_SCHEME)
+
+
+def sqlite_path(uri: str) -> str:
+    """Database path of a ``sqlite:///relative.db`` / ``sqlite:////abs.db`` / ``sqlite:///:memory:`` URI."""
+    if not uri.startswith(SQLITE_SCHEME + "/"):
+        raise ValueError(f"Expected a sqlite:///<path> URI, got {uri!r}")
+    return uri[len(SQLITE_SCHEME) + 1 :] or ":memory:"
+
+
+def sqlite_uri(path: Path | str) -> str:
+    return f"{SQLITE_SCHEME}/{path}"
+
+
+def _date_text(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="milliseconds")
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": _date_text(value)}
+    if isinstance(value, date):
+        return {"$date": _date_text(datetime(value.year, value.month, value.day))}
+    if isinstance(value, bytes):
+        return {"$binary": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    raise TypeError(f"Cannot store {type(value).__name__} in the SQLite backend")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    # Mirror PyMongo's default tz_aware=False: datetimes come back as naive UTC.
+    if len(obj) == 1:
+        if "$date" in obj:
+            return datetime.fromisoformat(obj["$date"])
+        if "$binary" in obj:
+            return base64.b64decode(obj["$binary"])
+        if "$oid" in obj:
+            return ObjectId(obj["$oid"])
+    return obj
+
+
+def dumps(document: Mapping[str, Any]) -> str:
+    return json.dumps(document, default=_encode, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(text: str) -> Dict[str, Any]:
+    return json.loads(text, object_hook=_decode)
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _path(field: str) -> str:
+    """SQL string literal of the JSON path of dotted *field*."""
+    path = "$" + "".join("." + _quote(part) for part in field.split("."))
+    return "'" + path.replace("'", "''") + "'"
+
+
+def _json_path(field: str) -> str:
+    """SQL expression extracting dotted *field*; index and query SQL must use identical text."""
+    return f"json_extract(doc, {_path(field)})"
+
+
+def _json_type(field: str) -> str:
+    return f"json_type(doc, {_path(field)})"
+
+
+def _id_key(value: Any) -> str:
+    if isinstance(value, (str, ObjectId)):
+        return str(value)
+    return dumps({"v": value})
+
+
+def _typed(value: Any, kind: Optional[str]) -> Any:
+    """Python value of a ``json_extract``/``json_type`` column pair."""
+    if kind == "true":
+        return True
+    if kind == "false":
+        return False
+    if kind in ("object", "array"):
+        return json.loads(value, object_hook=_decode)
+    return value
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(pattern: str, flags: int) -> "re.Pattern[str]":
+    return re.compile(pattern, flags)
+
+
+def _regex(pattern: Any, options: str = "") -> "re.Pattern[str]":
+    flags = 0
+    for letter in options or "":
+        flags |= _REGEX_FLAGS.get(letter, 0)
+    if isinstance(pattern, re.Pattern):
+        return _compile(pattern.pattern, pattern.flags | flags)
+    return _compile(str(pattern), flags)
+
+
+def _sql_regexp(pattern: str, flags: int, value: Any) -> int:
+    return int(isinstance(value, str) and _compile(pattern, flags).search(value) is not None)
+
+
+# Python evaluation ---------------------------------------------------------------------
+def _resolve(value: Any, parts: Sequence[str]) -> List[Any]:
+    """Values at dotted path *parts*, descending into arrays the way MongoDB does.
+
+    A branch of the path that ends without a value contributes ``_MISSING`` (which a null
+    query matches); an empty array contributes nothing.
+    """
+    if not parts:
+        return [value]
+    head, rest = parts[0], parts[1:]
+    if isinstance(value, Mapping):
+        return _resolve(value[head], rest) if head in value else [_MISSING]
+    if isinstance(value, list):
+        found: List[Any] = []
+        if head.isdigit() and int(head) < len(value):
+            found.extend(_resolve(value[int(head)], rest))
+        for item in value:
+            if isinstance(item, Mapping):
+                found.extend(_resolve(item, parts))
+        return found
+    return [_MISSING]
+
+
+def _candidates(values: Iterable[Any]) -> Iterator[Any]:
+    for value in values:
+        if value is _MISSING:
+            continue
+        yield value
+        if isinstance(value, list):
+            yield from value
+
+
+def _equal(value: Any, target: Any) -> bool:
+    if isinstance(target, re.Pattern):
+        return isinstance(value, str) and _regex(target).search(value) is not None
+    if isinstance(value, bool) != isinstance(target, bool):
+        return False
+    if isinstance(value, datetime) and isinstance(target, datetime):
+        return _date_text(value) == _date_text(target)
+    return bool(value == target)
+
+
+def _compare(value: Any, bound: Any) -> Optional[int]:
+    """-1/0/1 when *value* and *bound* are of the same comparable kind, else None."""
+    if _is_number(value) and _is_number(bound):
+        pass
+    elif isinstance(value, str) and isinstance(bound, str):
+        pass
+    elif isinstance(value, datetime) and isinstance(bound, datetime):
+        value, bound = _date_text(value), _date_text(bound)
+    else:
+        return None
+    return (value > bound) - (value < bound)
+
+
+def _equals_any(values: List[Any], target: Any) -> bool:
+    if target is None and any(value is _MISSING for value in values):
+        return True
+    return any(_equal(value, target) for value in _candidates(values))
+
+
+def _operator(values: List[Any], operator: str, argument: Any, options: str) -> bool:
+    if operator == "$eq":
+        return _equals_any(values, argument)
+    if operator == "$ne":
+        return not _equals_any(values, argument)
+    if operator in ("$in", "$nin"):
+        if not isinstance(argument, (list, tuple, set)):
+            raise OperationFailure(f"{operator} needs an array")
+        found = any(_equals_any(values, item) for item in argument)
+        return found if operator == "$in" else not found
+    if operator in _RANGE_OPERATORS:
+        for value in _candidates(values):
+            order = _compare(value, argument)
+            if order is not None and (
+                (operator == "$gt" and order > 0)
+                or (operator == "$gte" and order >= 0)
+                or (operator == "$lt" and order < 0)
+                or (operator == "$lte" and order <= 0)
+            ):
+                return True
+        return False
+    if operator == "$exists":
+        return any(value is not _MISSING for value in values) == bool(argument)
+    if operator == "$regex":
+        pattern = _regex(argument, options)
+        return any(isinstance(value, str) and pattern.search(value) for value in _candidates(values))
+    if operator == "$not":
+        if isinstance(argument, re.Pattern):
+            return not _operator(values, "$regex", argument, "")
+        if isinstance(argument, Mapping):
+            return not _conditions(values, argument)
+        raise OperationFailure("$not needs a regex or a document")
+    if operator == "$size":
+        return any(isinstance(value, list) and len(value) == argument for value in values)
+    if operator == "$all":
+        return all(_equals_any(values, item) for item in argument)
+    if operator == "$elemMatch":
+        return any(
+            isinstance(value, list) and any(isinstance(item, Mapping) and _matches(item, argument) for item in value)
+            for value in values
+        )
+    raise OperationFailure(f"Query operator {operator} is not supported by the SQLite backend")
+
+
+def _is_operator_document(condition: Any) -> bool:
+    return isinstance(condition, Mapping) and bool(condition) and all(str(key).startswith("$") for key in condition)
+
+
+def _conditions(values: List[Any], condition: Mapping[str, Any]) -> bool:
+    options = condition.get("$options", "")
+    return all(
+        _operator(values, operator, argument, options)
+        for operator, argument in condition.items()
+        if operator != "$options"
+    )
+
+
+def _matches(document: Mapping[str, Any], filter: Mapping[str, Any]) -> bool:
+    """True when *document* satisfies the MongoDB query *filter*."""
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(_matches(document, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(document, part) for part in condition):
+                return False
+        elif key == "$nor":
+            if any(_matches(document, part) for part in condition):
+                return False
+        elif key.startswith("$"):
+            raise OperationFailure(f"Query operator {key} is not supported by the SQLite backend")
+        else:
+            values = _resolve(document, key.split("."))
+            if _is_operator_document(condition):
+                if not _conditions(values, condition):
+                    return False
+            elif not _equals_any(values, condition):
+                return False
+    return True
+
+
+def _filter_fields(filter: Mapping[str, Any]) -> Optional[Set[str]]:
+    """Top-level fields *filter* reads (None when it needs the whole document)."""
+    fields: Set[str] = set()
+    for key, condition in filter.items():
+        if key in ("$and", "$or", "$nor"):
+            for part in condition:
+                nested = _filter_fields(part)
+                if nested is None:
+                    return None
+                fields |= nested
+        elif key.startswith("$"):
+            return None
+        else:
+            fields.add(key.split(".", 1)[0])
+    return fields
+
+
+def _projection_spec(projection: Any) -> Optional[Tuple[bool, bool, List[str]]]:
+    """``(inclusion, include_id, fields)`` for a find projection, or None for whole documents."""
+    if projection is None:
+        return None
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    spec = dict(projection)
+    for value in spec.values():
+        if isinstance(value, Mapping):
+            raise OperationFailure("Projection operators are not supported by the SQLite backend")
+    include_id = bool(spec.pop("_id", True))
+    included = [field for field, value in spec.items() if value]
+    excluded = [field for field, value in spec.items() if not value]
+    if included and excluded:
+        raise OperationFailure("Cannot mix inclusion and exclusion in a projection")
+    if not included and not excluded:
+        return (not include_id, include_id, [])
+    return (bool(included), include_id, included or excluded)
+
+
+def _copy_path(source: Any, target: Dict[str, Any], parts: Sequence[str]) -> None:
+    head, rest = parts[0], parts[1:]
+    if not isinstance(source, Mapping) or head not in source:
+        return
+    value = source[head]
+    if not rest:
+        target[head] = value
+    elif isinstance(value, Mapping):
+        _copy_path(value, target.setdefault(head, {}), rest)
+    elif isinstance(value, list):
+        existing = target.get(head)
+        if not isinstance(existing, list):
+            existing = target[head] = [{} for item in value if isinstance(item, Mapping)]
+        for item, slot in zip((item for item in value if isinstance(item, Mapping)), existing):
+            _copy_path(item, slot, rest)
+
+
+def _drop_path(document: Any, parts: Sequence[str]) -> None:
+    if isinstance(document, list):
+        for item in document:
+            _drop_path(item, parts)
+    elif isinstance(document, dict):
+        if len(parts) == 1:
+            document.pop(parts[0], None)
+        elif parts[0] in document:
+            _drop_path(document[parts[0]], parts[1:])
+
+
+def _project(document: Dict[str, Any], spec: Optional[Tuple[bool, bool, List[str]]]) -> Dict[str, Any]:
+    """Apply a projection; *document* is freshly decoded, so exclusions edit it in place."""
+    if spec is None:
+        return document
+    inclusion, include_id, fields = spec
+    if inclusion:
+        projected: Dict[str, Any] = {}
+        if include_id and "_id" in document:
+            projected["_id"] = document["_id"]
+        for field in fields:
+            _copy_path(document, projected, field.split("."))
+        return projected
+    for field in fields:
+        _drop_path(document, field.split("."))
+    if not include_id:
+        document.pop("_id", None)
+    return document
+
+
+def _sort_spec(key_or_list: Any, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    if key_or_list is None:
+        return []
+    if isinstance(key_or_list, str):
+        return [(key_or_list, int(direction or ASCENDING))]
+    if isinstance(key_or_list, Mapping):
+        return [(str(field), int(order)) for field, order in key_or_list.items()]
+    return [(str(field), int(order)) for field, order in key_or_list]
+
+
+def _sort_rank(value: Any) -> Tuple[Any, ...]:
+    """Sort key following MongoDB's cross-type order for the scalar types the tools store."""
+    if value is _MISSING or value is None:
+        return (1,)
+    if isinstance(value, bool):
+        return (8, value)
+    if _is_number(value):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    if isinstance(value, datetime):
+        return (9, _date_text(value))
+    if isinstance(value, ObjectId):
+        return (7, str(value))
+    if isinstance(value, bytes):
+        return (6, value)
+    return (4 if isinstance(value, Mapping) else 5, json.dumps(value, sort_keys=True, default=str))
+
+
+def _sort_key(document: Any, field: str, descending: bool) -> Tuple[Any, ...]:
+    """Mongo's sort key: the smallest array element ascending, the largest descending."""
+    keys: List[Tuple[Any, ...]] = []
+    for value in _resolve(document, field.split(".")):
+        if isinstance(value, list):
+            keys.extend(_sort_rank(item) for item in value)
+            if not value:
+                keys.append((0,))  # an empty array sorts before null
+        else:
+            keys.append(_sort_rank(value))
+    if not keys:
+        return _sort_rank(_MISSING)
+    return max(keys) if descending else min(keys)
+
+
+def _sort_documents(documents: List[Dict[str, Any]], spec: Sequence[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    for field, order in reversed(list(spec)):
+        documents.sort(key=lambda document: _sort_key(document, field, order < 0), reverse=order < 0)
+    return documents
+
+
+# Aggregation ---------------------------------------------------------------------------
+def _get(document: Any, parts: Sequence[str]) -> Any:
+    if not parts:
+        return document
+    if isinstance(document, Mapping):
+        return _get(document[parts[0]], parts[1:]) if parts[0] in document else _MISSING
+    if isinstance(document, list):
+        values = [_get(item, parts) for item in document if isinstance(item, Mapping)]
+        return [value for value in values if value is not _MISSING]
+    return _MISSING
+
+
+def _evaluate(document: Mapping[str, Any], expression: Any) -> Any:
+    """Value of an aggregation expression: ``"$field.path"``, a document of those, or a literal."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        if expression.startswith("$$"):
+            raise OperationFailure(f"Variable {expression} is not supported by the SQLite backend")
+        return _get(document, expression[1:].split("."))
+    if isinstance(expression, Mapping):
+        if any(str(key).startswith("$") for key in expression):
+            raise OperationFailure(f"Expression {dict(expression)} is not supported by the SQLite backend")
+        return {key: _value(_evaluate(document, value)) for key, value in expression.items()}
+    if isinstance(expression, list):
+        return [_value(_evaluate(document, item)) for item in expression]
+    return expression
+
+
+def _value(value: Any) -> Any:
+    return None if value is _MISSING else value
+
+
+def _expression_fields(expression: Any) -> Set[str]:
+    if isinstance(expression, str) and expression.startswith("$") and not expression.startswith("$$"):
+        return {expression[1:].split(".", 1)[0]}
+    if isinstance(expression, Mapping):
+        return set().union(*(_expression_fields(value) for value in expression.values()))
+    if isinstance(expression, list):
+        return set().union(*(_expression_fields(item) for item in expression))
+    return set()
+
+
+def _group_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=lambda item: repr(_encode(item)))
+
+
+def _group(documents: Iterable[Dict[str, Any]], spec: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    spec = dict(spec)
+    if "_id" not in spec:
+        raise OperationFailure("$group needs an _id")
+    key_expression = spec.pop("_id")
+    accumulators: List[Tuple[str, str, Any]] = []
+    for name, accumulator in spec.items():
+        if not isinstance(accumulator, Mapping) or len(accumulator) != 1:
+            raise OperationFailure(f"$group field {name} must be a single accumulator")
+        (operator, argument), = accumulator.items()
+        if operator not in ("$sum", "$avg", "$min", "$max", "$first", "$last", "$push", "$addToSet", "$count"):
+            raise OperationFailure(f"Accumulator {operator} is not supported by the SQLite backend")
+        accumulators.append((name, operator, argument))
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    averages: Dict[Tuple[str, str], List[float]] = {}
+    for document in documents:
+        key = _value(_evaluate(document, key_expression))
+        token = _group_key(key)
+        group = groups.get(token)
+        if group is None:
+            group = groups[token] = {"_id": key}
+            for name, operator, _ in accumulators:
+                group[name] = 0 if operator in ("$sum", "$count") else [] if operator in ("$push", "$addToSet") else _MISSING
+        for name, operator, argument in accumulators:
+            if operator == "$count":
+                group[name] += 1
+                continue
+            value = _evaluate(document, argument)
+            if operator == "$sum":
+                if _is_number(value):
+                    group[name] += value
+            elif operator == "$avg":
+                if _is_number(value):
+                    totals = averages.setdefault((token, name), [0.0, 0])
+                    totals[0] += value
+                    totals[1] += 1
+            elif operator in ("$push", "$addToSet"):
+                if value is not _MISSING and not (
+                    operator == "$addToSet" and any(_equal(item, value) for item in group[name])
+                ):
+                    group[name].append(value)
+            elif operator == "$first":
+                if group[name] is _MISSING:
+                    group[name] = _value(value)
+            elif operator == "$last":
+                group[name] = _value(value)
+            elif value is not _MISSING and value is not None:
+                current = group[name]
+                if current is _MISSING or (
+                    _sort_rank(value) < _sort_rank(current)
+                    if operator == "$min"
+                    else _sort_rank(value) > _sort_rank(current)
+                ):
+                    group[name] = value
+    for token, group in groups.items():
+        for name, operator, _ in accumulators:
+            if operator == "$avg":
+                total, count = averages.get((token, name), (0.0, 0))
+                group[name] = total / count if count else None
+            elif group[name] is _MISSING:
+                group[name] = None
+    return list(groups.values())
+
+
+def _project_stage(documents: Iterable[Dict[str, Any]], spec: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    plain = {field: value for field, value in spec.items() if isinstance(value, (bool, int))}
+    computed = {field: value for field, value in spec.items() if field not in plain}
+    projection = _projection_spec(plain)
+    results: List[Dict[str, Any]] = []
+    for document in documents:
+        projected = _project(copy.deepcopy(document), projection) if plain else {"_id": document.get("_id")}
+        for field, expression in computed.items():
+            value = _evaluate(document, expression)
+            if value is not _MISSING:
+                projected[field] = value
+        results.append(projected)
+    return results
+
+
+def _unwind(documents: Iterable[Dict[str, Any]], spec: Any) -> List[Dict[str, Any]]:
+    options = spec if isinstance(spec, Mapping) else {"path": spec}
+    path = str(options.get("path", ""))
+    if not path.startswith("$"):
+        raise OperationFailure("$unwind path must start with $")
+    parts = path[1:].split(".")
+    keep_empty = bool(options.get("preserveNullAndEmptyArrays"))
+    results: List[Dict[str, Any]] = []
+    for document in documents:
+        value = _get(document, parts)
+        if isinstance(value, list) and value:
+            for item in value:
+                unwound = copy.deepcopy(document)
+                _set_path(unwound, ".".join(parts), item)
+                results.append(unwound)
+        elif isinstance(value, list) or value is _MISSING or value is None:
+            if keep_empty:
+                results.append(document)
+        else:
+            results.append(document)
+    return results
+
+
+def _pipeline_fields(stages: Sequence[Mapping[str, Any]]) -> Optional[Set[str]]:
+    """Top-level fields the stages before (and including) the first reshaping stage read."""
+    fields: Set[str] = set()
+    for stage in stages:
+        (operator, spec), = stage.items()
+        if operator == "$group":
+            return fields | _expression_fields(dict(spec))
+        if operator == "$project":
+            projection = {field: value for field, value in spec.items() if isinstance(value, (bool, int))}
+            shape = _projection_spec(projection) if projection else (True, True, [])
+            if not shape[0]:
+                return None
+            computed = {field: value for field, value in spec.items() if field not in projection}
+            return fields | {field.split(".", 1)[0] for field in shape[2]} | _expression_fields(computed) | {"_id"}
+        if operator == "$count":
+            return fields
+        if operator == "$match":
+            nested = _filter_fields(spec)
+            if nested is None:
+                return None
+            fields |= nested
+        elif operator == "$sort":
+            fields |= {field.split(".", 1)[0] for field, _ in _sort_spec(spec)}
+        elif operator == "$unwind":
+            fields |= _expression_fields(spec if isinstance(spec, str) else spec.get("path"))
+    return None
+
+
+# Updates -------------------------------------------------------------------------------
+def _set_path(document: Dict[str, Any], field: str, value: Any) -> None:
+    parts = field.split(".")
+    target: Any = document
+    for part in parts[:-1]:
+        if isinstance(target, list) and part.isdigit():
+            target = target[int(part)]
+            continue
+        if not isinstance(target, dict):
+            raise OperationFailure(f"Cannot create field {field!r} in a non-document value")
+        target = target.setdefault(part, {})
+    last = parts[-1]
+    if isinstance(target, list) and last.isdigit():
+        index = int(last)
+        target.extend([None] * (index + 1 - len(target)))
+        target[index] = value
+    elif isinstance(target, dict):
+        target[last] = value
+    else:
+        raise OperationFailure(f"Cannot create field {field!r} in a non-document value")
+
+
+def _apply_update(document: Dict[str, Any], update: Mapping[str, Any], *, inserting: bool) -> None:
+    for operator, fields in update.items():
+        if operator == "$setOnInsert" and not inserting:
+            continue
+        for field, value in fields.items():
+            current = _get(document, field.split("."))
+            if operator in ("$set", "$setOnInsert"):
+                _set_path(document, field, copy.deepcopy(value))
+            elif operator == "$unset":
+                _drop_path(document, field.split("."))
+            elif operator == "$inc":
+                if current is _MISSING:
+                    _set_path(document, field, value)
+                elif _is_number(current) and _is_number(value):
+                    _set_path(document, field, current + value)
+                else:
+                    raise OperationFailure(f"Cannot apply $inc to non-numeric field {field!r}")
+            elif operator in ("$min", "$max"):
+                if current is _MISSING or (
+                    _sort_rank(value) < _sort_rank(current)
+                    if operator == "$min"
+                    else _sort_rank(value) > _sort_rank(current)
+                ):
+                    _set_path(document, field, copy.deepcopy(value))
+            elif operator in ("$push", "$addToSet"):
+                items = value["$each"] if isinstance(value, Mapping) and "$each" in value else [value]
+                if current is _MISSING:
+                    current = []
+                    _set_path(document, field, current)
+                elif not isinstance(current, list):
+                    raise OperationFailure(f"Cannot apply {operator} to non-array field {field!r}")
+                for item in items:
+                    if operator == "$push" or not any(_equal(existing, item) for existing in current):
+                        current.append(copy.deepcopy(item))
+            else:
+                raise OperationFailure(f"Update operator {operator} is not supported by the SQLite backend")
+
+
+def _upsert_seed(filter: Mapping[str, Any]) -> Dict[str, Any]:
+    """The equality fields of *filter*, as MongoDB copies them into an upserted document."""
+    document: Dict[str, Any] = {}
+    for key, condition in filter.items():
+        if key == "$and":
+            for part in condition:
+                for field, value in _upsert_seed(part).items():
+                    document[field] = value
+        elif key.startswith("$"):
+            continue
+        elif _is_operator_document(condition):
+            if "$eq" in condition:
+                _set_path(document, key, copy.deepcopy(condition["$eq"]))
+        elif not isinstance(condition, re.Pattern):
+            _set_path(document, key, copy.deepcopy(condition))
+    return document
+
+
+def _require_operators(update: Mapping[str, Any]) -> None:
+    if not update or not all(str(key).startswith("$") for key in update):
+        raise ValueError("update only works with $ operators")
+
+
+# SQL translation -----------------------------------------------------------------------
+_Clause = Tuple[Optional[str], List[Any], bool]
+
+
+def _array_fields(document: Mapping[str, Any], prefix: str = "") -> Iterator[str]:
+    """Dotted paths of *document* that hold an array (not descending into the arrays)."""
+    for key, value in document.items():
+        path = prefix + str(key)
+        if isinstance(value, list):
+            yield path
+        elif isinstance(value, Mapping):
+            yield from _array_fields(value, path + ".")
+
+
+def _array_prefixes(field: str, arrays: Set[str]) -> List[str]:
+    """Prefixes of dotted *field* (itself included) that have held an array in the collection."""
+    if field == "_id":
+        return []
+    parts = field.split(".")
+    prefixes = (".".join(parts[: i + 1]) for i in range(len(parts)))
+    return [prefix for prefix in prefixes if prefix in arrays]
+
+
+class _SQLFilter:
+    """Translates a query into a WHERE clause that every matching row satisfies.
+
+    Each clause is ``(sql, params, exact)``: *sql* is None when nothing could be pushed down,
+    and *exact* is True when the SQL alone decides the condition.
+    """
+
+    def __init__(self, arrays: Set[str]) -> None:
+        self.arrays = arrays
+
+    def translate(self, filter: Mapping[str, Any]) -> _Clause:
+        pieces: List[str] = []
+        params: List[Any] = []
+        exact = True
+        for key, condition in filter.items():
+            if key == "$and":
+                sql, values, clause_exact = self._combine([self.translate(part) for part in condition], " AND ")
+            elif key == "$or":
+                branches = [self.translate(part) for part in condition]
+                if not branches or any(branch[0] is None for branch in branches):
+                    sql, values, clause_exact = None, [], False
+                else:
+                    sql, values, clause_exact = self._combine(branches, " OR ")
+            elif key.startswith("$"):
+                sql, values, clause_exact = None, [], False
+            else:
+                sql, values, clause_exact = self._field(key, condition)
+            exact = exact and clause_exact
+            if sql is not None:
+                pieces.append(sql)
+                params.extend(values)
+        if not pieces:
+            return None, [], exact
+        return " AND ".join(pieces), params, exact
+
+    @staticmethod
+    def _combine(clauses: Sequence[_Clause], joiner: str) -> _Clause:
+        pieces = [f"({sql})" for sql, _, _ in clauses if sql is not None]
+        params = [value for sql, values, _ in clauses if sql is not None for value in values]
+        exact = all(clause_exact for _, _, clause_exact in clauses)
+        if not pieces:
+            return None, [], exact
+        return joiner.join(pieces), params, exact
+
+    def _field(self, field: str, condition: Any) -> _Clause:
+        arrays = _array_prefixes(field, self.arrays)
+        if _is_operator_document(condition):
+            options = condition.get("$options", "")
+            clauses = []
+            for operator, argument in condition.items():
+                if operator == "$options":
+                    continue
+                if operator == "$eq":
+                    clauses.append(self._equals(field, argument))
+                elif operator == "$in":
+                    clauses.append(self._in(field, argument))
+                elif operator in _RANGE_OPERATORS:
+                    clauses.append(self._range(field, operator, argument))
+                elif operator == "$regex":
+                    clauses.append(self._regex(field, argument, options))
+                else:
+                    clauses.append((None, [], False))
+            sql, params, exact = self._combine(clauses, " AND ")
+        else:
+            sql, params, exact = self._equals(field, condition)
+        if sql is None or not arrays:
+            return sql, params, exact and not arrays
+        # Arrays (also arrays of subdocuments along a dotted path) are matched element-wise,
+        # which json_extract cannot express; let those rows through for the Python check.
+        guards = " OR ".join(f"{_json_type(prefix)} = 'array'" for prefix in arrays)
+        return f"({sql}) OR {guards}", params, False
+
+    def _equals(self, field: str, value: Any) -> _Clause:
+        if field == "_id":
+            if value is None or isinstance(value, (Mapping, list, re.Pattern)):
+                return None, [], False
+            return "_id = ?", [_id_key(value)], True
+        if isinstance(value, re.Pattern):
+            return self._regex(field, value, "")
+        if value is None:
+            return f"{_json_path(field)} IS NULL", [], True
+        if isinstance(value, bool):
+            return f"{_json_type(field)} = ?", ["true" if value else "false"], True
+        if isinstance(value, (int, float, str)):
+            # The type check keeps 1 from matching true and strings from matching object text.
+            return f"{_json_path(field)} = ? AND {_json_type(field)} IN ('integer', 'real', 'text')", [value], True
+        if isinstance(value, datetime):
+            return f"{_json_path(field + '.$date')} = ?", [_date_text(value)], True
+        if isinstance(value, ObjectId):
+            return f"{_json_path(field + '.$oid')} = ?", [str(value)], True
+        return None, [], False
+
+    def _in(self, field: str, values: Any) -> _Clause:
+        if not isinstance(values, (list, tuple, set)):
+            return None, [], False
+        values = list(values)
+        if not values:
+            return "0", [], True
+        if field == "_id" and all(value is not None and not isinstance(value, (Mapping, list, re.Pattern)) for value in values):
+            return f"_id IN ({', '.join('?' for _ in values)})", [_id_key(value) for value in values], True
+        if all(isinstance(value, (int, float, str)) and not isinstance(value, bool) for value in values):
+            return (
+                f"{_json_path(field)} IN ({', '.join('?' for _ in values)}) "
+                f"AND {_json_type(field)} IN ('integer', 'real', 'text')",
+                values,
+                True,
+            )
+        return self._combine([self._equals(field, value) for value in values], " OR ") if all(
+            self._equals(field, value)[0] is not None for value in values
+        ) else (None, [], False)
+
+    def _range(self, field: str, operator: str, bound: Any) -> _Clause:
+        if field == "_id":
+            return None, [], False
+        symbol = _RANGE_OPERATORS[operator]
+        if _is_number(bound):
+            return f"{_json_type(field)} IN ('integer', 'real') AND {_json_path(field)} {symbol} ?", [bound], True
+        if isinstance(bound, str):
+            return f"{_json_type(field)} = 'text' AND {_json_path(field)} {symbol} ?", [bound], True
+        if isinstance(bound, datetime):
+            return f"{_json_path(field + '.$date')} {symbol} ?", [_date_text(bound)], True
+        return None, [], False
+
+    def _regex(self, field: str, pattern: Any, options: str) -> _Clause:
+        if field == "_id":
+            return None, [], False
+        compiled = _regex(pattern, options)
+        return (
+            f"{_json_type(field)} = 'text' AND tpfd_regexp(?, ?, {_json_path(field)})",
+            [compiled.pattern, compiled.flags],
+            True,
+        )
+
+
+def _order_by(field: str, order: int) -> str:
+    """ORDER BY terms for a field without arrays, ranking types the way :func:`_sort_rank` does."""
+    direction = "DESC" if order < 0 else "ASC"
+    rank = (
+        f"CASE {_json_type(field)} WHEN 'integer' THEN 2 WHEN 'real' THEN 2 WHEN 'text' THEN 3 "
+        f"WHEN 'true' THEN 8 WHEN 'false' THEN 8 WHEN 'object' THEN CASE "
+        f"WHEN {_json_type(field + '.$date')} = 'text' THEN 9 WHEN {_json_type(field + '.$oid')} = 'text' THEN 7 "
+        f"WHEN {_json_type(field + '.$binary')} = 'text' THEN 6 ELSE 4 END ELSE 1 END"
+    )
+    return f"{rank} {direction}, {_json_path(field)} {direction}"
+
+
+class SQLiteCursor:
+    """Lazy result of :meth:`SQLiteCollection.find`; supports sort/skip/limit chaining."""
+
+    def __init__(
+        self,
+        collection: "SQLiteCollection",
+        filter: Optional[Mapping[str, Any]],
+        projection: Any = None,
+        *,
+        sort: Any = None,
+        skip: int = 0,
+        limit: int = 0,
+    ) -> None:
+        self._collection = collection
+        self._filter = dict(filter or {})
+        self._projection = _projection_spec(projection)
+        self._sort = _sort_spec(sort)
+        self._skip = skip
+        self._limit = limit
+        self._results: Optional[Iterator[Dict[str, Any]]] = None
+
+    def _check(self) -> None:
+        if self._results is not None:
+            raise InvalidOperation("cannot set options after executing query")
+
+    def sort(self, key_or_list: Any, direction: Optional[int] = None) -> "SQLiteCursor":
+        self._check()
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int) -> "SQLiteCursor":
+        self._check()
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> "SQLiteCursor":
+        self._check()
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int) -> "SQLiteCursor":
+        return self
+
+    def __iter__(self) -> "SQLiteCursor":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        if self._results is None:
+            fields = None
+            if self._projection is not None and self._projection[0]:
+                fields = {field.split(".", 1)[0] for field in self._projection[2]} | {"_id"}
+            documents = self._collection._select(
+                self._filter, fields=fields, sort=self._sort, skip=self._skip, limit=self._limit
+            )
+            self._results = (_project(document, self._projection) for document in documents)
+        return next(self._results)
+
+    next = __next__
+
+    def close(self) -> None:
+        self._results = iter(())
+
+
+class SQLiteCollection:
+    """One table of the store, queried through SQL with Python evaluation of the leftovers."""
+
+    def __init__(self, database: "SQLiteDatabase", name: str) -> None:
+        self.database = database
+        self.name = name
+        self._store = database.client
+        self._table = _quote(name)
+        self._store._create_table(name)
+
+    def __repr__(self) -> str:
+        return f"SQLiteCollection({self._store.path!r}, {self.name!r})"
+
+    # Querying ------------------------------------------------------------------------
+    def _where(self, filter: Optional[Mapping[str, Any]]) -> Tuple[str, List[Any], bool]:
+        """WHERE clause narrowing *filter*; the flag is True when the SQL decides it alone."""
+        if not filter:
+            return "", [], True
+        sql, params, exact = _SQLFilter(self._store._array_paths(self.name)).translate(filter)
+        return (f" WHERE {sql}" if sql else ""), params, exact
+
+    def _select(
+        self,
+        filter: Optional[Mapping[str, Any]],
+        *,
+        fields: Optional[Set[str]] = None,
+        sort: Sequence[Tuple[str, int]] = (),
+        skip: int = 0,
+        limit: int = 0,
+    ) -> Iterator[Dict[str, Any]]:
+        """Matching documents in *sort* order, decoding only top-level *fields* when given."""
+        filter = filter or {}
+        where, params, exact = self._where(filter)
+        arrays = self._store._array_paths(self.name)
+        in_sql = exact and not any(_array_prefixes(field, arrays) for field, _ in sort)
+        if fields is not None and not exact:
+            needed = _filter_fields(filter)
+            fields = None if needed is None else fields | needed
+        if fields is not None and not in_sql:
+            fields = fields | {field.split(".", 1)[0] for field, _ in sort}
+        if fields is None:
+            columns = "doc"
+        else:
+            ordered = sorted(fields)
+            columns = ", ".join(f"{_json_path(field)}, {_json_type(field)}" for field in ordered) or "1"
+        statement = f"SELECT {columns} FROM {self._table}{where}"
+        if sort and in_sql:
+            statement += " ORDER BY " + ", ".join(_order_by(field, order) for field, order in sort)
+        if in_sql and (limit or skip):
+            statement += " LIMIT ? OFFSET ?"
+            params = [*params, limit or -1, skip]
+        rows = self._store._rows(statement, params)
+
+        def documents() -> Iterator[Dict[str, Any]]:
+            for row in rows:
+                if fields is None:
+                    yield loads(row[0])
+                    continue
+                document: Dict[str, Any] = {}
+                for position, field in enumerate(ordered):
+                    kind = row[2 * position + 1]
+                    if kind is not None:
+                        document[field] = _typed(row[2 * position], kind)
+                yield document
+
+        matching = documents() if exact else (document for document in documents() if _matches(document, filter))
+        if in_sql:
+            yield from matching
+            return
+        if sort:
+            matching = iter(_sort_documents(list(matching), sort))
+        yield from itertools.islice(matching, skip, skip + limit if limit else None)
+
+    def find(self, filter: Optional[Mapping[str, Any]] = None, projection: Any = None, *args: Any, **kwargs: Any) -> SQLiteCursor:
+        return SQLiteCursor(
+            self,
+            filter,
+            kwargs.get("projection", projection),
+            sort=kwargs.get("sort"),
+            skip=kwargs.get("skip", 0),
+            limit=kwargs.get("limit", 0),
+        )
+
+    def find_one(self, filter: Optional[Mapping[str, Any]] = None, *args: Any, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        if filter is not None and not isinstance(filter, Mapping):
+            filter = {"_id": filter}
+        kwargs["limit"] = 1
+        return next(self.find(filter, *args, **kwargs), None)
+
+    def count_documents(self, filter: Mapping[str, Any], **kwargs: Any) -> int:
+        where, params, exact = self._where(filter)
+        skip, limit = kwargs.get("skip", 0), kwargs.get("limit", 0)
+        if exact and not skip and not limit:
+            return int(self._store._fetch(f"SELECT COUNT(*) FROM {self._table}{where}", params)[0])
+        return sum(1 for _ in self._select(filter, fields=set(), skip=skip, limit=limit))
+
+    def distinct(self, key: str, filter: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> List[Any]:
+        values: List[Any] = []
+        seen: Set[str] = set()
+        for document in self._select(filter, fields={key.split(".", 1)[0]}):
+            for value in _candidates(_resolve(document, key.split("."))):
+                if isinstance(value, list):
+                    continue
+                token = _group_key(value)
+                if token not in seen:
+                    seen.add(token)
+                    values.append(value)
+        return values
+
+    def aggregate(self, pipeline: Sequence[Mapping[str, Any]], **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        pipeline = list(pipeline)
+        for stage in pipeline:
+            if len(stage) != 1:
+                raise OperationFailure("A pipeline stage must have exactly one field")
+            operator = next(iter(stage))
+            if operator not in _PIPELINE_STAGES:
+                raise OperationFailure(f"{operator} is not supported by the SQLite backend")
+        match: Mapping[str, Any] = {}
+        if pipeline and "$match" in pipeline[0]:
+            match, pipeline = pipeline[0]["$match"], pipeline[1:]
+        documents: Any = self._select(match, fields=_pipeline_fields(pipeline))
+        for stage in pipeline:
+            (operator, spec), = stage.items()
+            if operator == "$match":
+                documents = [document for document in documents if _matches(document, spec)]
+            elif operator == "$group":
+                documents = _group(documents, spec)
+            elif operator == "$sort":
+                documents = _sort_documents(list(documents), _sort_spec(spec))
+            elif operator == "$skip":
+                documents = list(documents)[int(spec):]
+            elif operator == "$limit":
+                documents = list(documents)[: int(spec)]
+            elif operator == "$project":
+                documents = _project_stage(documents, spec)
+            elif operator == "$count":
+                total = sum(1 for _ in documents)
+                documents = [{spec: total}] if total else []
+            elif operator == "$unwind":
+                documents = _unwind(documents, spec)
+        return iter(list(documents))
+
+    # Writes --------------------------------------------------------------------------
+    def _insert(self, document: Dict[str, Any]) -> None:
+        self._store._record_arrays(self.name, _array_fields(document))
+        try:
+            self._store._execute(
+                f"INSERT INTO {self._table} (_id, doc) VALUES (?, ?)", [_id_key(document["_id"]), dumps(document)]
+            )
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateKeyError(f"{self.name}: {exc}") from exc
+
+    def _replace(self, key: str, document: Dict[str, Any]) -> None:
+        self._store._record_arrays(self.name, _array_fields(document))
+        try:
+            self._store._execute(f"UPDATE {self._table} SET doc = ? WHERE _id = ?", [dumps(document), key])
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateKeyError(f"{self.name}: {exc}") from exc
+
+    def insert_many(self, documents: Iterable[Dict[str, Any]], ordered: bool = True, **kwargs: Any) -> InsertManyResult:
+        rows: List[Tuple[str, str]] = []
+        inserted_ids: List[Any] = []
+        arrays: Set[str] = set()
+        for document in documents:
+            if "_id" not in document:
+                document["_id"] = uuid.uuid4().hex
+            inserted_ids.append(document["_id"])
+            rows.append((_id_key(document["_id"]), dumps(document)))
+            arrays.update(_array_fields(document))
+        self._store._record_arrays(self.name, arrays)
+        try:
+            self._store._executemany(f"INSERT INTO {self._table} (_id, doc) VALUES (?, ?)", rows)
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateKeyError(f"{self.name}: {exc}") from exc
+        return InsertManyResult(inserted_ids, True)
+
+    def insert_one(self, document: Dict[str, Any], **kwargs: Any) -> InsertOneResult:
+        return InsertOneResult(self.insert_many([document]).inserted_ids[0], True)
+
+    def _delete(self, filter: Mapping[str, Any], limit: int = 0) -> int:
+        where, params, exact = self._where(filter)
+        with self._store._write():
+            if exact and not limit:
+                return self._store._execute(f"DELETE FROM {self._table}{where}", params)
+            keys = [_id_key(document["_id"]) for document in self._select(filter, fields={"_id"}, limit=limit)]
+            deleted = 0
+            for start in range(0, len(keys), _DELETE_BATCH):
+                batch = keys[start : start + _DELETE_BATCH]
+                deleted += self._store._execute(
+                    f"DELETE FROM {self._table} WHERE _id IN ({', '.join('?' for _ in batch)})", batch
+                )
+            return deleted
+
+    def delete_many(self, filter: Mapping[str, Any], **kwargs: Any) -> DeleteResult:
+        return DeleteResult({"n": self._delete(filter)}, True)
+
+    def delete_one(self, filter: Mapping[str, Any], **kwargs: Any) -> DeleteResult:
+        return DeleteResult({"n": self._delete(filter, limit=1)}, True)
+
+    def update_one(self, filter: Mapping[str, Any], update: Mapping[str, Any], upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        _require_operators(update)
+        with self._store._write():
+            document = next(self._select(filter, limit=1), None)
+            if document is None:
+                if not upsert:
+                    return UpdateResult({"n": 0, "nModified": 0}, True)
+                document = _upsert_seed(filter)
+                _apply_update(document, update, inserting=True)
+                document.setdefault("_id", ObjectId())
+                self._insert(document)
+                return UpdateResult({"n": 1, "nModified": 0, "upserted": document["_id"]}, True)
+            key = _id_key(document["_id"])
+            before = dumps(document)
+            _apply_update(document, update, inserting=False)
+            modified = dumps(document) != before
+            if modified:
+                self._replace(key, document)
+            return UpdateResult({"n": 1, "nModified": int(modified)}, True)
+
+    def replace_one(self, filter: Mapping[str, Any], replacement: Mapping[str, Any], upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        if any(str(key).startswith("$") for key in replacement):
+            raise ValueError("replacement can not include $ operators")
+        with self._store._write():
+            current = next(self._select(filter, fields={"_id"}, limit=1), None)
+            document = copy.deepcopy(dict(replacement))
+            if current is None:
+                if not upsert:
+                    return UpdateResult({"n": 0, "nModified": 0}, True)
+                seed = _upsert_seed(filter)
+                document.setdefault("_id", seed.get("_id", ObjectId()))
+                self._insert(document)
+                return UpdateResult({"n": 1, "nModified": 0, "upserted": document["_id"]}, True)
+            document["_id"] = current["_id"]
+            self._replace(_id_key(current["_id"]), document)
+            return UpdateResult({"n": 1, "nModified": 1}, True)
+
+    def bulk_write(self, requests: Sequence[Any], ordered: bool = True, **kwargs: Any) -> BulkWriteResult:
+        """Apply insert/update/replace/delete requests in one transaction."""
+        counts: Dict[str, Any] = {
+            "nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": [],
+        }
+        with self._store._write():
+            for index, request in enumerate(requests):
+                if isinstance(request, InsertOne):
+                    self.insert_one(request._doc)
+                    counts["nInserted"] += 1
+                    continue
+                if isinstance(request, (DeleteOne, DeleteMany)):
+                    counts["nRemoved"] += self._delete(request._filter, limit=1 if isinstance(request, DeleteOne) else 0)
+                    continue
+                if isinstance(request, UpdateOne):
+                    result = self.update_one(request._filter, request._doc, upsert=bool(request._upsert))
+                elif isinstance(request, ReplaceOne):
+                    result = self.replace_one(request._filter, request._doc, upsert=bool(request._upsert))
+                else:
+                    raise OperationFailure(f"{type(request).__name__} is not supported by the SQLite backend")
+                if result.upserted_id is not None:
+                    counts["nUpserted"] += 1
+                    counts["upserted"].append({"index": index, "_id": result.upserted_id})
+                else:
+                    counts["nMatched"] += result.matched_count
+                    counts["nModified"] += result.modified_count
+        return BulkWriteResult(counts, True)
+
+    # Indexes -------------------------------------------------------------------------
+    def create_index(self, keys: Any, name: Optional[str] = None, unique: bool = False, **kwargs: Any) -> str:
+        if isinstance(keys, str):
+            keys = [(keys, ASCENDING)]
+        keys = [(str(field), int(direction)) for field, direction in keys]
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        columns = ", ".join(
+            f"{_json_path(field)}{' DESC' if direction < 0 else ''}" for field, direction in keys
+        )
+        statement = (
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS "
+            f"{_quote(self.name + '__' + name)} ON {self._table} ({columns})"
+        )
+        try:
+            self._store._execute(statement, [])
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateKeyError(f"{self.name}.{name}: {exc}") from exc
+        self._store._execute(
+            f"INSERT OR REPLACE INTO {_INDEX_TABLE} (collection, name, keys, is_unique) VALUES (?, ?, ?, ?)",
+            [self.name, name, json.dumps(keys), int(unique)],
+        )
+        return name
+
+    def drop_index(self, name: str) -> None:
+        self._store._execute(f"DROP INDEX IF EXISTS {_quote(self.name + '__' + name)}", [])
+        self._store._execute(f"DELETE FROM {_INDEX_TABLE} WHERE collection = ? AND name = ?", [self.name, name])
+
+    def index_information(self) -> Dict[str, Dict[str, Any]]:
+        info: Dict[str, Dict[str, Any]] = {"_id_": {"key": [("_id", ASCENDING)]}}
+        for name, keys, unique in self._store._index_rows(self.name):
+            entry: Dict[str, Any] = {"key": [tuple(pair) for pair in json.loads(keys)]}
+            if unique:
+                entry["unique"] = True
+            info[name] = entry
+        return info
+
+
+class SQLiteDatabase:
+    def __init__(self, client: "SQLiteClient", name: str) -> None:
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, SQLiteCollection] = {}
+
+    def __getitem__(self, name: str) -> SQLiteCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = SQLiteCollection(self, name)
+        return collection
+
+    def list_collection_names(self) -> List[str]:
+        return self.client.list_collection_names()
+
+
+class SQLiteClient:
+    """Connection to one SQLite file; safe to share between threads of one process."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.create_function("tpfd_regexp", 3, _sql_regexp, deterministic=True)
+        with self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {_INDEX_TABLE} ("
+                "collection TEXT NOT NULL, name TEXT NOT NULL, keys TEXT NOT NULL, "
+                "is_unique INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (collection, name))"
+            )
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {_ARRAY_TABLE} ("
+                "collection TEXT NOT NULL, path TEXT NOT NULL, PRIMARY KEY (collection, path))"
+            )
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {_TRACKED_TABLE} (collection TEXT PRIMARY KEY)")
+        self._tables: Set[str] = set()
+        self._arrays: Dict[str, Set[str]] = {}
+        self._data_version: Optional[int] = None
+        self._databases: Dict[str, SQLiteDatabase] = {}
+
+    @classmethod
+    def from_uri(cls, uri: str) -> "SQLiteClient":
+        return cls(sqlite_path(uri))
+
+    def __getitem__(self, name: str) -> SQLiteDatabase:
+        database = self._databases.get(name)
+        if database is None:
+            database = self._databases[name] = SQLiteDatabase(self, name)
+        return database
+
+    def get_database(self, name: str) -> SQLiteDatabase:
+        return self[name]
+
+    def list_collection_names(self) -> List[str]:
+        rows = self._fetch(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT IN (?, ?, ?)",
+            [_INDEX_TABLE, _ARRAY_TABLE, _TRACKED_TABLE],
+        )
+        return sorted(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _create_table(self, name: str) -> None:
+        if name in self._tables:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote(name)} (_id TEXT PRIMARY KEY, doc TEXT NOT NULL)"
+            )
+            if not self._conn.execute(f"SELECT 1 FROM {_TRACKED_TABLE} WHERE collection = ?", [name]).fetchone():
+                # Files written before array paths were tracked get one full scan.
+                paths: Set[str] = set()
+                for (text,) in self._conn.execute(f"SELECT doc FROM {_quote(name)}"):
+                    paths.update(_array_fields(json.loads(text)))
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO {_ARRAY_TABLE} (collection, path) VALUES (?, ?)",
+                    [(name, path) for path in sorted(paths)],
+                )
+                self._conn.execute(f"INSERT OR IGNORE INTO {_TRACKED_TABLE} (collection) VALUES (?)", [name])
+                self._arrays.pop(name, None)
+        self._tables.add(name)
+
+    def _index_rows(self, collection: str) -> List[Tuple[str, str, int]]:
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT name, keys, is_unique FROM {_INDEX_TABLE} WHERE collection = ? ORDER BY name",
+                [collection],
+            ).fetchall()
+
+    def _array_paths(self, collection: str) -> Set[str]:
+        """Dotted paths that have held an array in *collection*, cached until another connection writes."""
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._arrays.clear()
+                self._data_version = version
+            paths = self._arrays.get(collection)
+            if paths is None:
+                paths = self._arrays[collection] = set(
+                    self._fetch(f"SELECT path FROM {_ARRAY_TABLE} WHERE collection = ?", [collection])
+                )
+            return paths
+
+    def _record_arrays(self, collection: str, paths: Iterable[str]) -> None:
+        """Remember array paths before the documents holding them are written."""
+        with self._lock:
+            known = self._array_paths(collection)
+            new = sorted(set(paths) - known)
+            if new:
+                self._executemany(
+                    f"INSERT OR IGNORE INTO {_ARRAY_TABLE} (collection, path) VALUES (?, ?)",
+                    [(collection, path) for path in new],
+                )
+                known.update(new)
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        """Hold the connection in one IMMEDIATE transaction so read-modify-write steps are atomic.
+
+        Other processes writing the same file wait on SQLite's lock; nested calls join the
+        outer transaction.
+        """
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            else:
+                self._conn.commit()
+            finally:
+                self._depth = 0
+
+    def _rows(self, statement: str, params: Sequence[Any]) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(statement, params).fetchall()
+
+    def _fetch(self, statement: str, params: Sequence[Any]) -> List[Any]:
+        return [row[0] for row in self._rows(statement, params)]
+
+    def _run(self, action: Callable[[], Any]) -> Any:
+        with self._lock:
+            if self._depth:
+                return action()
+            with self._conn:
+                return action()
+
+    def _execute(self, statement: str, params: Sequence[Any]) -> int:
+        return self._run(lambda: self._conn.execute(statement, params).rowcount)
+
+    def _executemany(self, statement: str, rows: Sequence[Sequence[Any]]) -> int:
+        if not rows:
+            return 0
+        return self._run(lambda: self._conn.executemany(statement, rows).rowcount)
@@ -1,6 +1,6 @@
-"""Update Products.json and MongoDB product_configs with TP information from the scanner state file.
+"""Update Products.json and MongoDB product_configs with TP information from the scanner ledger.
 
-This script reads the daily_scanner_state.json and updates:
+This script reads the daily scanner ledger (or a legacy daily_scanner_state.json) and updates:
 1. Products.json with:
    - LatestTP: The newest TP based on TP naming convention
    - NumberOfReleases: Count of ingested TPs
@@ -14,50 +14,27 @@ from __future__ import annotations
 
 import json
 import logging
-from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
+
+from tp_ingest.config import MongoSettings
+from tp_ingest.fileio import atomic_write_text
+from tp_ingest.ledger import load_scanner_state
+from tp_ingest.naming import tp_name_sort_key
+from tp_ingest.product_config import invalidate_product_catalog, load_product_catalog
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
-# MongoDB connection for updating product_configs
+# MongoDB connection for updating product_configs (shared, pooled client)
 try:
-    from pymongo import MongoClient
-    MONGO_URI = (
-        "mongodb://iq6cdegc265ebn7uiiem_admin:"
-        "Yv0BqT17bakhZ9M%2CrL%3DbTPD0fqbVo%2Ch4@"
-        "10-108-27-21.dbaas.intel.com:27017,"
-        "10-108-27-23.dbaas.intel.com:27017,"
-        "10-109-224-18.dbaas.intel.com:27017/"
-        "tpfrontdesk?authSource=admin&tls=true"
-    )
+    from tp_ingest.catalog import sync_product_catalog
+    from tp_ingest.clients import get_client
     MONGO_AVAILABLE = True
 except ImportError:
     MONGO_AVAILABLE = False
-    MongoClient = None  # type: ignore
-    MONGO_URI = ""
-
-
-def tp_name_sort_key(tp_name: str) -> Tuple[str, int, str, int, str]:
-    """Extract a sort key from a TP name based on Intel naming standard.
-    
-    TP naming convention (18 chars):
-    - [10-12]: TP Revision - primary sort key
-    - [13]: Milestone (0-4)
-    - [14]: Sequential Release Number (0-9)
-    - [15-18]: Release Date (YYWW)
-    """
-    if not tp_name or len(tp_name) < 15:
-        return ("000", 0, "0", 0, "0000")
-    
-    tp_upper = tp_name.upper()
-    tp_revision = tp_upper[10:13] if len(tp_upper) >= 13 else "000"
-    milestone = int(tp_upper[13]) if len(tp_upper) >= 14 and tp_upper[13].isdigit() else 0
-    release_num = tp_upper[14] if len(tp_upper) >= 15 else "0"
-    release_date = tp_upper[15:19] if len(tp_upper) >= 19 else "0000"
-    
-    return (tp_revision, milestone, release_num, 0, release_date)
+    get_client = None  # type: ignore
+    sync_product_catalog = None  # type: ignore
 
 
 def update_mongodb_product_configs(
@@ -65,6 +42,8 @@ def update_mongodb_product_configs(
     dry_run: bool = False,
 ) -> Dict[str, Any]:
     """Update MongoDB product_configs collection with TP information.
+
+    Unchanged products are skipped and the rest are sent as one bulk write.
     
     Args:
         products_data: List of product dicts with LatestTP, NumberOfReleases, ListOfReleases
@@ -78,71 +57,23 @@ def update_mongodb_product_configs(
         return {"error": "pymongo not installed", "updated": 0}
     
     try:
-        client = MongoClient(MONGO_URI)
-        product_configs = client["tpfrontdesk"]["product_configs"]
+        mongo_settings = MongoSettings.from_env()
+        client = get_client(mongo_settings.uri)
+        product_configs = client[mongo_settings.database][mongo_settings.product_collection]
     except Exception as e:
         logger.error(f"MongoDB connection failed: {e}")
         return {"error": str(e), "updated": 0}
     
-    updated_count = 0
-    for product in products_data:
-        code = (product.get("ProductCode") or "").upper()
-        if not code:
-            continue
-
-        latest_tp = product.get("LatestTP")
-        num_releases = product.get("NumberOfReleases")
-        if num_releases is None:
-            num_releases = 0
-        releases = product.get("ListOfReleases", []) or []
-        product_name = product.get("ProductName")
-        network_path = product.get("NetworkPath")
-        last_run_date = product.get("LastRunDate")
+    try:
+        result = sync_product_catalog(product_configs, products_data, dry_run=dry_run)
+    except Exception as e:
+        logger.error(f"MongoDB product_configs sync failed: {e}")
+        return {"error": str(e), "updated": 0, "dry_run": dry_run}
 
-        additional_attributes = {
-            k: v
-            for k, v in product.items()
-            if k
-            not in {
-                "ProductCode",
-                "ProductName",
-                "NetworkPath",
-                "LatestTP",
-                "NumberOfReleases",
-                "ListOfReleases",
-                "LastRunDate",
-            }
-        }
-        
-        if dry_run:
-            logger.info(
-                "  [MongoDB DRY RUN] Would upsert %s: latest=%s releases=%s",
-                code,
-                latest_tp,
-                num_releases,
-            )
-        else:
-            update_doc: Dict[str, Any] = {
-                "product_code": code,
-                "product_name": product_name,
-                "network_path": network_path,
-                "latest_tp": latest_tp,
-                "number_of_releases": num_releases,
-                "releases": releases,
-                "last_run_date": last_run_date,
-                "additional_attributes": additional_attributes,
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-            }
-            result = product_configs.update_one(
-                {"product_code": code},
-                {"$set": update_doc},
-                upsert=True,
-            )
-            if result.modified_count > 0 or result.upserted_id is not None:
-                updated_count += 1
-                logger.info(f"  [MongoDB] Upserted {code}: {num_releases} releases")
-    
-    return {"updated": updated_count, "dry_run": dry_run}
+    label = "[MongoDB DRY RUN] Would upsert" if dry_run else "[MongoDB] Upserted"
+    for code in result.inserted + result.updated:
+        logger.info(f"  {label} {code}")
+    return {"updated": result.written, "unchanged": len(result.unchanged), "dry_run": dry_run}
 
 
 def update_products_json(
@@ -159,8 +90,9 @@ def update_products_json(
     if not products_path.exists():
         raise FileNotFoundError(f"Products file not found: {products_path}")
     
-    state = json.loads(state_path.read_text(encoding="utf-8"))
-    products = json.loads(products_path.read_text(encoding="utf-8"))
+    state = load_scanner_state(state_path)
+    catalog = load_product_catalog(products_path)
+    products = catalog.entries()
     
     changes: Dict[str, Any] = {"updated_products": [], "summary": {}}
     
@@ -202,7 +134,9 @@ def update_products_json(
         logger.info(f"  {code}: {len(tp_names)} TPs, Latest: {latest_tp}")
     
     if not dry_run:
-        products_path.write_text(json.dumps(products, indent=4), encoding="utf-8")
+        payload = products if catalog.is_list or len(products) != 1 else products[0]
+        atomic_write_text(products_path, json.dumps(payload, indent=4))
+        invalidate_product_catalog(products_path)
         logger.info(f"\nProducts.json updated at {products_path}")
         
         # Also update MongoDB
@@ -237,8 +171,8 @@ def main() -> None:
     parser.add_argument(
         "--state-file",
         type=Path,
-        default=Path(__file__).parent.parent / "state" / "daily_scanner_state.json",
-        help="Path to daily_scanner_state.json",
+        default=Path(__file__).parent.parent / "state" / "daily_scanner.db",
+        help="Path to the scanner ledger (daily_scanner.db) or a legacy daily_scanner_state.json",
     )
     parser.add_argument(
         "--dry-run",
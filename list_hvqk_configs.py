@@ -1,34 +1,56 @@
-"""List all hvqk waterfall config files grouped by module."""
+"""List all hvqk waterfall config files grouped by module.
+
+Entries come from the persisted HVQK index rather than a fresh walk of the TP:
+
+    python list_hvqk_configs.py --tp-name PTUSDJXA1H21G402546
+    python list_hvqk_configs.py --product 8PXM --source mongo
+
+``--source local`` (default) walks the TP folder once and caches the index under
+``state/hvqk_index`` (or ``TPFD_HVQK_INDEX_DIR``); ``--source mongo`` reads the last ingest from
+the ``hvqk_configs`` collection.
+"""
 
 from __future__ import annotations
 
+import argparse
+import sys
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 ROOT = Path(__file__).parent
-MODULES_DIR = ROOT / "Test Programs" / "PTUSDJXA1H21G402546" / "Modules"
-TARGET_SUFFIX = "hvqk.config.json"
+sys.path.insert(0, str(ROOT / "Tools"))
 
+from tp_ingest import models  # noqa: E402
+from tp_ingest.config import IngestSettings  # noqa: E402
+from tp_ingest.hvqk import LOCAL_SOURCE, SOURCES, load_hvqk_index  # noqa: E402
 
-def find_module_hvqk_files(modules_dir: Path) -> List[Tuple[str, List[str]]]:
-    """Return a list of (module_name, [filenames]) for hvqk.config json files."""
-    if not modules_dir.is_dir():
-        raise FileNotFoundError(f"Modules directory not found: {modules_dir}")
 
-    results: List[Tuple[str, List[str]]] = []
-    for module_dir in sorted(p for p in modules_dir.iterdir() if p.is_dir()):
-        input_dir = module_dir / "InputFiles"
-        if not input_dir.is_dir():
-            continue
+def add_index_arguments(parser: argparse.ArgumentParser) -> None:
+    """Arguments shared with summarize_hvqk_module.py for selecting a TP and index source."""
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--tp-name", help="TP folder name (under TPFD_TP_ROOT or the product share).")
+    target.add_argument("--product", help="Product code; uses the product's latest TP.")
+    parser.add_argument(
+        "--source",
+        choices=SOURCES,
+        default=LOCAL_SOURCE,
+        help="Cached local index of the TP folder, or the ingested hvqk_configs collection.",
+    )
+    parser.add_argument(
+        "--product-config",
+        type=Path,
+        default=None,
+        help="Products.json used to resolve --product (defaults to repo root / Products.json).",
+    )
+    parser.add_argument("--refresh", action="store_true", help="Rebuild the local index even if it is current.")
 
-        matches = sorted(
-            file_path.name
-            for file_path in input_dir.rglob("*")
-            if file_path.is_file() and file_path.name.endswith(TARGET_SUFFIX)
-        )
-        if matches:
-            results.append((module_dir.name, matches))
-    return results
+
+def group_by_module(entries: Iterable[models.HVQKConfigEntry]) -> List[Tuple[str, List[str]]]:
+    """Return a list of (module_name, [filenames]) in index order."""
+    grouped: Dict[str, List[str]] = {}
+    for entry in entries:
+        grouped.setdefault(entry.module_name, []).append(entry.file_name)
+    return list(grouped.items())
 
 
 def print_report(entries: Iterable[Tuple[str, List[str]]]) -> None:
@@ -40,12 +62,28 @@ def print_report(entries: Iterable[Tuple[str, List[str]]]) -> None:
 
 
 def main() -> None:
-    entries = find_module_hvqk_files(MODULES_DIR)
+    parser = argparse.ArgumentParser(description="List hvqk.config.json files grouped by module.")
+    add_index_arguments(parser)
+    args = parser.parse_args()
+
+    settings = IngestSettings.from_env(repo_root=ROOT)
+    try:
+        label, entries = load_hvqk_index(
+            settings,
+            source=args.source,
+            tp_name=args.tp_name,
+            product_code=args.product,
+            product_config_path=args.product_config,
+            refresh=args.refresh,
+            with_configs=False,
+        )
+    except (FileNotFoundError, LookupError, ValueError) as exc:
+        parser.exit(1, f"{exc}\n")
     if not entries:
-        print("No hvqk.config.json files were found under the Modules directory.")
+        print(f"No hvqk.config.json files were found for {label}.")
         return
 
-    print_report(entries)
+    print_report(group_by_module(entries))
 
 
 if __name__ == "__main__":
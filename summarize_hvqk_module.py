@@ -1,33 +1,20 @@
-"""Print the contents of every hvqk.config.json file for a given module."""
+"""Print the contents of every hvqk.config.json file for a given module.
+
+Reads the persisted HVQK index (see list_hvqk_configs.py for the TP and source arguments):
+
+    python summarize_hvqk_module.py ARR_ATOM --tp-name PTUSDJXA1H21G402546
+"""
 
 from __future__ import annotations
 
 import argparse
 import json
-from pathlib import Path
 from typing import Any
 
-ROOT = Path(__file__).parent
-MODULES_DIR = ROOT / "Test Programs" / "PTUSDJXA1H21G402546" / "Modules"
-TARGET_SUFFIX = "hvqk.config.json"
-
-
-def collect_module_files(module_name: str) -> list[Path]:
-    module_dir = MODULES_DIR / module_name
-    input_dir = module_dir / "InputFiles"
-    if not module_dir.is_dir():
-        raise FileNotFoundError(f"Module folder not found: {module_dir}")
-    if not input_dir.is_dir():
-        raise FileNotFoundError(
-            f"Module '{module_name}' does not contain an InputFiles directory."
-        )
-
-    matches = sorted(
-        file_path
-        for file_path in input_dir.rglob("*")
-        if file_path.is_file() and file_path.name.endswith(TARGET_SUFFIX)
-    )
-    return matches
+from list_hvqk_configs import ROOT, add_index_arguments
+from tp_ingest import models
+from tp_ingest.config import IngestSettings
+from tp_ingest.hvqk import load_hvqk_index
 
 
 def to_markdown_table(payload: dict[str, Any]) -> str:
@@ -44,17 +31,15 @@ def to_markdown_table(payload: dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def print_module_summary(module_name: str, files: list[Path]) -> None:
+def print_module_summary(module_name: str, entries: list[models.HVQKConfigEntry]) -> None:
     print(f"{module_name} HVQK waterfall config:")
-    if not files:
+    if not entries:
         print("(No hvqk config files found)\n")
         return
 
-    for file_path in files:
-        print(file_path.name)
-        with file_path.open(encoding="utf-8") as handle:
-            data = json.load(handle)
-        print(to_markdown_table(data))
+    for entry in entries:
+        print(entry.file_name)
+        print(to_markdown_table(entry.config or {}))
         print()
 
 
@@ -63,10 +48,23 @@ def main() -> None:
         description="Print the full contents of hvqk config files for a module."
     )
     parser.add_argument("module", help="Module name (folder under Modules).")
+    add_index_arguments(parser)
     args = parser.parse_args()
 
-    files = collect_module_files(args.module)
-    print_module_summary(args.module, files)
+    settings = IngestSettings.from_env(repo_root=ROOT)
+    try:
+        _label, entries = load_hvqk_index(
+            settings,
+            source=args.source,
+            tp_name=args.tp_name,
+            product_code=args.product,
+            product_config_path=args.product_config,
+            module_name=args.module,
+            refresh=args.refresh,
+        )
+    except (FileNotFoundError, LookupError, ValueError) as exc:
+        parser.exit(1, f"{exc}\n")
+    print_module_summary(args.module, entries)
 
 
 if __name__ == "__main__":